@@ -1,13 +1,22 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import os
 import logging
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 import uuid
 from datetime import datetime, timedelta
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
 import jwt
 from passlib.context import CryptContext
 
@@ -18,6 +27,45 @@ DB_NAME = os.environ.get('DB_NAME', 'foursan_al_aqida')
 client = AsyncIOMotorClient(MONGO_URL)
 db = client[DB_NAME]
 
+# Database indexes (kept in sync with backend/server.py)
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "sections": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("name_norm", ASCENDING)], name="name_norm"),
+    ],
+    "articles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("section_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="section_id_created_at_id"),
+        IndexModel([("tags", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="tags_created_at_id"),
+        IndexModel([("author_norm", ASCENDING)], name="author_norm"),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "likes": [
+        IndexModel([("user_id", ASCENDING), ("article_id", ASCENDING)], name="user_id_article_id_unique", unique=True),
+        IndexModel([("article_id", ASCENDING)], name="article_id"),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("article_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="article_id_created_at_id"),
+    ],
+    "tag_stats": [
+        IndexModel([("count", DESCENDING), ("_id", ASCENDING)], name="count_id"),
+    ],
+}
+
+async def ensure_indexes():
+    for collection_name, index_models in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(index_models)
+        except OperationFailure as e:
+            logging.getLogger(__name__).error("Failed to create indexes on %s: %s", collection_name, e)
+
 # JWT Configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
@@ -68,6 +116,243 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=401, detail="User not found")
     return User(**user)
 
+# Keyset pagination on (created_at, id), same cursor format as backend/server.py
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(document):
+    key = {"created_at": document["created_at"].isoformat(), "id": document["id"]}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(key["created_at"]), key["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(collection, query: dict, limit: int, cursor: Optional[str] = None, direction: int = DESCENDING, projection=None):
+    if cursor:
+        created_at, document_id = decode_cursor(cursor)
+        operator = "$lt" if direction == DESCENDING else "$gt"
+        query = {"$and": [query, {"$or": [
+            {"created_at": {operator: created_at}},
+            {"created_at": created_at, "id": {operator: document_id}}
+        ]}]}
+    
+    documents = await collection.find(query, projection).sort(
+        [("created_at", direction), ("id", direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    return documents[:limit], next_cursor
+
+# Article summaries for list views (same projection as backend/server.py)
+EXCERPT_LENGTH = 200
+
+ARTICLE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "author": 1,
+    "section_id": 1,
+    "tags": 1,
+    "likes_count": 1,
+    "created_at": 1,
+    "excerpt": 1,
+    "image_id": 1
+}
+
+def make_excerpt(content: str) -> str:
+    text = " ".join(content.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "..."
+
+def article_summary_fields(article: dict) -> dict:
+    return {"excerpt": make_excerpt(article["content"])}
+
+def decode_image_data(image_data: str, image_name: Optional[str] = None):
+    media_type = None
+    if image_data.startswith("data:"):
+        header, _, image_data = image_data.partition(",")
+        media_type = header[len("data:"):].split(";")[0] or None
+    if media_type is None and image_name:
+        media_type = mimetypes.guess_type(image_name)[0]
+    return base64.b64decode("".join(image_data.split()), validate=True), media_type or "application/octet-stream"
+
+# Media storage (GridFS, same bucket as backend/server.py). Media ids are the
+# SHA-256 of the bytes and media_refs counts the documents pointing at each blob.
+# Refs are only handed out once their blob is stored, with the same upload
+# claim (uploading_at) and stored flag as backend/server.py.
+media_bucket = AsyncIOMotorGridFSBucket(db, bucket_name="media")
+MEDIA_UPLOAD_TIMEOUT = 60
+MEDIA_UPLOAD_POLL_INTERVAL = 0.1
+
+# Variants backend/server.py renders next to each image, as "<id>.<variant>"
+IMAGE_VARIANTS = ["thumb", "avatar", "webp"]
+
+def variant_id(media_id: str, variant: str) -> str:
+    return f"{media_id}.{variant}"
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 5 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 255 * 1024
+
+def media_url(media_id: Optional[str]) -> Optional[str]:
+    return f"/api/media/{media_id}" if media_id else None
+
+# Blobs are shared by everyone uploading the same bytes, so their media type is
+# read from the bytes where possible rather than from whichever upload came first
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, media_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    return None
+
+async def add_media_ref(media_id: str) -> bool:
+    """
+    Count one more reference to a blob; True if the caller has to store the
+    blob, then call media_stored (or media_upload_failed if that fails)
+    """
+    previous = await db.media_refs.find_one_and_update(
+        {"_id": media_id},
+        {"$inc": {"refs": 1}, "$setOnInsert": {"uploading_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if previous is None:
+        return True
+    if previous.get("stored"):
+        return False
+    # Wait for the blob, or take the upload over if it failed or stalled
+    while True:
+        if await media_bucket.find({"_id": media_id}).to_list(1):
+            await media_stored(media_id)
+            return False
+        now = datetime.utcnow()
+        claimed = await db.media_refs.find_one_and_update(
+            {"_id": media_id, "stored": {"$ne": True}, "$or": [
+                {"uploading_at": {"$exists": False}},
+                {"uploading_at": {"$lt": now - timedelta(seconds=MEDIA_UPLOAD_TIMEOUT)}}
+            ]},
+            {"$set": {"uploading_at": now}}
+        )
+        if claimed is not None:
+            return True
+        await asyncio.sleep(MEDIA_UPLOAD_POLL_INTERVAL)
+
+async def media_stored(media_id: str):
+    await db.media_refs.update_one({"_id": media_id}, {"$set": {"stored": True}, "$unset": {"uploading_at": ""}})
+
+async def media_upload_failed(media_id: str):
+    """Give up the upload of a blob, so another uploader of it can store it"""
+    await db.media_refs.update_one({"_id": media_id}, {"$unset": {"uploading_at": ""}})
+    await release_media(media_id)
+
+async def release_media(media_id: Optional[str]):
+    """Drop one reference to a blob, deleting it once nothing points at it"""
+    if not media_id:
+        return
+    media_ref = await db.media_refs.find_one_and_update(
+        {"_id": media_id},
+        {"$inc": {"refs": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if media_ref is not None:
+        if media_ref["refs"] > 0:
+            return
+        result = await db.media_refs.delete_one({"_id": media_id, "refs": {"$lte": 0}})
+        if not result.deleted_count:
+            return  # Referenced again in the meantime
+    for blob_id in [media_id] + [variant_id(media_id, variant) for variant in IMAGE_VARIANTS]:
+        try:
+            await media_bucket.delete(blob_id)
+        except NoFile:
+            pass
+
+async def store_media(content: bytes, content_type: str, filename: Optional[str] = None) -> str:
+    media_id = hashlib.sha256(content).hexdigest()
+    content_type = sniff_media_type(content[:12]) or content_type
+    if await add_media_ref(media_id):
+        try:
+            await media_bucket.upload_from_stream_with_id(
+                media_id,
+                filename or media_id,
+                content,
+                metadata={"content_type": content_type}
+            )
+        except BaseException:
+            await media_upload_failed(media_id)
+            raise
+        await media_stored(media_id)
+    return media_id
+
+async def store_image_data(image_data: Optional[str], image_name: Optional[str] = None) -> Optional[str]:
+    if not image_data:
+        return None
+    try:
+        content, media_type = decode_image_data(image_data, image_name)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    return await store_media(content, media_type, image_name)
+
+async def store_upload(upload: UploadFile) -> str:
+    """Stream a multipart image upload into the media store, keyed by its SHA-256"""
+    content_type = upload.content_type or mimetypes.guess_type(upload.filename or "")[0]
+    if not content_type or not content_type.startswith("image/"):
+        raise HTTPException(status_code=415, detail="Only image uploads are supported")
+    if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if size == 0:
+            content_type = sniff_media_type(chunk[:12]) or content_type
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image is too large")
+        digest.update(chunk)
+    
+    media_id = digest.hexdigest()
+    if not await add_media_ref(media_id):
+        return media_id  # Already stored
+    
+    await upload.seek(0)
+    grid_in = media_bucket.open_upload_stream_with_id(
+        media_id,
+        upload.filename or media_id,
+        chunk_size_bytes=UPLOAD_CHUNK_SIZE,
+        metadata={"content_type": content_type}
+    )
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await grid_in.write(chunk)
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        await media_upload_failed(media_id)
+        raise
+    await media_stored(media_id)
+    return media_id
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -75,7 +360,7 @@ class User(BaseModel):
     email: EmailStr
     full_name: str
     hashed_password: str
-    profile_picture: Optional[str] = None
+    profile_picture_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
 
@@ -95,7 +380,7 @@ class UserResponse(BaseModel):
     username: str
     email: EmailStr
     full_name: str
-    profile_picture: Optional[str] = None
+    profile_picture_url: Optional[str] = None
     created_at: datetime
 
 class Token(BaseModel):
@@ -119,7 +404,7 @@ class Article(BaseModel):
     content: str
     author: str
     section_id: str
-    image_data: Optional[str] = None
+    image_id: Optional[str] = None
     image_name: Optional[str] = None
     likes_count: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -147,13 +432,29 @@ class ArticleResponse(BaseModel):
     content: str
     author: str
     section_id: str
-    image_data: Optional[str] = None
+    image_url: Optional[str] = None
     image_name: Optional[str] = None
     likes_count: int = 0
     created_at: datetime
     updated_at: datetime
     is_liked: Optional[bool] = None
 
+class ArticleSummary(BaseModel):
+    id: str
+    title: str
+    author: str
+    section_id: str
+    tags: List[str] = Field(default_factory=list)
+    likes_count: int = 0
+    created_at: datetime
+    excerpt: str = ""
+    image_url: Optional[str] = None
+    is_liked: Optional[bool] = None
+
+class ArticlePage(BaseModel):
+    items: List[ArticleSummary]
+    next_cursor: Optional[str] = None
+
 class Like(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
@@ -182,11 +483,15 @@ class CommentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     user_full_name: str
-    user_profile_picture: Optional[str] = None
+    user_profile_picture_url: Optional[str] = None
+
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
 
 class SiteSettings(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    logo_data: Optional[str] = None
+    logo_id: Optional[str] = None
     logo_name: Optional[str] = None
     site_name: str = "فرسان العقيدة"
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -206,8 +511,32 @@ async def get_article_with_like_status(article, user_id=None):
         article_dict["is_liked"] = like is not None
     else:
         article_dict["is_liked"] = None
+    article_dict["image_url"] = media_url(article.get("image_id"))
     return ArticleResponse(**article_dict)
 
+# Batched variant for list endpoints: one $in query on likes per page
+async def get_articles_with_like_status(articles, user_id=None):
+    liked_ids = set()
+    if user_id and articles:
+        likes = await db.likes.find(
+            {
+                "user_id": user_id,
+                "article_id": {"$in": [article["id"] for article in articles]}
+            },
+            {"article_id": 1, "_id": 0}
+        ).to_list(None)
+        liked_ids = {like["article_id"] for like in likes}
+    
+    result = []
+    for article in articles:
+        article["is_liked"] = (article["id"] in liked_ids) if user_id else None
+        article["image_url"] = media_url(article.get("image_id"))
+        result.append(ArticleSummary(**article))
+    return result
+
+def get_user_response(user: dict) -> UserResponse:
+    return UserResponse(**user, profile_picture_url=media_url(user.get("profile_picture_id")))
+
 # Authentication endpoints
 @app.post("/register", response_model=Token)
 async def register_user(user: UserCreate):
@@ -227,12 +556,13 @@ async def register_user(user: UserCreate):
     user_dict = user.dict()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
+    user_dict["profile_picture_id"] = await store_image_data(user_dict.pop("profile_picture"))
     user_obj = User(**user_dict)
     
     await db.users.insert_one(user_obj.dict())
     
     access_token = create_access_token(data={"sub": user_obj.id})
-    user_response = UserResponse(**user_obj.dict())
+    user_response = get_user_response(user_obj.dict())
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
 
@@ -246,13 +576,13 @@ async def login_user(user_credentials: UserLogin):
         raise HTTPException(status_code=400, detail="Inactive user")
     
     access_token = create_access_token(data={"sub": user["id"]})
-    user_response = UserResponse(**user)
+    user_response = get_user_response(user)
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
 
 @app.get("/profile", response_model=UserResponse)
 async def get_user_profile(current_user: User = Depends(get_current_user)):
-    return UserResponse(**current_user.dict())
+    return get_user_response(current_user.dict())
 
 @app.put("/profile", response_model=UserResponse)
 async def update_user_profile(
@@ -264,14 +594,26 @@ async def update_user_profile(
     if full_name is not None:
         update_data["full_name"] = full_name
     if profile_picture is not None:
-        update_data["profile_picture"] = profile_picture
+        update_data["profile_picture_id"] = await store_image_data(profile_picture)
     
     if update_data:
         await db.users.update_one({"id": current_user.id}, {"$set": update_data})
+        if "profile_picture_id" in update_data:
+            await release_media(current_user.profile_picture_id)
         updated_user = await db.users.find_one({"id": current_user.id})
-        return UserResponse(**updated_user)
+        return get_user_response(updated_user)
     
-    return UserResponse(**current_user.dict())
+    return get_user_response(current_user.dict())
+
+@app.put("/profile/picture", response_model=UserResponse)
+async def upload_profile_picture(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    picture_id = await store_upload(file)
+    await db.users.update_one({"id": current_user.id}, {"$set": {"profile_picture_id": picture_id}})
+    await release_media(current_user.profile_picture_id)
+    return get_user_response({**current_user.dict(), "profile_picture_id": picture_id})
 
 # Section endpoints
 @app.post("/sections", response_model=Section)
@@ -286,30 +628,42 @@ async def get_sections():
     sections = await db.sections.find().to_list(1000)
     return [Section(**section) for section in sections]
 
+@app.get("/sections/counts", response_model=dict)
+async def get_section_counts():
+    """Number of articles in each section, by section id (index-only counts on section_id)"""
+    return {
+        section["id"]: await db.articles.count_documents({"section_id": section["id"]})
+        async for section in db.sections.find({}, {"_id": 0, "id": 1})
+    }
+
 @app.delete("/sections/{section_id}")
 async def delete_section(section_id: str):
     result = await db.sections.delete_one({"id": section_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Section not found")
+    articles = await db.articles.find({"section_id": section_id}, {"image_id": 1}).to_list(None)
     await db.articles.delete_many({"section_id": section_id})
+    for article in articles:
+        await release_media(article.get("image_id"))
     return {"message": "Section deleted successfully"}
 
 # Article endpoints
 @app.post("/articles", response_model=Article)
 async def create_article(article: ArticleCreate):
     article_dict = article.dict()
+    article_dict["image_id"] = await store_image_data(article_dict.pop("image_data"), article.image_name)
     article_obj = Article(**article_dict)
-    await db.articles.insert_one(article_obj.dict())
+    await db.articles.insert_one({**article_obj.dict(), **article_summary_fields(article_dict)})
     return article_obj
 
-@app.get("/articles", response_model=List[ArticleResponse])
-async def get_articles():
-    articles = await db.articles.find().to_list(1000)
-    result = []
-    for article in articles:
-        article_response = await get_article_with_like_status(article, None)
-        result.append(article_response)
-    return result
+@app.get("/articles", response_model=ArticlePage)
+async def get_articles(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    articles, next_cursor = await paginate(db.articles, {}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+    items = await get_articles_with_like_status(articles, None)
+    return ArticlePage(items=items, next_cursor=next_cursor)
 
 @app.get("/articles/{article_id}", response_model=ArticleResponse)
 async def get_article(article_id: str):
@@ -319,14 +673,15 @@ async def get_article(article_id: str):
     
     return await get_article_with_like_status(article, None)
 
-@app.get("/articles-auth", response_model=List[ArticleResponse])
-async def get_articles_authenticated(current_user: User = Depends(get_current_user)):
-    articles = await db.articles.find().to_list(1000)
-    result = []
-    for article in articles:
-        article_response = await get_article_with_like_status(article, current_user.id)
-        result.append(article_response)
-    return result
+@app.get("/articles-auth", response_model=ArticlePage)
+async def get_articles_authenticated(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    articles, next_cursor = await paginate(db.articles, {}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+    items = await get_articles_with_like_status(articles, current_user.id)
+    return ArticlePage(items=items, next_cursor=next_cursor)
 
 @app.get("/articles-auth/{article_id}", response_model=ArticleResponse)
 async def get_article_authenticated(article_id: str, current_user: User = Depends(get_current_user)):
@@ -344,76 +699,89 @@ async def update_article(article_id: str, article_update: ArticleUpdate):
     
     update_data = {k: v for k, v in article_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
+    if "content" in update_data:
+        update_data["excerpt"] = make_excerpt(update_data["content"])
+    if "image_data" in update_data:
+        image_name = update_data.get("image_name", existing_article.get("image_name"))
+        update_data["image_id"] = await store_image_data(update_data.pop("image_data"), image_name)
     
     await db.articles.update_one({"id": article_id}, {"$set": update_data})
+    if "image_id" in update_data:
+        await release_media(existing_article.get("image_id"))
     updated_article = await db.articles.find_one({"id": article_id})
     return Article(**updated_article)
 
+@app.put("/articles/{article_id}/image", response_model=ArticleResponse)
+async def upload_article_image(article_id: str, file: UploadFile = File(...)):
+    existing_article = await db.articles.find_one({"id": article_id}, {"image_id": 1})
+    if not existing_article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    image_id = await store_upload(file)
+    await db.articles.update_one({"id": article_id}, {"$set": {
+        "image_id": image_id,
+        "image_name": file.filename,
+        "updated_at": datetime.utcnow()
+    }})
+    await release_media(existing_article.get("image_id"))
+    updated_article = await db.articles.find_one({"id": article_id})
+    return await get_article_with_like_status(updated_article)
+
 @app.delete("/articles/{article_id}")
 async def delete_article(article_id: str):
-    result = await db.articles.delete_one({"id": article_id})
-    if result.deleted_count == 0:
+    article = await db.articles.find_one_and_delete({"id": article_id}, {"image_id": 1})
+    if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
+    await release_media(article.get("image_id"))
     await db.likes.delete_many({"article_id": article_id})
     await db.comments.delete_many({"article_id": article_id})
     return {"message": "Article deleted successfully"}
 
-@app.get("/articles/section/{section_id}", response_model=List[ArticleResponse])
-async def get_articles_by_section(section_id: str):
-    articles = await db.articles.find({"section_id": section_id}).to_list(1000)
-    result = []
-    for article in articles:
-        article_response = await get_article_with_like_status(article, None)
-        result.append(article_response)
-    return result
+@app.get("/articles/section/{section_id}", response_model=ArticlePage)
+async def get_articles_by_section(
+    section_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    articles, next_cursor = await paginate(db.articles, {"section_id": section_id}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+    items = await get_articles_with_like_status(articles, None)
+    return ArticlePage(items=items, next_cursor=next_cursor)
 
 # Like endpoints
 @app.post("/articles/{article_id}/like")
 async def like_article(article_id: str, current_user: User = Depends(get_current_user)):
-    article = await db.articles.find_one({"id": article_id})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    existing_like = await db.likes.find_one({
-        "user_id": current_user.id,
-        "article_id": article_id
-    })
-    
-    if existing_like:
-        raise HTTPException(status_code=400, detail="Article already liked")
-    
+    # The unique (user_id, article_id) likes index refuses a second like, as in backend/server.py
     like = Like(user_id=current_user.id, article_id=article_id)
-    await db.likes.insert_one(like.dict())
+    try:
+        await db.likes.insert_one(like.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Article already liked")
     
-    await db.articles.update_one(
+    article = await db.articles.find_one_and_update(
         {"id": article_id},
-        {"$inc": {"likes_count": 1}}
+        {"$inc": {"likes_count": 1}},
+        {"_id": 1}
     )
+    if not article:
+        await db.likes.delete_one({"id": like.id})
+        raise HTTPException(status_code=404, detail="Article not found")
     
     return {"message": "Article liked successfully"}
 
 @app.delete("/articles/{article_id}/like")
 async def unlike_article(article_id: str, current_user: User = Depends(get_current_user)):
-    article = await db.articles.find_one({"id": article_id})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    existing_like = await db.likes.find_one({
+    result = await db.likes.delete_one({
         "user_id": current_user.id,
         "article_id": article_id
     })
-    
-    if not existing_like:
+    if result.deleted_count == 0:
+        if not await db.articles.find_one({"id": article_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Article not found")
         raise HTTPException(status_code=400, detail="Article not liked yet")
     
-    await db.likes.delete_one({
-        "user_id": current_user.id,
-        "article_id": article_id
-    })
-    
     await db.articles.update_one(
-        {"id": article_id},
+        {"id": article_id, "likes_count": {"$gt": 0}},
         {"$inc": {"likes_count": -1}}
     )
     
@@ -436,29 +804,42 @@ async def create_comment(article_id: str, comment: CommentCreate, current_user:
     return CommentResponse(
         **comment_obj.dict(),
         user_full_name=current_user.full_name,
-        user_profile_picture=current_user.profile_picture
+        user_profile_picture_url=media_url(current_user.profile_picture_id)
     )
 
-@app.get("/articles/{article_id}/comments", response_model=List[CommentResponse])
-async def get_article_comments(article_id: str):
-    article = await db.articles.find_one({"id": article_id})
+@app.get("/articles/{article_id}/comments", response_model=CommentPage)
+async def get_article_comments(
+    article_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    article = await db.articles.find_one({"id": article_id}, {"_id": 1})
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    comments = await db.comments.find({"article_id": article_id}).sort("created_at", 1).to_list(1000)
+    comments, next_cursor = await paginate(db.comments, {"article_id": article_id}, limit, cursor, direction=ASCENDING)
+    
+    user_ids = list({comment["user_id"] for comment in comments})
+    users_by_id = {}
+    if user_ids:
+        users = await db.users.find(
+            {"id": {"$in": user_ids}},
+            {"id": 1, "full_name": 1, "profile_picture_id": 1, "_id": 0}
+        ).to_list(None)
+        users_by_id = {user["id"]: user for user in users}
     
     result = []
     for comment in comments:
-        user = await db.users.find_one({"id": comment["user_id"]})
+        user = users_by_id.get(comment["user_id"])
         if user:
             comment_response = CommentResponse(
                 **comment,
                 user_full_name=user["full_name"],
-                user_profile_picture=user.get("profile_picture")
+                user_profile_picture_url=media_url(user.get("profile_picture_id"))
             )
             result.append(comment_response)
     
-    return result
+    return CommentPage(items=result, next_cursor=next_cursor)
 
 @app.put("/comments/{comment_id}", response_model=CommentResponse)
 async def update_comment(comment_id: str, comment_update: CommentUpdate, current_user: User = Depends(get_current_user)):
@@ -478,7 +859,7 @@ async def update_comment(comment_id: str, comment_update: CommentUpdate, current
     return CommentResponse(
         **updated_comment,
         user_full_name=current_user.full_name,
-        user_profile_picture=current_user.profile_picture
+        user_profile_picture_url=media_url(current_user.profile_picture_id)
     )
 
 @app.delete("/comments/{comment_id}")
@@ -497,49 +878,79 @@ async def delete_comment(comment_id: str, current_user: User = Depends(get_curre
     return {"message": "Comment deleted successfully"}
 
 # Logo management endpoints
-@app.get("/settings/logo")
-async def get_site_logo():
-    settings = await db.site_settings.find_one()
+def site_logo_response(settings: Optional[dict]) -> dict:
     if not settings:
         return {
-            "logo_data": None,
+            "logo_url": None,
             "logo_name": None,
             "site_name": "فرسان العقيدة"
         }
     return {
-        "logo_data": settings.get("logo_data"),
+        "logo_url": media_url(settings.get("logo_id")),
         "logo_name": settings.get("logo_name"),
         "site_name": settings.get("site_name", "فرسان العقيدة")
     }
 
-@app.put("/settings/logo")
-async def update_site_logo(logo_update: LogoUpdate):
+async def save_site_logo(update_data: dict) -> dict:
     existing_settings = await db.site_settings.find_one()
     
     if existing_settings:
-        update_data = {}
-        if logo_update.logo_data is not None:
-            update_data["logo_data"] = logo_update.logo_data
-        if logo_update.logo_name is not None:
-            update_data["logo_name"] = logo_update.logo_name
         update_data["updated_at"] = datetime.utcnow()
-        
         await db.site_settings.update_one({"id": existing_settings["id"]}, {"$set": update_data})
+        if "logo_id" in update_data:
+            await release_media(existing_settings.get("logo_id"))
         updated_settings = await db.site_settings.find_one({"id": existing_settings["id"]})
-        return {
-            "logo_data": updated_settings.get("logo_data"),
-            "logo_name": updated_settings.get("logo_name"),
-            "site_name": updated_settings.get("site_name", "فرسان العقيدة")
-        }
-    else:
-        settings_dict = logo_update.dict()
-        settings_obj = SiteSettings(**settings_dict)
-        await db.site_settings.insert_one(settings_obj.dict())
-        return {
-            "logo_data": settings_obj.logo_data,
-            "logo_name": settings_obj.logo_name,
-            "site_name": settings_obj.site_name
+        return site_logo_response(updated_settings)
+    
+    settings_obj = SiteSettings(**update_data)
+    await db.site_settings.insert_one(settings_obj.dict())
+    return site_logo_response(settings_obj.dict())
+
+@app.get("/settings/logo")
+async def get_site_logo():
+    return site_logo_response(await db.site_settings.find_one())
+
+@app.put("/settings/logo")
+async def update_site_logo(logo_update: LogoUpdate):
+    update_data = {}
+    if logo_update.logo_data is not None:
+        update_data["logo_id"] = await store_image_data(logo_update.logo_data, logo_update.logo_name)
+    if logo_update.logo_name is not None:
+        update_data["logo_name"] = logo_update.logo_name
+    return await save_site_logo(update_data)
+
+@app.put("/settings/logo/image")
+async def upload_site_logo(file: UploadFile = File(...)):
+    logo_id = await store_upload(file)
+    return await save_site_logo({"logo_id": logo_id, "logo_name": file.filename})
+
+# Media endpoints
+@app.get("/media/{media_id}")
+async def get_media(media_id: str):
+    try:
+        grid_out = await media_bucket.open_download_stream(media_id)
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    async def read_chunks():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    return StreamingResponse(
+        read_chunks(),
+        media_type=grid_out.metadata["content_type"],
+        headers={
+            "Content-Length": str(grid_out.length),
+            "Cache-Control": "public, max-age=31536000, immutable"
         }
+    )
+
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes()
 
 # Health check
 @app.get("/health")
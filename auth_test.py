@@ -6,6 +6,8 @@ import uuid
 import os
 from dotenv import load_dotenv
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Load environment variables from frontend .env file
@@ -244,6 +246,69 @@ class TestUserAuthentication(unittest.TestCase):
             self.assertEqual(response.status_code, 200, f"Failed to access profile for user {i+1}: {response.text}")
             print(f"Successfully verified token for user {i+1}")
 
+    def test_profile_update_visible_to_token(self):
+        """Test that a profile update is seen by the next authenticated request"""
+        print("\n=== Testing Profile Update With Cached User ===")
+        
+        user_data = {
+            "username": self.username,
+            "email": self.email,
+            "full_name": self.full_name,
+            "password": self.password,
+            "profile_picture": self.sample_image_base64
+        }
+        response = requests.post(f"{API_URL}/register", json=user_data)
+        self.assertEqual(response.status_code, 200, f"Failed to register user: {response.text}")
+        self.created_users.append(response.json()["user"]["id"])
+        auth_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        
+        for full_name in [self.full_name, "Renamed User", "Renamed Again"]:
+            if full_name != self.full_name:
+                response = requests.put(f"{API_URL}/profile", headers=auth_headers, params={"full_name": full_name})
+                self.assertEqual(response.status_code, 200, f"Failed to update profile: {response.text}")
+            response = requests.get(f"{API_URL}/profile", headers=auth_headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["full_name"], full_name)
+        print("Profile updates are visible immediately")
+
+    def test_login_burst(self):
+        """Test that a burst of logins is queued or refused with 503, without blocking other requests"""
+        print("\n=== Testing Login Burst ===")
+        
+        user_data = {
+            "username": self.username,
+            "email": self.email,
+            "full_name": "Burst Test User",
+            "password": self.password,
+            "profile_picture": self.sample_image_base64
+        }
+        response = requests.post(f"{API_URL}/register", json=user_data)
+        self.assertEqual(response.status_code, 200, f"Failed to register user: {response.text}")
+        self.created_users.append(response.json()["user"]["id"])
+        
+        # Only reachable on the backend itself, not through the public proxy
+        metrics_url = f"{BACKEND_URL}/internal/metrics/password-hashing"
+        response = requests.get(f"{API_URL}/metrics/password-hashing")
+        self.assertEqual(response.status_code, 404, "Metrics should not be served under /api")
+        response = requests.get(metrics_url)
+        before = response.json() if response.status_code == 200 else None
+        login_data = {"username": self.username, "password": self.password}
+        with ThreadPoolExecutor(max_workers=40) as executor:
+            logins = [executor.submit(requests.post, f"{API_URL}/login", json=login_data) for _ in range(40)]
+            # Other endpoints keep answering meanwhile
+            response = requests.get(f"{API_URL}/sections", timeout=5)
+            self.assertEqual(response.status_code, 200)
+            statuses = [login.result().status_code for login in logins]
+        
+        print(f"Burst statuses: {Counter(statuses)}")
+        self.assertTrue(set(statuses) <= {200, 503}, f"Unexpected statuses: {Counter(statuses)}")
+        self.assertIn(200, statuses)
+        
+        if before is not None:
+            after = requests.get(metrics_url).json()
+            self.assertEqual(after["completed"] - before["completed"], statuses.count(200))
+            self.assertEqual(after["rejected"] - before["rejected"], statuses.count(503))
+
 if __name__ == "__main__":
     # Run the tests
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -1,19 +1,49 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure, DuplicateKeyError
+from PIL import Image, ImageOps, UnidentifiedImageError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter, OrderedDict
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Callable, List, NamedTuple, Optional, Tuple
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import base64
+import bisect
+import fcntl
+import functools
 import jwt
 from passlib.context import CryptContext
 import hashlib
+import argparse
+import inspect
+import asyncio
+import json
+import mimetypes
+import io
+import math
+import mmap
+import re
+import struct
+import time
+import unicodedata
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Only needed when REDIS_URL is set
+    aioredis = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -23,14 +53,154 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Database indexes
+# Declarative registry of every index the queries below rely on. It is applied
+# idempotently on startup and from the command line (`python server.py ensure-indexes`).
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "sections": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("name_norm", ASCENDING)], name="name_norm"),
+    ],
+    "articles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("section_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="section_id_created_at_id"),
+        IndexModel([("tags", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="tags_created_at_id"),
+        IndexModel([("author_norm", ASCENDING)], name="author_norm"),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "likes": [
+        IndexModel([("user_id", ASCENDING), ("article_id", ASCENDING)], name="user_id_article_id_unique", unique=True),
+        IndexModel([("article_id", ASCENDING)], name="article_id"),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("article_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="article_id_created_at_id"),
+    ],
+    "tag_stats": [
+        IndexModel([("count", DESCENDING), ("_id", ASCENDING)], name="count_id"),
+    ],
+}
+
+async def ensure_indexes():
+    """
+    Create any index from INDEXES that does not exist yet.
+    Existing indexes are left untouched, so this is safe to run repeatedly.
+    """
+    created = {}
+    for collection_name, index_models in INDEXES.items():
+        try:
+            created[collection_name] = await db[collection_name].create_indexes(index_models)
+        except OperationFailure as e:
+            # e.g. duplicate data blocking a unique index; keep serving and report it
+            logger.error("Failed to create indexes on %s: %s", collection_name, e)
+            created[collection_name] = []
+    return created
+
+async def verify_indexes():
+    """
+    Compare the indexes present in the database against INDEXES.
+    Reports indexes that are missing, present but not registered, and
+    registered indexes that have not served a single operation since the
+    server started (from $indexStats).
+    """
+    report = {}
+    for collection_name, index_models in INDEXES.items():
+        collection = db[collection_name]
+        expected = {model.document["name"] for model in index_models}
+        existing = set((await collection.index_information()).keys()) - {"_id_"}
+        
+        unused = []
+        try:
+            stats = await collection.aggregate([{"$indexStats": {}}]).to_list(None)
+            unused = sorted(
+                stat["name"] for stat in stats
+                if stat["name"] in expected and stat["accesses"]["ops"] == 0
+            )
+        except OperationFailure:
+            # $indexStats needs the clusterMonitor role on some deployments
+            pass
+        
+        report[collection_name] = {
+            "missing": sorted(expected - existing),
+            "unregistered": sorted(existing - expected),
+            "unused": unused
+        }
+    return report
+
 # JWT Configuration
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
 # Password hashing
+# bcrypt spends 100-300 ms of CPU per hash or check, so it runs in a thread
+# pool of its own (bcrypt releases the GIL) rather than on the event loop. At
+# most PASSWORD_WORKERS hashes run at once and PASSWORD_QUEUE_LIMIT more wait;
+# beyond that /login and /register answer 503 straight away, so a burst of
+# logins slows down logins only. /internal/metrics/password-hashing reports
+# how busy the pool is; it is outside /api, so the proxies in front of the
+# backend (which forward /api only) keep it off the public site.
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+PASSWORD_WORKERS = int(os.environ.get("PASSWORD_WORKERS", 2))
+PASSWORD_QUEUE_LIMIT = int(os.environ.get("PASSWORD_QUEUE_LIMIT", 16))
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0  # running and waiting
+        self.stats = Counter()  # completed, rejected, wait_seconds, run_seconds
+
+    async def run(self, function, *args):
+        """function(*args) in the pool, or a 503 if too much work is already waiting"""
+        if self.pending >= self.workers + self.queue_limit:
+            self.stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+        
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        
+        def timed():
+            started_at = time.monotonic()
+            return started_at, function(*args), time.monotonic()
+        
+        def release():
+            self.pending -= 1
+        
+        # Counted until the hash finishes, even when the request is cancelled first
+        self.pending += 1
+        future = self.pool.submit(timed)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+        started_at, result, finished_at = await asyncio.wrap_future(future)
+        self.stats["completed"] += 1
+        self.stats["wait_seconds"] += started_at - queued_at
+        self.stats["run_seconds"] += finished_at - started_at
+        return result
+
+    def metrics(self) -> dict:
+        completed = self.stats["completed"] or 1
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "running": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "completed": self.stats["completed"],
+            "rejected": self.stats["rejected"],
+            "average_wait_ms": round(self.stats["wait_seconds"] / completed * 1000, 1),
+            "average_run_ms": round(self.stats["run_seconds"] / completed * 1000, 1)
+        }
+
+password_hasher = PasswordHasher(PASSWORD_WORKERS, PASSWORD_QUEUE_LIMIT)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -54,18 +224,1472 @@ def create_access_token(data: dict):
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
+        user_id = await token_user_id(credentials.credentials)
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    user = await db.users.find_one({"id": user_id})
+    user = await get_cached_user(user_id)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """The caller on public endpoints, None when anonymous or not authenticated properly"""
+    if credentials is None:
+        return None
+    try:
+        return await get_current_user(credentials)
+    except HTTPException:
+        return None
+
+# Keyset pagination
+# List endpoints page on (created_at, id) rather than skip/offset, so fetching
+# page N costs the same index seek as page 1. The cursor handed to clients is
+# the opaque, url-safe encoding of the last document's sort key.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(document):
+    key = {"created_at": document["created_at"].isoformat(), "id": document["id"]}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(key["created_at"]), key["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(collection, query: dict, limit: int, cursor: Optional[str] = None, direction: int = DESCENDING, projection=None):
+    """
+    Return one page of documents matching query, ordered by (created_at, id)
+    in the given direction, together with the cursor of the next page (None
+    on the last page).
+    """
+    if cursor:
+        created_at, document_id = decode_cursor(cursor)
+        operator = "$lt" if direction == DESCENDING else "$gt"
+        query = {"$and": [query, {"$or": [
+            {"created_at": {operator: created_at}},
+            {"created_at": created_at, "id": {operator: document_id}}
+        ]}]}
+    
+    # Fetch one extra document to know whether another page exists
+    documents = await collection.find(query, projection).sort(
+        [("created_at", direction), ("id", direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    return documents[:limit], next_cursor
+
+# Conditional requests
+# Read endpoints send an ETag and Last-Modified and answer If-None-Match /
+# If-Modified-Since with 304. Single documents are versioned by their
+# updated_at, lists by a per-collection generation counter that every write
+# to the collection bumps.
+async def bump_generation(*names: str) -> dict:
+    """Advance the generations of names, and return their new values"""
+    now = datetime.utcnow()
+    values = {}
+    for name in names:
+        generation = await db.generations.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"value": 1}, "$set": {"updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        values[name] = generation["value"]
+    return values
+
+async def get_generation(name: str) -> dict:
+    return await db.generations.find_one({"_id": name}) or {"_id": name, "value": 0, "updated_at": None}
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:32] + '"'
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Takes precedence over If-Modified-Since; proxies may weaken the tag
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None, vary: Optional[str] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if vary:
+        headers["Vary"] = vary
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    vary: Optional[str] = None
+) -> Optional[Response]:
+    """Set the validators on response; return a 304 to send instead if the client is up to date"""
+    headers = validator_headers(etag, last_modified, vary)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# Response cache
+# Hot read endpoints cache their serialized JSON under a key tagged with what
+# it was built from ("sections", "articles", "section:<id>", ...). Each tag has
+# a version that is part of the cache key, so a write invalidates exactly the
+# entries it affects by bumping the versions of its tags. There are two tiers:
+# a bounded in-process LRU with a TTL, and an optional Redis tier (REDIS_URL)
+# that also holds the tag versions, so invalidations reach every worker.
+# Endpoints sending an ETag made from a generation put that generation in the
+# key too: without Redis another worker's tag versions lag until the TTL, and
+# the body sent must always be the one the ETag names.
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 60))
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))
+
+class MemoryCache:
+    """Bounded LRU cache whose entries expire after a TTL"""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.counters = {}
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    async def get_counters(self, names: List[str]) -> List[int]:
+        return [self.counters.get(name, 0) for name in names]
+    
+    async def incr_counters(self, names: List[str]):
+        for name in names:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+class RedisCache:
+    """The same interface backed by a Redis server shared by all workers"""
+    def __init__(self, url: str, prefix: str = "fursan:"):
+        self.redis = aioredis.from_url(url)
+        self.prefix = prefix
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(self.prefix + key)
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.redis.set(self.prefix + key, value, ex=ttl)
+    
+    async def get_counters(self, names: List[str]) -> List[int]:
+        values = await self.redis.mget([f"{self.prefix}tag:{name}" for name in names])
+        return [int(value or 0) for value in values]
+    
+    async def incr_counters(self, names: List[str]):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.incr(f"{self.prefix}tag:{name}")
+            await pipe.execute()
+
+class ResponseCache:
+    def __init__(self, local: MemoryCache, shared=None, ttl: int = RESPONSE_CACHE_TTL):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+    
+    async def versioned_key(self, key: str, tags: List[str]) -> str:
+        versions = await (self.shared or self.local).get_counters(tags)
+        return key + "|" + ",".join(f"{tag}={version}" for tag, version in zip(tags, versions))
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                await self.local.set(key, value, self.ttl)
+        return value
+    
+    async def set(self, key: str, value: bytes):
+        await self.local.set(key, value, self.ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.ttl)
+    
+    async def invalidate(self, *tags: str):
+        await (self.shared or self.local).incr_counters(list(tags))
+
+response_cache = ResponseCache(
+    MemoryCache(RESPONSE_CACHE_SIZE),
+    RedisCache(os.environ["REDIS_URL"]) if os.environ.get("REDIS_URL") else None
+)
+
+async def cached_json(key: str, tags: List[str], build, headers: Optional[dict] = None) -> Response:
+    """Serve key from the response cache, calling build() to produce it on a miss"""
+    try:
+        versioned_key = await response_cache.versioned_key(key, tags)
+        body = await response_cache.get(versioned_key)
+    except Exception:
+        logger.exception("Response cache lookup failed for %s", key)
+        versioned_key = body = None
+    
+    if body is None:
+        body = json.dumps(jsonable_encoder(await build()), ensure_ascii=False, separators=(",", ":")).encode()
+        if versioned_key is not None:
+            try:
+                await response_cache.set(versioned_key, body)
+            except Exception:
+                logger.exception("Response cache store failed for %s", key)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Endpoints serving anonymous callers from the cache answer others differently
+VARY_AUTHORIZATION = {"Vary": "Authorization"}
+
+async def invalidate_cache(*tags: str):
+    try:
+        await response_cache.invalidate(*tags)
+    except Exception:
+        logger.exception("Response cache invalidation failed for %s", tags)
+
+# Article summaries
+# List views only render cards, so they read a fixed projection that keeps
+# the article content inside MongoDB. The excerpt it relies on is computed
+# whenever an article is written.
+EXCERPT_LENGTH = 200
+
+ARTICLE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "author": 1,
+    "section_id": 1,
+    "tags": 1,
+    "likes_count": 1,
+    "created_at": 1,
+    "excerpt": 1,
+    "image_id": 1
+}
+
+def make_excerpt(content: str) -> str:
+    text = " ".join(content.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "..."
+
+def article_summary_fields(article: dict) -> dict:
+    """Denormalized fields stored on each article for the summary projection"""
+    return {"excerpt": make_excerpt(article["content"])}
+
+def decode_image_data(image_data: str, image_name: Optional[str] = None):
+    """Return the raw bytes and media type of a base64 (or data: URL) image"""
+    media_type = None
+    if image_data.startswith("data:"):
+        header, _, image_data = image_data.partition(",")
+        media_type = header[len("data:"):].split(";")[0] or None
+    if media_type is None and image_name:
+        media_type = mimetypes.guess_type(image_name)[0]
+    return base64.b64decode("".join(image_data.split()), validate=True), media_type or "application/octet-stream"
+
+# Arabic normalization
+# Text is folded so that spelling variants compare equal: hamza carriers reduce
+# to their bare letter, ta marbuta to ha, alef maksura to ya, and tashkeel and
+# tatweel are dropped. Article search folds terms into the BM25 index (see
+# search_term); the fields still matched in MongoDB, the author filter of
+# /search and section names and descriptions, are stored a second time folded
+# in a "<field>_norm" field, so queries need neither case-insensitive matching
+# nor per-letter alternations. `python server.py backfill-normalized` fills
+# them in for existing documents, and drops those no longer queried.
+ARABIC_MARKS = {
+    "ـ": None,  # tatweel
+    **{chr(mark): None for mark in range(0x064B, 0x0660)},  # tashkeel and hamza/madda marks
+    "\u0670": None,  # superscript alef
+}
+ARABIC_MARK_REMOVAL = str.maketrans(ARABIC_MARKS)
+ARABIC_FOLDING = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ؤ": "و",
+    "ئ": "ي", "ى": "ي",
+    "ة": "ه",
+    **ARABIC_MARKS
+})
+
+# Fields stored normalized, per collection
+NORMALIZED_FIELDS = {
+    "articles": ["author"],
+    "sections": ["name", "description"],
+}
+# Stored normalized by versions that searched articles with $regex
+UNUSED_NORMALIZED_FIELDS = {
+    "articles": ["title", "content", "tags"],
+}
+
+def normalize_arabic(text: str) -> str:
+    """Fold text for matching: presentation forms, hamza, ta marbuta, alef maksura, case and spacing"""
+    text = unicodedata.normalize("NFKC", text).translate(ARABIC_FOLDING).casefold()
+    return " ".join(text.split())
+
+def strip_arabic_marks(text: str) -> str:
+    """Drop tashkeel and tatweel but keep the spelling, e.g. to show words back to users"""
+    return unicodedata.normalize("NFKC", text).translate(ARABIC_MARK_REMOVAL)
+
+def normalized_fields(collection_name: str, document: dict) -> dict:
+    """The "<field>_norm" values for whichever normalized fields document sets"""
+    fields = {}
+    for field in NORMALIZED_FIELDS[collection_name]:
+        value = document.get(field)
+        if isinstance(value, list):
+            fields[f"{field}_norm"] = [normalize_arabic(item) for item in value]
+        elif value is not None:
+            fields[f"{field}_norm"] = normalize_arabic(value)
+    return fields
+
+def normalized_regex(text: str) -> dict:
+    """A query matching documents whose normalized field contains text"""
+    return {"$regex": re.escape(normalize_arabic(text))}
+
+# Search index
+# /search ranks articles with BM25 over an inverted index of their normalized
+# words, weighting title, tags and author matches above content matches. Words
+# lose a leading definite article, so "الصلاة" and "صلاة" are the same term, and
+# every query word also matches the words it is a prefix of.
+#
+# The index is a list of immutable segments plus an in-memory segment taking
+# new writes. Replacing or deleting an article marks its old copy deleted in
+# the segment holding it. Segments are persisted in SEARCH_INDEX_DIR as files
+# that are opened with mmap, so a process starts from them and only reads the
+# articles written since the manifest was saved from MongoDB. The memory
+# segment is written out as a small new segment once it holds
+# SEARCH_FLUSH_ARTICLES articles, and past SEARCH_MAX_SEGMENTS segments they
+# are merged in the background. One process (holding write.lock) writes the
+# directory; the others reload it when its manifest changes. Writes made by
+# other processes are picked up from the "articles" generation before the
+# next search.
+SEARCH_FIELD_WEIGHTS = {"title": 3.0, "tags": 2.5, "author": 1.5, "content": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Most index terms a single query word expands to as a prefix
+SEARCH_PREFIX_EXPANSIONS = 64
+# Re-read articles updated this long before the last sync, to tolerate clock
+# skew between the workers that stamp updated_at
+SEARCH_SYNC_MARGIN = timedelta(seconds=5)
+DEFINITE_ARTICLE_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+# Empty to keep the index in memory only
+SEARCH_INDEX_DIR = os.environ.get("SEARCH_INDEX_DIR", str(ROOT_DIR / "search_index"))
+SEARCH_FLUSH_ARTICLES = int(os.environ.get("SEARCH_FLUSH_ARTICLES", "256"))
+SEARCH_MAX_SEGMENTS = int(os.environ.get("SEARCH_MAX_SEGMENTS", "8"))
+
+SEARCH_INDEX_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "content": 1,
+    "author": 1,
+    "tags": 1,
+    "section_id": 1,
+    "created_at": 1
+}
+
+@functools.lru_cache(maxsize=65536)
+def search_term(word: str) -> str:
+    """The index term of a normalized word: the word without a definite article"""
+    for prefix in DEFINITE_ARTICLE_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+            return word[len(prefix):]
+    return word
+
+def search_terms(text: str) -> dict:
+    """Count the index terms of text"""
+    terms = {}
+    for word, count in Counter(re.findall(r"\w+", normalize_arabic(text))).items():
+        term = search_term(word)
+        terms[term] = terms.get(term, 0) + count
+    return terms
+
+class IndexedArticle(NamedTuple):
+    section_id: str
+    author: str
+    author_norm: str
+    tags: List[str]
+    created_at: datetime
+    length: float
+    terms: Tuple[str, ...] = ()
+
+class MemorySegment:
+    """The segment taking new writes, and the form segments are built in"""
+    def __init__(self):
+        self.postings = {}  # term -> {article id: weighted term frequency}
+        self.articles = {}  # article id -> IndexedArticle
+        self.total_length = 0.0
+        self.vocabulary = None  # sorted terms, rebuilt on demand after new terms appear
+        self.deleted = set()
+        self.deleted_length = 0.0
+
+    def add(self, article: dict):
+        frequencies = {}
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            value = article.get(field) or ""
+            for term, count in search_terms(" ".join(value) if isinstance(value, list) else value).items():
+                frequencies[term] = frequencies.get(term, 0.0) + weight * count
+        self.add_postings(article["id"], IndexedArticle(
+            section_id=article.get("section_id"),
+            author=article.get("author") or "",
+            author_norm=normalize_arabic(article.get("author") or ""),
+            tags=article.get("tags") or [],
+            created_at=article.get("created_at"),
+            length=sum(frequencies.values())
+        ), frequencies)
+
+    def add_postings(self, article_id: str, indexed: IndexedArticle, frequencies: dict):
+        for term, frequency in frequencies.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self.vocabulary = None
+            self.postings[term][article_id] = frequency
+        self.articles[article_id] = indexed._replace(terms=tuple(frequencies))
+        self.total_length += indexed.length
+
+    def remove(self, article_id: str):
+        indexed = self.articles.pop(article_id)
+        self.total_length -= indexed.length
+        for term in indexed.terms:
+            postings = self.postings[term]
+            del postings[article_id]
+            if not postings:
+                del self.postings[term]
+                self.vocabulary = None
+
+    def delete(self, article_id: str):
+        """Hide an article without rewriting the segment"""
+        self.deleted.add(article_id)
+        self.deleted_length += self.articles[article_id].length
+
+    def expand(self, prefix: str) -> List[str]:
+        """The terms prefix is a prefix of, in order"""
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        expansions = []
+        for candidate in self.vocabulary[start:start + SEARCH_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(prefix):
+                break
+            expansions.append(candidate)
+        return expansions
+
+    def term_postings(self, term: str):
+        return self.postings.get(term, {}).items()
+
+    def all_postings(self):
+        return ((term, postings.items()) for term, postings in self.postings.items())
+
+# Segment files: a header, the articles as a JSON array (in id order, so an
+# article's position is its document number), the term dictionary as entries
+# sorted by their UTF-8 bytes with a fixed-width offset table for binary
+# search, then each term's postings as varint pairs of document number delta
+# and weighted frequency (in hundredths).
+SEGMENT_MAGIC = b"FSEG"
+SEGMENT_VERSION = 2
+SEGMENT_HEADER = struct.Struct("<4sIIIQQQQ")  # magic, version, articles, terms, then offsets of articles, terms, term offsets, postings
+SEGMENT_TERM = struct.Struct("<IQI")  # document frequency, postings offset, postings length
+SEGMENT_OFFSET = struct.Struct("<Q")
+FREQUENCY_SCALE = 100
+
+def encode_varint(value: int, buffer: bytearray):
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def write_segment(path: Path, segment: MemorySegment):
+    """Write the live articles of segment to path"""
+    ids = sorted(article_id for article_id in segment.articles if article_id not in segment.deleted)
+    numbers = {article_id: number for number, article_id in enumerate(ids)}
+    articles = json.dumps([
+        [
+            article_id,
+            indexed.section_id,
+            indexed.author,
+            indexed.author_norm,
+            indexed.tags,
+            indexed.created_at.isoformat() if indexed.created_at else None,
+            indexed.length
+        ]
+        for article_id, indexed in ((article_id, segment.articles[article_id]) for article_id in ids)
+    ], ensure_ascii=False, separators=(",", ":")).encode()
+
+    terms = bytearray()
+    term_offsets = []
+    postings = bytearray()
+    for term, encoded in sorted(((term, term.encode()) for term, _ in segment.all_postings()), key=lambda item: item[1]):
+        entries = sorted(
+            (numbers[article_id], frequency)
+            for article_id, frequency in segment.term_postings(term) if article_id in numbers
+        )
+        if not entries:
+            continue
+        start = len(postings)
+        previous = 0
+        for number, frequency in entries:
+            encode_varint(number - previous, postings)
+            encode_varint(round(frequency * FREQUENCY_SCALE), postings)
+            previous = number
+        term_offsets.append(len(terms))
+        terms += struct.pack("<H", len(encoded)) + encoded + SEGMENT_TERM.pack(len(entries), start, len(postings) - start)
+
+    articles_offset = SEGMENT_HEADER.size
+    terms_offset = articles_offset + len(articles)
+    term_offsets_offset = terms_offset + len(terms)
+    postings_offset = term_offsets_offset + SEGMENT_OFFSET.size * len(term_offsets)
+    temporary_path = path.with_suffix(".tmp")
+    with open(temporary_path, "wb") as f:
+        f.write(SEGMENT_HEADER.pack(
+            SEGMENT_MAGIC, SEGMENT_VERSION, len(ids), len(term_offsets),
+            articles_offset, terms_offset, term_offsets_offset, postings_offset
+        ))
+        f.write(articles)
+        f.write(terms)
+        for offset in term_offsets:
+            f.write(SEGMENT_OFFSET.pack(terms_offset + offset))
+        f.write(postings)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+class DiskSegment:
+    """A segment file, read through mmap"""
+    def __init__(self, path: Path):
+        self.name = path.name
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.term_count, articles_offset, terms_offset,
+         self.term_offsets_offset, self.postings_offset) = SEGMENT_HEADER.unpack_from(self.buffer)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a version {SEGMENT_VERSION} search segment")
+
+        self.ids = []
+        self.articles = {}
+        for article_id, section_id, author, author_norm, tags, created_at, length in json.loads(self.buffer[articles_offset:terms_offset]):
+            self.ids.append(article_id)
+            self.articles[article_id] = IndexedArticle(
+                section_id=section_id,
+                author=author,
+                author_norm=author_norm,
+                tags=tags,
+                created_at=datetime.fromisoformat(created_at) if created_at else None,
+                length=length
+            )
+        self.total_length = sum(indexed.length for indexed in self.articles.values())
+        self.deleted = set()
+        self.deleted_length = 0.0
+
+    def delete(self, article_id: str):
+        self.deleted.add(article_id)
+        self.deleted_length += self.articles[article_id].length
+
+    def close(self):
+        self.buffer.close()
+
+    def term_entry(self, position: int):
+        """(term bytes, document frequency, postings offset, postings length) of the term at position"""
+        offset = SEGMENT_OFFSET.unpack_from(self.buffer, self.term_offsets_offset + SEGMENT_OFFSET.size * position)[0]
+        length = struct.unpack_from("<H", self.buffer, offset)[0]
+        encoded = self.buffer[offset + 2:offset + 2 + length]
+        return (encoded, *SEGMENT_TERM.unpack_from(self.buffer, offset + 2 + length))
+
+    def find(self, encoded: bytes) -> int:
+        """Position of the first term not below encoded"""
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term_entry(middle)[0] < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def expand(self, prefix: str) -> List[str]:
+        encoded_prefix = prefix.encode()
+        expansions = []
+        position = self.find(encoded_prefix)
+        while position < self.term_count and len(expansions) < SEARCH_PREFIX_EXPANSIONS:
+            encoded = self.term_entry(position)[0]
+            if not encoded.startswith(encoded_prefix):
+                break
+            expansions.append(encoded.decode())
+            position += 1
+        return expansions
+
+    def lookup(self, term: str):
+        encoded = term.encode()
+        position = self.find(encoded)
+        if position < self.term_count:
+            entry = self.term_entry(position)
+            if entry[0] == encoded:
+                return entry
+        return None
+
+    def decode_postings(self, offset: int, length: int):
+        data = self.buffer[self.postings_offset + offset:self.postings_offset + offset + length]
+        number = 0
+        value = shift = 0
+        delta = None
+        for byte in data:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            if delta is None:
+                delta = value
+            else:
+                number += delta
+                yield self.ids[number], value / FREQUENCY_SCALE
+                delta = None
+            value = shift = 0
+
+    def term_postings(self, term: str):
+        entry = self.lookup(term)
+        return self.decode_postings(entry[2], entry[3]) if entry else ()
+
+    def all_postings(self):
+        for position in range(self.term_count):
+            encoded, _, offset, length = self.term_entry(position)
+            yield encoded.decode(), self.decode_postings(offset, length)
+
+def merge_segments(path: Path, segments: list):
+    """Write the live articles of segments, oldest first, to one segment file at path"""
+    merged = MemorySegment()
+    frequencies = {}
+    for segment in segments:
+        for term, postings in segment.all_postings():
+            for article_id, frequency in postings:
+                if article_id not in segment.deleted:
+                    frequencies.setdefault(article_id, {})[term] = frequency
+        for article_id, indexed in segment.articles.items():
+            if article_id in frequencies:
+                merged.add_postings(article_id, indexed, frequencies.pop(article_id))
+    write_segment(path, merged)
+
+class SearchIndex:
+    def __init__(self):
+        self.memory = MemorySegment()
+        self.segments = []  # immutable segments, oldest first
+        self.generation = None  # "articles" generation the index reflects
+        self.synced_at = None
+        self.manifest_mtime = None  # of the manifest the segments were loaded from
+        self.next_segment = 1
+        self.dirty = False  # deletions not yet in the manifest
+
+    def add(self, article: dict):
+        """Index article, replacing any earlier version of it"""
+        self.remove(article["id"])
+        self.memory.add(article)
+
+    def remove(self, article_id: str):
+        if article_id in self.memory.articles:
+            self.memory.remove(article_id)
+        for segment in self.segments:
+            if article_id in segment.articles and article_id not in segment.deleted:
+                segment.delete(article_id)
+                self.dirty = True
+
+    def article(self, article_id: str) -> Optional[IndexedArticle]:
+        if article_id in self.memory.articles:
+            return self.memory.articles[article_id]
+        for segment in reversed(self.segments):
+            if article_id in segment.articles and article_id not in segment.deleted:
+                return segment.articles[article_id]
+        return None
+
+    def live_segments(self) -> list:
+        return [*self.segments, self.memory]
+
+    def __len__(self):
+        return sum(len(segment.articles) - len(segment.deleted) for segment in self.live_segments())
+
+    def knows(self, term: str) -> bool:
+        """Whether some indexed term starts with term"""
+        return any(segment.expand(term) for segment in self.live_segments())
+
+    def search(
+        self,
+        query: str,
+        matches: Callable[[IndexedArticle], bool] = lambda article: True,
+        similar: Callable[[str], List[Tuple[str, float]]] = lambda term: []
+    ) -> List[Tuple[str, float]]:
+        """
+        (article id, BM25 score) of the articles matching every query term, best first.
+        Terms no indexed term starts with match the terms similar(term) returns
+        instead, their scores scaled by the similarity.
+        """
+        terms = list(search_terms(query))
+        segments = self.live_segments()
+        count = len(self)
+        if not terms or not count:
+            return []
+
+        average_length = sum(segment.total_length - segment.deleted_length for segment in segments) / count or 1.0
+        scores = None
+        for term in terms:
+            # A query word scores by its best matching index term in each article
+            expansions = [
+                (expansion, 1.0)
+                for expansion in sorted({expansion for segment in segments for expansion in segment.expand(term)})[:SEARCH_PREFIX_EXPANSIONS]
+            ] or similar(term)
+            term_scores = {}
+            for expansion, weight in expansions:
+                postings = [
+                    (article_id, frequency, segment.articles[article_id].length)
+                    for segment in segments
+                    for article_id, frequency in segment.term_postings(expansion)
+                    if article_id not in segment.deleted
+                ]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for article_id, frequency, length in postings:
+                    score = weight * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+                    if score > term_scores.get(article_id, 0.0):
+                        term_scores[article_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {article_id: score + term_scores[article_id] for article_id, score in scores.items() if article_id in term_scores}
+            if not scores:
+                return []
+
+        hits = [(article_id, score) for article_id, score in scores.items() if matches(self.article(article_id))]
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits
+
+search_index = SearchIndex()
+search_index_lock = asyncio.Lock()
+search_segments_lock = asyncio.Lock()  # serializes flushes and merges
+search_index_tasks = set()
+search_index_writer = None  # the held write.lock, in the process writing SEARCH_INDEX_DIR
+
+def search_index_path(name: str) -> Path:
+    return Path(SEARCH_INDEX_DIR) / name
+
+def acquire_search_index_writer() -> bool:
+    """Become the process writing SEARCH_INDEX_DIR, unless another one already is"""
+    global search_index_writer
+    if not SEARCH_INDEX_DIR or search_index_writer is not None:
+        return search_index_writer is not None
+    try:
+        os.makedirs(SEARCH_INDEX_DIR, exist_ok=True)
+        lock = open(search_index_path("write.lock"), "a")
+    except OSError as e:
+        logger.warning("Search index directory %s is not writable: %s", SEARCH_INDEX_DIR, e)
+        return False
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return False
+    search_index_writer = lock
+    return True
+
+def manifest_mtime() -> Optional[float]:
+    try:
+        return os.stat(search_index_path("manifest.json")).st_mtime_ns
+    except OSError:
+        return None
+
+def load_search_index() -> Optional[SearchIndex]:
+    """Open the persisted index, or None if there is none (or it is unreadable)"""
+    index = SearchIndex()
+    try:
+        mtime = manifest_mtime()
+        manifest = json.loads(search_index_path("manifest.json").read_text())
+        for entry in manifest["segments"]:
+            segment = DiskSegment(search_index_path(entry["name"]))
+            index.segments.append(segment)
+            for article_id in entry["deleted"]:
+                segment.delete(article_id)
+    except (OSError, ValueError, KeyError) as e:
+        for segment in index.segments:
+            segment.close()
+        if not isinstance(e, FileNotFoundError):
+            logger.warning("Ignoring unreadable search index in %s: %s", SEARCH_INDEX_DIR, e)
+        return None
+    index.generation = manifest["generation"]
+    index.synced_at = datetime.fromisoformat(manifest["synced_at"])
+    index.manifest_mtime = mtime
+    index.next_segment = manifest["next_segment"]
+    return index
+
+def save_search_manifest(index: SearchIndex, generation: int, synced_at: datetime):
+    """
+    Record the disk segments of index as covering the articles written up to
+    the given generation and sync time, and delete segment files it no longer uses
+    """
+    manifest = {
+        "generation": generation,
+        "synced_at": synced_at.isoformat(),
+        "next_segment": index.next_segment,
+        "segments": [
+            {"name": segment.name, "deleted": sorted(segment.deleted)}
+            for segment in index.segments
+        ]
+    }
+    temporary_path = search_index_path("manifest.tmp")
+    temporary_path.write_text(json.dumps(manifest, ensure_ascii=False))
+    os.replace(temporary_path, search_index_path("manifest.json"))
+    index.manifest_mtime = manifest_mtime()
+    index.dirty = False
+
+    names = {segment.name for segment in index.segments}
+    for path in Path(SEARCH_INDEX_DIR).glob("segment-*.fseg"):
+        if path.name not in names:
+            path.unlink(missing_ok=True)
+
+async def write_search_segment(index: SearchIndex, build) -> DiskSegment:
+    """Run build(path) in a thread for the next segment file of index, and open the result"""
+    name = f"segment-{index.next_segment:06d}.fseg"
+    index.next_segment += 1
+    await asyncio.to_thread(build, search_index_path(name))
+    return DiskSegment(search_index_path(name))
+
+async def flush_search_index():
+    """Persist the memory segment of search_index as a new segment, then merge if there are too many"""
+    if search_index_writer is None:
+        return
+    async with search_segments_lock:
+        index = search_index
+        if index.synced_at is None or not (index.memory.articles or index.dirty):
+            return
+        # What the disk segments cover: searches syncing while they are written
+        # add articles to the new memory segment only
+        generation, synced_at = index.generation, index.synced_at
+        if index.memory.articles:
+            # Freeze the memory segment; articles removed while it is being
+            # written are marked deleted in it and carried over to the file
+            frozen = index.memory
+            index.memory = MemorySegment()
+            index.segments.append(frozen)
+            segment = await write_search_segment(index, lambda path: write_segment(path, frozen))
+            for article_id in frozen.deleted:
+                if article_id in segment.articles:
+                    segment.delete(article_id)
+            index.segments[index.segments.index(frozen)] = segment
+
+        if len(index.segments) > SEARCH_MAX_SEGMENTS:
+            # Merge the newer segments into one, and the oldest too once they
+            # outweigh it, so each article is rewritten a logarithmic number of times
+            sizes = [len(segment.articles) for segment in index.segments]
+            start = 1 if sizes[0] > sum(sizes[1:]) else 0
+            sources = index.segments[start:]
+            deleted = [set(source.deleted) for source in sources]
+            merged = await write_search_segment(index, lambda path: merge_segments(path, sources))
+            for source, deleted_before in zip(sources, deleted):
+                for article_id in source.deleted - deleted_before:
+                    if article_id in merged.articles:
+                        merged.delete(article_id)
+            index.segments = [*index.segments[:start], merged]
+            for source in sources:
+                source.close()
+
+        if index is search_index:
+            save_search_manifest(index, generation, synced_at)
+
+def schedule_search_flush():
+    if search_index_writer is not None and len(search_index.memory.articles) >= SEARCH_FLUSH_ARTICLES:
+        task = asyncio.create_task(flush_search_index())
+        search_index_tasks.add(task)
+        task.add_done_callback(search_index_tasks.discard)
+
+async def sync_search_index():
+    """Bring search_index up to date with writes made since it was last synced"""
+    global search_index
+    async with search_index_lock:
+        index = search_index
+        if SEARCH_INDEX_DIR and (
+            index.synced_at is None
+            or (search_index_writer is None and manifest_mtime() != index.manifest_mtime)
+        ):
+            # Start from the persisted segments, or pick up the writer's latest ones
+            index = await asyncio.to_thread(load_search_index) or index
+
+        generation = await get_generation("articles")
+        if index.synced_at is None or index.generation != generation["value"]:
+            started_at = datetime.utcnow()
+            if index.synced_at is None:
+                async for article in db.articles.find({}, SEARCH_INDEX_PROJECTION):
+                    index.add(article)
+            else:
+                async for article in db.articles.find(
+                    {"updated_at": {"$gte": index.synced_at - SEARCH_SYNC_MARGIN}},
+                    SEARCH_INDEX_PROJECTION
+                ):
+                    index.add(article)
+                if len(index) != await db.articles.count_documents({}):
+                    # Some articles were deleted
+                    live_ids = set(await db.articles.distinct("id"))
+                    for segment in index.live_segments():
+                        for article_id in set(segment.articles) - segment.deleted - live_ids:
+                            index.remove(article_id)
+            index.generation = generation["value"]
+            index.synced_at = started_at
+
+        if index is not search_index:
+            for segment in search_index.segments:
+                if segment not in index.segments and isinstance(segment, DiskSegment):
+                    segment.close()
+            search_index = index
+    schedule_search_flush()
+
+# Spelling correction
+# Query words that match nothing in the search index are looked up by
+# character trigram similarity among the words of titles, authors, tags and
+# section names, the vocabulary of the suggestion index, which keeps this index
+# up to date. /search then matches the closest words instead, scaled by their
+# similarity, and offers the corrected query as "did_you_mean".
+SPELLING_MIN_LENGTH = 3
+SPELLING_SIMILARITY = 0.25  # minimum Jaccard similarity of trigram sets
+SPELLING_EXPANSIONS = 5
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SpellingIndex:
+    def __init__(self):
+        self.forms = {}  # term -> Counter of the words written for it
+        self.trigrams = {}  # trigram -> terms containing it
+
+    def add_text(self, text: str, sign: int = 1):
+        """Count the words of text in (sign=1) or out (sign=-1)"""
+        for word in re.findall(r"\w+", strip_arabic_marks(text)):
+            term = search_term(normalize_arabic(word))
+            forms = self.forms.get(term)
+            if forms is None:
+                if sign < 0:
+                    continue
+                forms = self.forms[term] = Counter()
+                for trigram in trigrams(term):
+                    self.trigrams.setdefault(trigram, set()).add(term)
+            forms[word] += sign
+            if forms[word] <= 0:
+                del forms[word]
+            if not forms:
+                del self.forms[term]
+                for trigram in trigrams(term):
+                    self.trigrams[trigram].discard(term)
+                    if not self.trigrams[trigram]:
+                        del self.trigrams[trigram]
+
+    def similar(self, term: str) -> List[Tuple[str, float]]:
+        """The known terms most similar to term, with their similarity, best first"""
+        if len(term) < SPELLING_MIN_LENGTH:
+            return []
+        query_trigrams = trigrams(term)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigrams.get(trigram, ()))
+        candidates = []
+        for candidate, count in shared.items():
+            similarity = count / (len(query_trigrams) + len(trigrams(candidate)) - count)
+            if similarity >= SPELLING_SIMILARITY:
+                candidates.append((candidate, similarity))
+        candidates.sort(key=lambda candidate: (-candidate[1], -sum(self.forms[candidate[0]].values()), candidate[0]))
+        return candidates[:SPELLING_EXPANSIONS]
+
+    def correct(self, query: str, known: Callable[[str], bool]) -> Optional[str]:
+        """query with each unknown word replaced by the most similar known one, or None if nothing changed"""
+        words = re.findall(r"\w+", strip_arabic_marks(query))
+        corrected = False
+        for position, word in enumerate(words):
+            term = search_term(normalize_arabic(word))
+            if known(term):
+                continue
+            candidates = self.similar(term)
+            if candidates:
+                words[position] = self.forms[candidates[0][0]].most_common(1)[0][0]
+                corrected = True
+        return " ".join(words) if corrected else None
+
+# Search suggestions
+# /search/suggestions completes what the user is typing from an in-process
+# index of article titles, authors, section names and "#tags", each weighted by
+# popularity: the articles (and likes) behind it. Every word start of an
+# entry's normalized text, with and without a definite article, is a key in a
+# sorted array, so the entries completing a query are one bisect away. Writes
+# in this process update it directly; other workers rebuild theirs from
+# MongoDB when they notice, at most SUGGESTIONS_MAX_AGE seconds later, that
+# the articles or sections changed past the generations it has applied.
+SUGGESTIONS_MAX_AGE = 30
+SUGGESTIONS_LIMIT = 10
+SUGGESTION_GENERATIONS = ("articles", "sections")
+# Answers to prefixes completing more entries than this are remembered, and
+# kept exact as weights change
+SUGGESTIONS_MEMO_MATCHES = 64
+
+def suggestion_keys(text: str) -> List[str]:
+    """The keys text can be completed from: each of its word starts, also without a definite article"""
+    normalized = normalize_arabic(text.lstrip("#"))
+    keys = []
+    for match in re.finditer(r"\w+", normalized):
+        key = normalized[match.start():]
+        keys.append(key)
+        stripped = search_term(match.group())
+        if stripped != match.group():
+            keys.append(key[len(match.group()) - len(stripped):])
+    return keys
+
+class SuggestionIndex:
+    def __init__(self, weights: Counter = None, section_names: dict = None):
+        self.weights = Counter({text: weight for text, weight in (weights or {}).items() if weight > 0})
+        self.section_names = section_names or {}  # section id -> name
+        self.keys = sorted((key, text) for text in self.weights for key in suggestion_keys(text))
+        self.memo = {}  # prefix -> suggestions
+        self.spelling = SpellingIndex()
+        for text in self.weights:
+            self.spelling.add_text(text.lstrip("#"))
+        self.generations = None  # ("articles", "sections") generation values it was built at
+        self.checked_at = time.monotonic()
+
+    def adjust(self, text: str, delta: int):
+        """Change the weight of text, adding or dropping its entry as it becomes (non) positive"""
+        if not text or not delta:
+            return
+        weight = self.weights[text]
+        self.weights[text] = weight + delta
+        prefixes = {key[:end] for key in suggestion_keys(text) for end in range(1, len(key) + 1)}
+        for prefix in prefixes & self.memo.keys():
+            self.update_memo(prefix, text, delta > 0)
+        if weight <= 0 < weight + delta:
+            for key in suggestion_keys(text):
+                bisect.insort(self.keys, (key, text))
+            self.spelling.add_text(text.lstrip("#"))
+        elif weight + delta <= 0:
+            del self.weights[text]
+            if weight > 0:
+                for key in suggestion_keys(text):
+                    del self.keys[bisect.bisect_left(self.keys, (key, text))]
+                self.spelling.add_text(text.lstrip("#"), -1)
+
+    def update_memo(self, prefix: str, text: str, increased: bool):
+        """Keep the remembered suggestions for prefix exact after the weight of text changed"""
+        suggestions = self.memo[prefix]
+        if text not in suggestions:
+            if not increased:
+                return
+            if text.lower() in (suggestion.lower() for suggestion in suggestions):
+                del self.memo[prefix]
+                return
+            suggestions = [*suggestions, text]
+        elif not increased:
+            # Whatever ranks next may take its place
+            del self.memo[prefix]
+            return
+        self.memo[prefix] = sorted(suggestions, key=lambda suggestion: (-self.weights[suggestion], suggestion))[:SUGGESTIONS_LIMIT]
+
+    def count_article(self, article: dict, sign: int = 1):
+        """Count an article's title, author, section and tags in (sign=1) or out (sign=-1)"""
+        self.adjust(article.get("title"), sign * (1 + article.get("likes_count", 0)))
+        self.adjust(article.get("author"), sign)
+        self.adjust(self.section_names.get(article.get("section_id")), sign)
+        for tag in article.get("tags") or []:
+            self.adjust(f"#{tag}", sign)
+
+    def add_section(self, section_id: str, name: str):
+        self.section_names[section_id] = name
+        self.adjust(name, 1)
+
+    def remove_section(self, section_id: str):
+        name = self.section_names.pop(section_id, None)
+        if name in self.weights:
+            self.adjust(name, -self.weights[name])
+
+    def applied(self, generations: dict):
+        """
+        Note that writes taking the given generations were applied here
+        directly, so that only writes made by other workers cause a rebuild
+        """
+        if self.generations is None:
+            return
+        current = dict(zip(SUGGESTION_GENERATIONS, self.generations))
+        for name, value in generations.items():
+            # Otherwise another worker wrote in between
+            if current.get(name) == value - 1:
+                current[name] = value
+        self.generations = tuple(current[name] for name in SUGGESTION_GENERATIONS)
+
+    def suggest(self, q: str) -> List[str]:
+        """The most popular entries with a word starting with q"""
+        prefix = normalize_arabic(q.lstrip("#"))
+        if not prefix:
+            return []
+        if prefix in self.memo:
+            return self.memo[prefix]
+        matches = set()
+        for key, text in self.keys[bisect.bisect_left(self.keys, (prefix,)):]:
+            if not key.startswith(prefix):
+                break
+            matches.add(text)
+        suggestions = []
+        seen = set()
+        for text in sorted(matches, key=lambda text: (-self.weights[text], text)):
+            if text.lower() not in seen:
+                seen.add(text.lower())
+                suggestions.append(text)
+                if len(suggestions) == SUGGESTIONS_LIMIT:
+                    break
+        if len(matches) > SUGGESTIONS_MEMO_MATCHES:
+            self.memo[prefix] = suggestions
+        return suggestions
+
+suggestion_index = SuggestionIndex()
+
+async def load_suggestion_index(generations: tuple) -> SuggestionIndex:
+    weights = Counter()
+    section_names = {}
+    section_articles = Counter()
+    async for article in db.articles.find({}, {"_id": 0, "title": 1, "author": 1, "section_id": 1, "likes_count": 1}):
+        weights[article["title"]] += 1 + article.get("likes_count", 0)
+        weights[article["author"]] += 1
+        section_articles[article["section_id"]] += 1
+    async for section in db.sections.find({}, {"_id": 0, "id": 1, "name": 1}):
+        section_names[section["id"]] = section["name"]
+        weights[section["name"]] += 1 + section_articles[section["id"]]
+    async for tag in db.tag_stats.find({}, {"count": 1}):
+        weights[f"#{tag['_id']}"] += tag["count"]
+    index = SuggestionIndex(weights, section_names)
+    index.generations = generations
+    return index
+
+async def sync_suggestion_index():
+    """Rebuild suggestion_index if it was never built, or if another worker changed articles or sections"""
+    global suggestion_index
+    if suggestion_index.generations is not None and time.monotonic() - suggestion_index.checked_at < SUGGESTIONS_MAX_AGE:
+        return
+    suggestion_index.checked_at = time.monotonic()
+    generations = tuple([(await get_generation(name))["value"] for name in SUGGESTION_GENERATIONS])
+    if generations != suggestion_index.generations:
+        suggestion_index = await load_suggestion_index(generations)
+
+# Tag statistics
+# tag_stats holds one {_id: tag, count} document per tag, kept up to date with
+# $inc by every article write, so listing tags is an indexed sorted read rather
+# than an aggregation over every article. `python server.py rebuild-tag-stats`
+# recomputes it from scratch.
+async def update_tag_stats(added: List[str] = (), removed: List[str] = ()):
+    """Count the tags of written articles in, and those of deleted ones out"""
+    delta = Counter(added)
+    delta.subtract(removed)
+    operations = [
+        UpdateOne({"_id": tag}, {"$inc": {"count": change}}, upsert=change > 0)
+        for tag, change in delta.items() if change
+    ]
+    if not operations:
+        return
+    await db.tag_stats.bulk_write(operations, ordered=False)
+    await db.tag_stats.delete_many({"_id": {"$in": [tag for tag, change in delta.items() if change < 0]}, "count": {"$lte": 0}})
+
+async def rebuild_tag_stats():
+    """Recompute tag_stats from the articles"""
+    await db.articles.aggregate([
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+        {"$out": "tag_stats"}
+    ]).to_list(None)
+    return {"tags": await db.tag_stats.count_documents({})}
+
+# Media storage
+# Images (article covers, avatars, the site logo) live in a GridFS bucket and
+# documents only keep the media id. The id is the SHA-256 of the bytes, so an
+# image reused by many articles is stored once, and /api/media/{id} responses
+# are cacheable forever. media_refs counts the documents pointing at each blob;
+# the blob is deleted when the last of them lets go. A ref is only returned to
+# callers once its blob is stored: whoever creates the ref claims the upload
+# (uploading_at) and marks it stored when done, and anyone adding a ref in the
+# meantime waits for that, taking the upload over if it failed or stalled.
+media_bucket = AsyncIOMotorGridFSBucket(db, bucket_name="media")
+MEDIA_UPLOAD_TIMEOUT = 60
+MEDIA_UPLOAD_POLL_INTERVAL = 0.1
+
+# Multipart uploads are read chunk by chunk from the request's spooled file,
+# once to hash and size-check them and, for new content only, once more to copy
+# them into the bucket, so a worker never holds a whole image in memory.
+# Bodies declaring more than an image plus multipart framing are refused before
+# they are spooled at all (UploadRoute).
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 5 * 1024 * 1024))
+MAX_UPLOAD_REQUEST_BYTES = MAX_UPLOAD_BYTES + 64 * 1024
+UPLOAD_CHUNK_SIZE = 255 * 1024  # GridFS default chunk size
+
+def media_url(media_id: Optional[str]) -> Optional[str]:
+    return f"/api/media/{media_id}" if media_id else None
+
+# Blobs are shared by everyone uploading the same bytes, so their media type is
+# read from the bytes where possible rather than from whichever upload came first
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, media_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    return None
+
+async def add_media_ref(media_id: str) -> bool:
+    """
+    Count one more reference to a blob; True if the caller has to store the
+    blob, then call media_stored (or release_media if that fails)
+    """
+    previous = await db.media_refs.find_one_and_update(
+        {"_id": media_id},
+        {"$inc": {"refs": 1}, "$setOnInsert": {"uploading_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if previous is None:
+        return True
+    if previous.get("stored"):
+        return False
+    # Still being uploaded, or an upload failed, or counted before refs
+    # tracked storing: wait for the blob or take the upload over
+    while True:
+        if await media_bucket.find({"_id": media_id}).to_list(1):
+            await media_stored(media_id)
+            return False
+        now = datetime.utcnow()
+        claimed = await db.media_refs.find_one_and_update(
+            {"_id": media_id, "stored": {"$ne": True}, "$or": [
+                {"uploading_at": {"$exists": False}},
+                {"uploading_at": {"$lt": now - timedelta(seconds=MEDIA_UPLOAD_TIMEOUT)}}
+            ]},
+            {"$set": {"uploading_at": now}}
+        )
+        if claimed is not None:
+            return True
+        await asyncio.sleep(MEDIA_UPLOAD_POLL_INTERVAL)
+
+async def media_stored(media_id: str):
+    """Let the refs to a blob be handed out, now that it is in the bucket"""
+    await db.media_refs.update_one({"_id": media_id}, {"$set": {"stored": True}, "$unset": {"uploading_at": ""}})
+
+async def media_upload_failed(media_id: str):
+    """Give up the upload of a blob, so another uploader of it can store it"""
+    await db.media_refs.update_one({"_id": media_id}, {"$unset": {"uploading_at": ""}})
+    await release_media(media_id)
+
+async def release_media(media_id: Optional[str]):
+    """Drop one reference to a blob, deleting it once nothing points at it"""
+    if not media_id:
+        return
+    media_ref = await db.media_refs.find_one_and_update(
+        {"_id": media_id},
+        {"$inc": {"refs": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if media_ref is not None:
+        if media_ref["refs"] > 0:
+            return
+        result = await db.media_refs.delete_one({"_id": media_id, "refs": {"$lte": 0}})
+        if not result.deleted_count:
+            return  # Referenced again in the meantime
+    for blob_id in [media_id] + [variant_id(media_id, variant) for variant in IMAGE_VARIANTS]:
+        try:
+            await media_bucket.delete(blob_id)
+        except NoFile:
+            pass
+
+async def store_media(content: bytes, content_type: str, filename: Optional[str] = None) -> str:
+    media_id = hashlib.sha256(content).hexdigest()
+    content_type = sniff_media_type(content[:12]) or content_type
+    if await add_media_ref(media_id):
+        try:
+            await media_bucket.upload_from_stream_with_id(
+                media_id,
+                filename or media_id,
+                content,
+                metadata={"content_type": content_type}
+            )
+        except BaseException:
+            await media_upload_failed(media_id)
+            raise
+        await media_stored(media_id)
+        schedule_image_variants(media_id)
+    return media_id
+
+async def store_image_data(image_data: Optional[str], image_name: Optional[str] = None) -> Optional[str]:
+    """Move a base64 (or data: URL) image from a JSON body into the media store"""
+    if not image_data:
+        return None
+    try:
+        content, media_type = decode_image_data(image_data, image_name)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    return await store_media(content, media_type, image_name)
+
+async def store_upload(upload: UploadFile) -> str:
+    """Stream a multipart image upload into the media store, keyed by its SHA-256"""
+    content_type = upload.content_type or mimetypes.guess_type(upload.filename or "")[0]
+    if not content_type or not content_type.startswith("image/"):
+        raise HTTPException(status_code=415, detail="Only image uploads are supported")
+    if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if size == 0:
+            content_type = sniff_media_type(chunk[:12]) or content_type
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image is too large")
+        digest.update(chunk)
+    
+    media_id = digest.hexdigest()
+    if not await add_media_ref(media_id):
+        return media_id  # Already stored
+    
+    await upload.seek(0)
+    grid_in = media_bucket.open_upload_stream_with_id(
+        media_id,
+        upload.filename or media_id,
+        chunk_size_bytes=UPLOAD_CHUNK_SIZE,
+        metadata={"content_type": content_type}
+    )
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await grid_in.write(chunk)
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        await media_upload_failed(media_id)
+        raise
+    await media_stored(media_id)
+    schedule_image_variants(media_id)
+    return media_id
+
+class UploadRoute(APIRoute):
+    """
+    Route taking a multipart image upload. A body whose Content-Length is too
+    large for any image gets a 413 before FastAPI reads the form, which a
+    dependency would only see once the body is spooled.
+    """
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def check_content_length(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > MAX_UPLOAD_REQUEST_BYTES:
+                raise HTTPException(status_code=413, detail="Image is too large")
+            return await handler(request)
+
+        return check_content_length
+
+# Upload endpoints are declared on upload_router, everything else on api_router
+upload_router = APIRouter(prefix="/api", route_class=UploadRoute)
+
+# Image variants
+# Smaller WebP renditions of every stored image, rendered in a process pool so
+# decoding and encoding never block the event loop. They are stored next to the
+# original as "<media id>.<variant>" and served by /api/media/{id}?variant=...,
+# which falls back to the original until (or unless) the variant exists.
+IMAGE_VARIANTS = {
+    "thumb": 640,   # Article cards
+    "avatar": 128,  # Avatars and the site logo
+    "webp": None,   # Full size, re-encoded
+}
+WEBP_QUALITY = 80
+
+image_pool = ProcessPoolExecutor(max_workers=int(os.environ.get("IMAGE_WORKERS", 2)))
+variant_tasks = set()
+
+def variant_id(media_id: str, variant: str) -> str:
+    return f"{media_id}.{variant}"
+
+def render_image_variants(content: bytes) -> dict:
+    """Encode every variant of an image (runs inside image_pool)"""
+    try:
+        image = Image.open(io.BytesIO(content))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return {}  # Not a raster image Pillow can read, e.g. SVG
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    
+    variants = {}
+    for variant, size in IMAGE_VARIANTS.items():
+        rendition = image.copy()
+        if size:
+            rendition.thumbnail((size, size))
+        output = io.BytesIO()
+        rendition.save(output, "WEBP", quality=WEBP_QUALITY)
+        # Only worth serving when smaller than the original
+        if output.tell() < len(content):
+            variants[variant] = output.getvalue()
+    return variants
+
+async def generate_image_variants(media_id: str) -> int:
+    """Render and store the variants of a stored image, returning how many were kept"""
+    try:
+        grid_out = await media_bucket.open_download_stream(media_id)
+    except NoFile:
+        return 0  # Released in the meantime
+    content = await grid_out.read()
+    variants = await asyncio.get_running_loop().run_in_executor(image_pool, render_image_variants, content)
+    for variant, data in variants.items():
+        try:
+            await media_bucket.upload_from_stream_with_id(
+                variant_id(media_id, variant),
+                f"{grid_out.filename}.{variant}.webp",
+                data,
+                metadata={"content_type": "image/webp", "variant_of": media_id}
+            )
+        except DuplicateKeyError:
+            pass  # Rendered concurrently
+    return len(variants)
+
+def schedule_image_variants(media_id: str):
+    """Render the variants of a newly stored image in the background"""
+    async def run():
+        try:
+            await generate_image_variants(media_id)
+        except Exception:
+            logger.exception("Failed to render variants of media %s", media_id)
+    
+    task = asyncio.create_task(run())
+    variant_tasks.add(task)
+    task.add_done_callback(variant_tasks.discard)
 
 # Models
 class User(BaseModel):
@@ -74,7 +1698,7 @@ class User(BaseModel):
     email: EmailStr
     full_name: str
     hashed_password: str
-    profile_picture: Optional[str] = None
+    profile_picture_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
 
@@ -94,7 +1718,7 @@ class UserResponse(BaseModel):
     username: str
     email: EmailStr
     full_name: str
-    profile_picture: Optional[str] = None
+    profile_picture_url: Optional[str] = None
     created_at: datetime
 
 class Token(BaseModel):
@@ -118,7 +1742,7 @@ class Article(BaseModel):
     content: str
     author: str
     section_id: str
-    image_data: Optional[str] = None
+    image_id: Optional[str] = None
     image_name: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
     likes_count: int = 0
@@ -149,7 +1773,7 @@ class ArticleResponse(BaseModel):
     content: str
     author: str
     section_id: str
-    image_data: Optional[str] = None
+    image_url: Optional[str] = None
     image_name: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
     likes_count: int = 0
@@ -157,12 +1781,40 @@ class ArticleResponse(BaseModel):
     updated_at: datetime
     is_liked: Optional[bool] = None  # Whether current user liked this article
 
+class ArticleSummary(BaseModel):
+    id: str
+    title: str
+    author: str
+    section_id: str
+    tags: List[str] = Field(default_factory=list)
+    likes_count: int = 0
+    created_at: datetime
+    excerpt: str = ""
+    image_url: Optional[str] = None
+    is_liked: Optional[bool] = None
+
+class SearchHit(ArticleSummary):
+    snippet: str = ""
+    highlights: List[Tuple[int, int]] = Field(default_factory=list)  # [start, end) in snippet
+    title_highlights: List[Tuple[int, int]] = Field(default_factory=list)  # [start, end) in title
+
+class ArticlePage(BaseModel):
+    items: List[ArticleSummary]
+    next_cursor: Optional[str] = None
+
 class Like(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     article_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class LikeStatusRequest(BaseModel):
+    article_ids: List[str] = Field(max_length=1000)
+
+class LikeStatusResponse(BaseModel):
+    # Base64 of one bit per requested id, in order: bit i is (byte i // 8) >> (i % 8) & 1
+    bitmap: str
+
 class Comment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
@@ -185,13 +1837,18 @@ class CommentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     user_full_name: str
-    user_profile_picture: Optional[str] = None
+    user_profile_picture_url: Optional[str] = None
+
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
 
 class SiteSettings(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    logo_data: Optional[str] = None
+    logo_id: Optional[str] = None
     logo_name: Optional[str] = None
     site_name: str = "Foursan al aQida"
+    version: int = 1
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class LogoUpdate(BaseModel):
@@ -207,7 +1864,7 @@ class SearchFilters(BaseModel):
     sort_by: str = "relevance"
 
 class SearchResult(BaseModel):
-    articles: List[ArticleResponse]
+    articles: List[ArticleSummary]
     sections: List[Section]
     total_results: int
     query: str
@@ -223,6 +1880,52 @@ class Tag(BaseModel):
 class TagsResponse(BaseModel):
     tags: List[Tag]
 
+# Authenticated user cache
+# get_current_user runs on every authenticated request. Decoded tokens are kept
+# in process until they expire (or for USER_CACHE_TTL at most), and user
+# records for USER_CACHE_TTL under a key versioned by the "user:<id>" cache
+# tag, so updating or deactivating a user invalidates them on every worker
+# sharing the response cache's tag versions. Records stay in process either
+# way, since they hold the password hash.
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 4096))
+
+token_cache = MemoryCache(USER_CACHE_SIZE)
+user_cache = MemoryCache(USER_CACHE_SIZE)
+
+async def token_user_id(token: str) -> Optional[str]:
+    """The user id a bearer token was issued to; raises jwt.PyJWTError for invalid tokens"""
+    user_id = await token_cache.get(token)
+    if user_id is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is not None:
+            ttl = min(USER_CACHE_TTL, payload["exp"] - time.time()) if "exp" in payload else USER_CACHE_TTL
+            await token_cache.set(token, user_id, ttl)
+    return user_id
+
+async def get_cached_user(user_id: str) -> Optional[User]:
+    try:
+        key = await response_cache.versioned_key(user_id, [f"user:{user_id}"])
+    except Exception:
+        logger.exception("Response cache lookup failed for user %s", user_id)
+        key = None
+    user = await user_cache.get(key) if key else None
+    if user is None:
+        document = await db.users.find_one({"id": user_id})
+        if document is None:
+            return None
+        user = User(**document)
+        if key:
+            await user_cache.set(key, user, USER_CACHE_TTL)
+    return user
+
+async def invalidate_user(user_id: str):
+    await invalidate_cache(f"user:{user_id}")
+
+def get_user_response(user: dict) -> UserResponse:
+    return UserResponse(**user, profile_picture_url=media_url(user.get("profile_picture_id")))
+
 # User Authentication Endpoints
 @api_router.post("/register", response_model=Token)
 async def register_user(user: UserCreate):
@@ -240,37 +1943,42 @@ async def register_user(user: UserCreate):
             raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.run(get_password_hash, user.password)
     user_dict = user.dict()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
+    user_dict["profile_picture_id"] = await store_image_data(user_dict.pop("profile_picture"))
     user_obj = User(**user_dict)
     
     await db.users.insert_one(user_obj.dict())
     
     # Create access token
     access_token = create_access_token(data={"sub": user_obj.id})
-    user_response = UserResponse(**user_obj.dict())
+    user_response = get_user_response(user_obj.dict())
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
 
 @api_router.post("/login", response_model=Token)
 async def login_user(user_credentials: UserLogin):
     user = await db.users.find_one({"username": user_credentials.username})
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await password_hasher.run(verify_password, user_credentials.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     
     if not user["is_active"]:
         raise HTTPException(status_code=400, detail="Inactive user")
     
     access_token = create_access_token(data={"sub": user["id"]})
-    user_response = UserResponse(**user)
+    user_response = get_user_response(user)
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
 
+@app.get("/internal/metrics/password-hashing")
+async def get_password_hashing_metrics():
+    return password_hasher.metrics()
+
 @api_router.get("/profile", response_model=UserResponse)
 async def get_user_profile(current_user: User = Depends(get_current_user)):
-    return UserResponse(**current_user.dict())
+    return get_user_response(current_user.dict())
 
 @api_router.put("/profile", response_model=UserResponse)
 async def update_user_profile(
@@ -282,166 +1990,304 @@ async def update_user_profile(
     if full_name is not None:
         update_data["full_name"] = full_name
     if profile_picture is not None:
-        update_data["profile_picture"] = profile_picture
+        update_data["profile_picture_id"] = await store_image_data(profile_picture)
     
     if update_data:
         await db.users.update_one({"id": current_user.id}, {"$set": update_data})
+        await invalidate_user(current_user.id)
+        if "profile_picture_id" in update_data:
+            await release_media(current_user.profile_picture_id)
         updated_user = await db.users.find_one({"id": current_user.id})
-        return UserResponse(**updated_user)
+        return get_user_response(updated_user)
     
-    return UserResponse(**current_user.dict())
+    return get_user_response(current_user.dict())
+
+@upload_router.put("/profile/picture", response_model=UserResponse)
+async def upload_profile_picture(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    picture_id = await store_upload(file)
+    await db.users.update_one({"id": current_user.id}, {"$set": {"profile_picture_id": picture_id}})
+    await invalidate_user(current_user.id)
+    await release_media(current_user.profile_picture_id)
+    return get_user_response({**current_user.dict(), "profile_picture_id": picture_id})
+
+# Liked articles
+# Like status is answered from the set of article ids each user liked, loaded
+# with one query and kept for LIKED_IDS_TTL in an LRU of LIKED_IDS_USERS
+# users. Likes and unlikes bump the "likes:<user id>" cache tag its key is
+# versioned by, so the next read reloads it, in every worker sharing the
+# response cache's tag versions.
+LIKED_IDS_TTL = int(os.environ.get("LIKED_IDS_TTL", 300))
+LIKED_IDS_USERS = int(os.environ.get("LIKED_IDS_USERS", 4096))
+
+liked_ids_cache = MemoryCache(LIKED_IDS_USERS)
+
+async def liked_ids_key(user_id: str) -> Optional[str]:
+    try:
+        return await response_cache.versioned_key(user_id, [f"likes:{user_id}"])
+    except Exception:
+        logger.exception("Response cache lookup failed for the likes of %s", user_id)
+        return None
+
+async def get_liked_ids(user_id: str) -> set:
+    """The ids of the articles user_id liked (not to be modified)"""
+    key = await liked_ids_key(user_id)
+    liked_ids = await liked_ids_cache.get(key) if key else None
+    if liked_ids is None:
+        liked_ids = set(await db.likes.distinct("article_id", {"user_id": user_id}))
+        if key:
+            await liked_ids_cache.set(key, liked_ids, LIKED_IDS_TTL)
+    return liked_ids
+
+async def invalidate_liked_ids(user_id: str):
+    """Have the liked set of user_id reloaded after a like (or unlike) was written"""
+    await invalidate_cache(f"likes:{user_id}")
+
+@api_router.post("/likes/status", response_model=LikeStatusResponse)
+async def get_like_status(request: LikeStatusRequest, current_user: User = Depends(get_current_user)):
+    """Which of the given articles the caller liked, as a bitmap"""
+    liked_ids = await get_liked_ids(current_user.id)
+    bitmap = bytearray((len(request.article_ids) + 7) // 8)
+    for position, article_id in enumerate(request.article_ids):
+        if article_id in liked_ids:
+            bitmap[position // 8] |= 1 << (position % 8)
+    return LikeStatusResponse(bitmap=base64.b64encode(bitmap).decode())
 
 # Article Like Endpoints
+# A like is one insert guarded by the unique (user_id, article_id) index and
+# one $inc of the article's likes_count, only made when the insert (or delete)
+# actually happened, so double clicks neither fail halfway nor skew the count.
 @api_router.post("/articles/{article_id}/like")
 async def like_article(article_id: str, current_user: User = Depends(get_current_user)):
-    # Check if article exists
-    article = await db.articles.find_one({"id": article_id})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    # Check if user already liked this article
-    existing_like = await db.likes.find_one({
-        "user_id": current_user.id,
-        "article_id": article_id
-    })
-    
-    if existing_like:
-        raise HTTPException(status_code=400, detail="Article already liked")
-    
-    # Create like
     like = Like(user_id=current_user.id, article_id=article_id)
-    await db.likes.insert_one(like.dict())
+    try:
+        await db.likes.insert_one(like.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Article already liked")
     
-    # Update article likes count
-    await db.articles.update_one(
+    article = await db.articles.find_one_and_update(
         {"id": article_id},
-        {"$inc": {"likes_count": 1}}
+        {"$inc": {"likes_count": 1}},
+        {"_id": 0, "title": 1, "section_id": 1}
     )
+    if not article:
+        await db.likes.delete_one({"id": like.id})
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    await invalidate_liked_ids(current_user.id)
+    suggestion_index.adjust(article["title"], 1)
+    await invalidate_cache("articles", f"section:{article['section_id']}")
     
     return {"message": "Article liked successfully"}
 
 @api_router.delete("/articles/{article_id}/like")
 async def unlike_article(article_id: str, current_user: User = Depends(get_current_user)):
-    # Check if article exists
-    article = await db.articles.find_one({"id": article_id})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    # Check if user liked this article
-    existing_like = await db.likes.find_one({
+    result = await db.likes.delete_one({
         "user_id": current_user.id,
         "article_id": article_id
     })
-    
-    if not existing_like:
+    if result.deleted_count == 0:
+        if not await db.articles.find_one({"id": article_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Article not found")
         raise HTTPException(status_code=400, detail="Article not liked yet")
     
-    # Remove like
-    await db.likes.delete_one({
-        "user_id": current_user.id,
-        "article_id": article_id
-    })
-    
-    # Update article likes count
-    await db.articles.update_one(
-        {"id": article_id},
-        {"$inc": {"likes_count": -1}}
+    await invalidate_liked_ids(current_user.id)
+    article = await db.articles.find_one_and_update(
+        {"id": article_id, "likes_count": {"$gt": 0}},
+        {"$inc": {"likes_count": -1}},
+        {"_id": 0, "title": 1, "section_id": 1}
     )
+    if article:
+        suggestion_index.adjust(article["title"], -1)
+        await invalidate_cache("articles", f"section:{article['section_id']}")
     
     return {"message": "Article unliked successfully"}
 
+async def recount_likes():
+    """Set every article's likes_count to its number of likes, e.g. after counts drifted"""
+    counts = {
+        like["_id"]: like["count"]
+        async for like in db.likes.aggregate([{"$group": {"_id": "$article_id", "count": {"$sum": 1}}}])
+    }
+    operations = [
+        UpdateOne({"id": article["id"]}, {"$set": {"likes_count": counts.get(article["id"], 0)}})
+        async for article in db.articles.find({}, {"_id": 0, "id": 1, "likes_count": 1})
+        if article.get("likes_count", 0) != counts.get(article["id"], 0)
+    ]
+    if operations:
+        await db.articles.bulk_write(operations, ordered=False)
+    return {"articles": len(operations)}
+
+async def dedupe_likes():
+    """Keep the first of each user's likes of an article, so the unique likes index can be built, then recount"""
+    duplicates = []
+    async for group in db.likes.aggregate([
+        {"$sort": {"created_at": 1}},
+        {"$group": {"_id": {"user_id": "$user_id", "article_id": "$article_id"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ]):
+        duplicates.extend(group["ids"][1:])
+    if duplicates:
+        await db.likes.delete_many({"_id": {"$in": duplicates}})
+    return {"likes": len(duplicates), **await recount_likes()}
+
+async def ensure_unique_likes():
+    """Make sure the unique likes index exists, which like_article relies on to refuse double likes"""
+    if "user_id_article_id_unique" in await db.likes.index_information():
+        return
+    # Duplicates left by older versions block the index
+    await dedupe_likes()
+    await db.likes.create_indexes(INDEXES["likes"])
+    if "user_id_article_id_unique" not in await db.likes.index_information():
+        raise RuntimeError("The unique likes index user_id_article_id_unique is missing")
+
 # Helper function to check if user liked an article
 async def get_article_with_like_status(article, user_id=None):
     article_dict = article
     if user_id:
-        like = await db.likes.find_one({
-            "user_id": user_id,
-            "article_id": article["id"]
-        })
-        article_dict["is_liked"] = like is not None
+        article_dict["is_liked"] = article["id"] in await get_liked_ids(user_id)
     else:
         article_dict["is_liked"] = None
+    article_dict["image_url"] = media_url(article.get("image_id"))
     return ArticleResponse(**article_dict)
 
+# Variant for list endpoints, for a whole page of summary-projected articles
+async def get_articles_with_like_status(articles, user_id=None, model=ArticleSummary):
+    liked_ids = await get_liked_ids(user_id) if user_id and articles else set()
+    
+    result = []
+    for article in articles:
+        article["is_liked"] = (article["id"] in liked_ids) if user_id else None
+        article["image_url"] = media_url(article.get("image_id"))
+        result.append(model(**article))
+    return result
+
 # Section endpoints
 @api_router.post("/sections", response_model=Section)
 async def create_section(section: SectionCreate):
     section_dict = section.dict()
     section_obj = Section(**section_dict)
-    await db.sections.insert_one(section_obj.dict())
+    await db.sections.insert_one({**section_obj.dict(), **normalized_fields("sections", section_dict)})
+    suggestion_index.applied(await bump_generation("sections"))
+    suggestion_index.add_section(section_obj.id, section_obj.name)
+    await invalidate_cache("sections")
     return section_obj
 
 @api_router.get("/sections", response_model=List[Section])
-async def get_sections():
-    sections = await db.sections.find().to_list(1000)
-    return [Section(**section) for section in sections]
+async def get_sections(request: Request):
+    generation = await get_generation("sections")
+    etag = make_etag("sections", generation["value"])
+    headers = validator_headers(etag, generation["updated_at"])
+    if is_not_modified(request, etag, generation["updated_at"]):
+        return Response(status_code=304, headers=headers)
+    
+    async def build():
+        sections = await db.sections.find().to_list(1000)
+        return [Section(**section) for section in sections]
+    
+    return await cached_json(f"sections:{generation['value']}", ["sections"], build, headers)
+
+@api_router.get("/sections/counts", response_model=dict)
+async def get_section_counts(request: Request):
+    """
+    Number of articles in each section, by section id. Each is an index-only
+    count on section_id, so the homepage need not list every article
+    """
+    sections, articles = await get_generation("sections"), await get_generation("articles")
+    etag = make_etag("section-counts", sections["value"], articles["value"])
+    updated_at = max(filter(None, [sections["updated_at"], articles["updated_at"]]), default=None)
+    headers = validator_headers(etag, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return Response(status_code=304, headers=headers)
+
+    async def build():
+        return {
+            section["id"]: await db.articles.count_documents({"section_id": section["id"]})
+            async for section in db.sections.find({}, {"_id": 0, "id": 1})
+        }
+
+    return await cached_json(f"section-counts:{sections['value']}:{articles['value']}", ["sections", "articles"], build, headers)
 
 @api_router.delete("/sections/{section_id}")
 async def delete_section(section_id: str):
     result = await db.sections.delete_one({"id": section_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Section not found")
-    # Also delete articles in this section
+    # Also delete articles in this section, and their images
+    articles = await db.articles.find(
+        {"section_id": section_id},
+        {"id": 1, "title": 1, "author": 1, "section_id": 1, "tags": 1, "likes_count": 1, "image_id": 1}
+    ).to_list(None)
     await db.articles.delete_many({"section_id": section_id})
+    await update_tag_stats(removed=[tag for article in articles for tag in article.get("tags", [])])
+    for article in articles:
+        search_index.remove(article["id"])
+        suggestion_index.count_article(article, -1)
+        await release_media(article.get("image_id"))
+    suggestion_index.remove_section(section_id)
+    suggestion_index.applied(await bump_generation("sections", "articles"))
+    await invalidate_cache("sections", "articles", f"section:{section_id}", "tag-counts")
     return {"message": "Section deleted successfully"}
 
 # Article endpoints (updated to include like status)
 @api_router.post("/articles", response_model=Article)
 async def create_article(article: ArticleCreate):
     article_dict = article.dict()
+    article_dict["image_id"] = await store_image_data(article_dict.pop("image_data"), article.image_name)
     article_obj = Article(**article_dict)
-    await db.articles.insert_one(article_obj.dict())
+    await db.articles.insert_one({**article_obj.dict(), **article_summary_fields(article_dict), **normalized_fields("articles", article_dict)})
+    await update_tag_stats(added=article_obj.tags)
+    search_index.add(article_obj.dict())
+    suggestion_index.count_article(article_obj.dict())
+    suggestion_index.applied(await bump_generation("articles"))
+    await invalidate_cache("articles", f"section:{article_obj.section_id}", "tag-counts")
     return article_obj
 
-@api_router.get("/articles", response_model=List[ArticleResponse])
-async def get_articles(current_user: Optional[User] = Depends(lambda: None)):
-    # Try to get current user without requiring authentication
-    user_id = None
-    try:
-        # This is a hack to make authentication optional
-        pass
-    except:
-        pass
-    
-    articles = await db.articles.find().to_list(1000)
-    result = []
-    for article in articles:
-        article_response = await get_article_with_like_status(article, user_id)
-        result.append(article_response)
-    return result
-
-@api_router.get("/articles/{article_id}", response_model=ArticleResponse)
-async def get_article(article_id: str, current_user: Optional[User] = Depends(lambda: None)):
-    article = await db.articles.find_one({"id": article_id})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
+@api_router.get("/articles", response_model=ArticlePage)
+async def get_articles(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    user_id = current_user.id if current_user else None
     
-    user_id = None
-    # Try to get current user without requiring authentication
-    try:
-        pass
-    except:
-        pass
+    async def build():
+        articles, next_cursor = await paginate(db.articles, {}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+        items = await get_articles_with_like_status(articles, user_id)
+        return ArticlePage(items=items, next_cursor=next_cursor)
     
-    return await get_article_with_like_status(article, user_id)
-
-# New endpoint to get articles with authentication
-@api_router.get("/articles-auth", response_model=List[ArticleResponse])
-async def get_articles_authenticated(current_user: User = Depends(get_current_user)):
-    articles = await db.articles.find().to_list(1000)
-    result = []
-    for article in articles:
-        article_response = await get_article_with_like_status(article, current_user.id)
-        result.append(article_response)
-    return result
+    # Only anonymous pages are shared, like status is per user
+    if user_id is not None:
+        return await build()
+    return await cached_json(f"articles:{limit}:{cursor}", ["articles"], build, VARY_AUTHORIZATION)
 
-@api_router.get("/articles-auth/{article_id}", response_model=ArticleResponse)
-async def get_article_authenticated(article_id: str, current_user: User = Depends(get_current_user)):
+@api_router.get("/articles/{article_id}", response_model=ArticleResponse)
+async def get_article(
+    article_id: str,
+    request: Request,
+    response: Response,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
     article = await db.articles.find_one({"id": article_id})
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    return await get_article_with_like_status(article, current_user.id)
+    article_response = await get_article_with_like_status(article, current_user.id if current_user else None)
+    # Likes don't touch updated_at, so the like count is part of the version,
+    # and there is no Last-Modified: it would answer 304 across likes
+    etag = make_etag(
+        article_response.id,
+        article_response.updated_at.isoformat(),
+        article_response.likes_count,
+        article_response.is_liked,
+        article_response.image_url
+    )
+    not_modified = conditional_response(request, response, etag, vary="Authorization")
+    if not_modified:
+        return not_modified
+    return article_response
 
 @api_router.put("/articles/{article_id}", response_model=Article)
 async def update_article(article_id: str, article_update: ArticleUpdate):
@@ -451,31 +2297,84 @@ async def update_article(article_id: str, article_update: ArticleUpdate):
     
     update_data = {k: v for k, v in article_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
+    if "content" in update_data:
+        update_data["excerpt"] = make_excerpt(update_data["content"])
+    update_data.update(normalized_fields("articles", update_data))
+    if "image_data" in update_data:
+        image_name = update_data.get("image_name", existing_article.get("image_name"))
+        update_data["image_id"] = await store_image_data(update_data.pop("image_data"), image_name)
     
     await db.articles.update_one({"id": article_id}, {"$set": update_data})
+    if "tags" in update_data:
+        await update_tag_stats(added=update_data["tags"], removed=existing_article.get("tags", []))
+    suggestion_index.applied(await bump_generation("articles"))
+    cache_tags = {"articles", f"section:{existing_article['section_id']}", f"section:{update_data.get('section_id', existing_article['section_id'])}"}
+    if "tags" in update_data:
+        cache_tags.add("tag-counts")
+    await invalidate_cache(*cache_tags)
+    if "image_id" in update_data:
+        await release_media(existing_article.get("image_id"))
     updated_article = await db.articles.find_one({"id": article_id})
+    search_index.add(updated_article)
+    suggestion_index.count_article(existing_article, -1)
+    suggestion_index.count_article(updated_article)
     return Article(**updated_article)
 
+@upload_router.put("/articles/{article_id}/image", response_model=ArticleResponse)
+async def upload_article_image(article_id: str, file: UploadFile = File(...)):
+    existing_article = await db.articles.find_one({"id": article_id}, {"image_id": 1, "section_id": 1})
+    if not existing_article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    image_id = await store_upload(file)
+    await db.articles.update_one({"id": article_id}, {"$set": {
+        "image_id": image_id,
+        "image_name": file.filename,
+        "updated_at": datetime.utcnow()
+    }})
+    suggestion_index.applied(await bump_generation("articles"))
+    await invalidate_cache("articles", f"section:{existing_article['section_id']}")
+    await release_media(existing_article.get("image_id"))
+    updated_article = await db.articles.find_one({"id": article_id})
+    return await get_article_with_like_status(updated_article)
+
 @api_router.delete("/articles/{article_id}")
 async def delete_article(article_id: str):
-    result = await db.articles.delete_one({"id": article_id})
-    if result.deleted_count == 0:
+    article = await db.articles.find_one_and_delete(
+        {"id": article_id},
+        {"title": 1, "author": 1, "section_id": 1, "tags": 1, "likes_count": 1, "image_id": 1}
+    )
+    if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Also delete likes and comments for this article
+    await update_tag_stats(removed=article.get("tags", []))
+    search_index.remove(article_id)
+    suggestion_index.count_article(article, -1)
+    suggestion_index.applied(await bump_generation("articles"))
+    await invalidate_cache("articles", f"section:{article['section_id']}", "tag-counts")
+    # Also delete the image, likes and comments for this article
+    await release_media(article.get("image_id"))
     await db.likes.delete_many({"article_id": article_id})
     await db.comments.delete_many({"article_id": article_id})
     return {"message": "Article deleted successfully"}
 
-@api_router.get("/articles/section/{section_id}", response_model=List[ArticleResponse])
-async def get_articles_by_section(section_id: str, current_user: Optional[User] = Depends(lambda: None)):
-    articles = await db.articles.find({"section_id": section_id}).to_list(1000)
-    result = []
-    user_id = None
-    for article in articles:
-        article_response = await get_article_with_like_status(article, user_id)
-        result.append(article_response)
-    return result
+@api_router.get("/articles/section/{section_id}", response_model=ArticlePage)
+async def get_articles_by_section(
+    section_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    user_id = current_user.id if current_user else None
+    
+    async def build():
+        articles, next_cursor = await paginate(db.articles, {"section_id": section_id}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+        items = await get_articles_with_like_status(articles, user_id)
+        return ArticlePage(items=items, next_cursor=next_cursor)
+    
+    if user_id is not None:
+        return await build()
+    return await cached_json(f"section-articles:{section_id}:{limit}:{cursor}", [f"section:{section_id}"], build, VARY_AUTHORIZATION)
 
 # Comment endpoints
 @api_router.post("/articles/{article_id}/comments", response_model=CommentResponse)
@@ -496,32 +2395,45 @@ async def create_comment(article_id: str, comment: CommentCreate, current_user:
     return CommentResponse(
         **comment_obj.dict(),
         user_full_name=current_user.full_name,
-        user_profile_picture=current_user.profile_picture
+        user_profile_picture_url=media_url(current_user.profile_picture_id)
     )
 
-@api_router.get("/articles/{article_id}/comments", response_model=List[CommentResponse])
-async def get_article_comments(article_id: str):
+@api_router.get("/articles/{article_id}/comments", response_model=CommentPage)
+async def get_article_comments(
+    article_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     # Check if article exists
-    article = await db.articles.find_one({"id": article_id})
+    article = await db.articles.find_one({"id": article_id}, {"_id": 1})
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Get comments for this article
-    comments = await db.comments.find({"article_id": article_id}).sort("created_at", 1).to_list(1000)
+    # Get one page of comments for this article, oldest first
+    comments, next_cursor = await paginate(db.comments, {"article_id": article_id}, limit, cursor, direction=ASCENDING)
+    
+    # Enrich comments with user info, fetching all distinct authors at once
+    user_ids = list({comment["user_id"] for comment in comments})
+    users_by_id = {}
+    if user_ids:
+        users = await db.users.find(
+            {"id": {"$in": user_ids}},
+            {"id": 1, "full_name": 1, "profile_picture_id": 1, "_id": 0}
+        ).to_list(None)
+        users_by_id = {user["id"]: user for user in users}
     
-    # Enrich comments with user info
     result = []
     for comment in comments:
-        user = await db.users.find_one({"id": comment["user_id"]})
+        user = users_by_id.get(comment["user_id"])
         if user:
             comment_response = CommentResponse(
                 **comment,
                 user_full_name=user["full_name"],
-                user_profile_picture=user.get("profile_picture")
+                user_profile_picture_url=media_url(user.get("profile_picture_id"))
             )
             result.append(comment_response)
     
-    return result
+    return CommentPage(items=result, next_cursor=next_cursor)
 
 @api_router.put("/comments/{comment_id}", response_model=CommentResponse)
 async def update_comment(comment_id: str, comment_update: CommentUpdate, current_user: User = Depends(get_current_user)):
@@ -543,7 +2455,7 @@ async def update_comment(comment_id: str, comment_update: CommentUpdate, current
     return CommentResponse(
         **updated_comment,
         user_full_name=current_user.full_name,
-        user_profile_picture=current_user.profile_picture
+        user_profile_picture_url=media_url(current_user.profile_picture_id)
     )
 
 @api_router.delete("/comments/{comment_id}")
@@ -563,6 +2475,87 @@ async def delete_comment(comment_id: str, current_user: User = Depends(get_curre
     return {"message": "Comment deleted successfully"}
 
 # Search endpoints
+# /search returns one page of articles together with the exact number of
+# matching articles and facet counts over all of them, for refining the search
+# by section, author, tag or month. Text searches take both from the hits of
+# the search index; filter-only searches from a single $facet aggregation.
+SEARCH_PAGE_SIZE = 50
+SEARCH_FACET_LIMIT = 20  # most common values returned per facet
+
+def facet_values(counts: dict) -> List[dict]:
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return [{"value": value, "count": count} for value, count in ranked[:SEARCH_FACET_LIMIT]]
+
+def search_facets(sections: dict, authors: dict, tags: dict, months: dict) -> dict:
+    """Facets from value -> count mappings; months are listed in full, newest first"""
+    return {
+        "sections": [
+            {**facet, "name": suggestion_index.section_names.get(facet["value"])}
+            for facet in facet_values(sections)
+        ],
+        "authors": facet_values(authors),
+        "tags": facet_values(tags),
+        "months": [{"value": month, "count": count} for month, count in sorted(months.items(), reverse=True)]
+    }
+
+# Each hit also carries a snippet of its content around the words matching the
+# query, with their offsets (in characters) to highlight. Only the first
+# SNIPPET_SCAN_LENGTH characters of the content are searched for them.
+SNIPPET_LENGTH = 200
+SNIPPET_CONTEXT = 40  # characters shown before the first highlighted word
+SNIPPET_SCAN_LENGTH = 20000
+SNIPPET_WORD = re.compile(r"[\w\u064B-\u065F\u0670]+")  # words with their tashkeel
+
+@functools.lru_cache(maxsize=65536)
+def word_term(word: str) -> str:
+    return search_term(normalize_arabic(word))
+
+def highlight_spans(text: str, terms: set) -> List[Tuple[int, int, str]]:
+    """(start, end, query term) of the words of text whose term starts with a query term"""
+    spans = []
+    for match in SNIPPET_WORD.finditer(text):
+        term = word_term(match.group())
+        for query_term in terms:
+            if term.startswith(query_term):
+                spans.append((match.start(), match.end(), query_term))
+                break
+    return spans
+
+def make_snippet(content: str, terms: set) -> Tuple[str, List[Tuple[int, int]]]:
+    """The part of content showing the most query terms, and the offsets of their words in it"""
+    text = " ".join(content[:SNIPPET_SCAN_LENGTH].split())
+    spans = highlight_spans(text, terms)
+    if not spans:
+        return make_excerpt(content), []
+
+    # The window starting at a matched word that covers the most distinct
+    # terms, then the most matched words
+    best, best_score = 0, (0, 0)
+    window = Counter()
+    end = 0
+    for first, (start, _, term) in enumerate(spans):
+        while end < len(spans) and spans[end][1] <= start + SNIPPET_LENGTH - SNIPPET_CONTEXT:
+            window[spans[end][2]] += 1
+            end += 1
+        score = (len(+window), end - first)
+        if score > best_score:
+            best, best_score = first, score
+        window[term] -= 1
+
+    # Cut at word boundaries
+    first_start = spans[best][0]
+    start = max(0, first_start - SNIPPET_CONTEXT)
+    if start > 0:
+        start = text.find(" ", start, first_start) + 1 or first_start
+    stop = start + SNIPPET_LENGTH
+    if stop < len(text):
+        stop = max(text.rfind(" ", spans[best][1], stop), spans[best][1])
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if stop < len(text) or len(content) > SNIPPET_SCAN_LENGTH else ""
+    shift = len(prefix) - start
+    highlights = [(span_start + shift, span_end + shift) for span_start, span_end, _ in spans if start <= span_start and span_end <= stop]
+    return prefix + text[start:stop] + suffix, highlights
+
 @api_router.get("/search")
 async def search_content(
     q: str = "",
@@ -571,123 +2564,196 @@ async def search_content(
     tags: Optional[str] = None,  # Comma-separated tags
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
-    sort_by: str = "relevance"  # relevance, date_desc, date_asc
+    sort_by: str = "relevance",  # relevance, date_desc, date_asc
+    page: int = Query(1, ge=1),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Optional[User] = Depends(get_optional_user)
 ):
     """
     Search for articles and sections
     Parameters:
-    - q: search query (searches in title, content, author)
+    - q: search query (searches in title, content, author and tags)
     - section_id: filter by specific section
     - author: filter by author name
     - tags: filter by tags (comma-separated, e.g., "العقيدة,الفقه")
     - from_date: filter articles from this date (YYYY-MM-DD)
     - to_date: filter articles to this date (YYYY-MM-DD)
-    - sort_by: sort results (relevance, date_desc, date_asc)
+    - sort_by: sort results (relevance = BM25 score, date_desc, date_asc)
+    - page, limit: which page of articles to return, and its size
     """
     if not q.strip() and not section_id and not author and not tags:
         return {
             "articles": [],
             "sections": [],
             "total_results": 0,
-            "query": q
+            "total_articles": 0,
+            "page": page,
+            "limit": limit,
+            "has_more": False,
+            "facets": search_facets({}, {}, {}, {}),
+            "query": q,
+            "did_you_mean": None,
+            "filters": {
+                "section_id": section_id,
+                "author": author,
+                "tags": tags,
+                "from_date": from_date,
+                "to_date": to_date,
+                "sort_by": sort_by
+            }
         }
     
     # Build search filters
     article_filters = {}
     section_filters = {}
     
-    # Text search using regex for MongoDB with Arabic normalization
-    if q.strip():
-        # Normalize Arabic text for better search results
-        # Handle hamza variations: أ إ آ ا - ؤ و - ئ ي - ء
-        normalized_query = q.strip()
-        
-        # Create search patterns that handle hamza variations
-        # Replace أ إ آ with pattern that matches all variations
-        hamza_alef_pattern = normalized_query.replace('أ', '[أإآا]').replace('إ', '[أإآا]').replace('آ', '[أإآا]').replace('ا', '[أإآا]')
-        # Replace ؤ with pattern that matches ؤ and و
-        hamza_waw_pattern = hamza_alef_pattern.replace('ؤ', '[ؤو]').replace('و', '[ؤو]')
-        # Replace ئ with pattern that matches ئ and ي
-        final_pattern = hamza_waw_pattern.replace('ئ', '[ئي]').replace('ي', '[ئي]')
-        
-        search_regex = {"$regex": final_pattern, "$options": "i"}  # case insensitive
-        article_filters["$or"] = [
-            {"title": search_regex},
-            {"content": search_regex},
-            {"author": search_regex},
-            {"tags": search_regex}  # Also search in tags
-        ]
-        section_filters["$or"] = [
-            {"name": search_regex},
-            {"description": search_regex}
-        ]
-    
     # Section filter
     if section_id:
         article_filters["section_id"] = section_id
     
     # Author filter
     if author:
-        article_filters["author"] = {"$regex": author.strip(), "$options": "i"}
+        article_filters["author_norm"] = normalized_regex(author)
     
     # Tags filter
-    if tags:
-        tags_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-        if tags_list:
-            article_filters["tags"] = {"$in": tags_list}
+    tags_list = [tag.strip() for tag in (tags or "").split(',') if tag.strip()]
+    if tags_list:
+        article_filters["tags"] = {"$in": tags_list}
     
     # Date range filter
-    if from_date or to_date:
-        date_filter = {}
-        if from_date:
-            try:
-                from datetime import datetime
-                date_filter["$gte"] = datetime.strptime(from_date, "%Y-%m-%d")
-            except ValueError:
-                pass
-        if to_date:
-            try:
-                from datetime import datetime
-                date_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d")
-            except ValueError:
-                pass
-        if date_filter:
-            article_filters["created_at"] = date_filter
-    
-    # Execute searches
-    articles_cursor = db.articles.find(article_filters)
-    sections_cursor = db.sections.find(section_filters)
-    
-    # Apply sorting
-    if sort_by == "date_desc":
-        articles_cursor = articles_cursor.sort("created_at", -1)
-    elif sort_by == "date_asc":
-        articles_cursor = articles_cursor.sort("created_at", 1)
-    # For relevance, we'll use default order (could be enhanced with scoring)
-    
-    # Get results
-    articles = await articles_cursor.limit(50).to_list(50)  # Limit to 50 results
-    sections = await sections_cursor.limit(20).to_list(20)  # Limit to 20 results
+    date_filter = {}
+    if from_date:
+        try:
+            date_filter["$gte"] = datetime.strptime(from_date, "%Y-%m-%d")
+        except ValueError:
+            pass
+    if to_date:
+        try:
+            date_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d")
+        except ValueError:
+            pass
+    if date_filter:
+        article_filters["created_at"] = date_filter
+    
+    did_you_mean = None
+    if q.strip():
+        # Ranked by the search index, which applies the same filters to the
+        # fields it keeps for each article
+        author_norm = normalize_arabic(author) if author else None
+        
+        def matches(article: IndexedArticle) -> bool:
+            return (
+                (not section_id or article.section_id == section_id)
+                and (not author_norm or author_norm in article.author_norm)
+                and (not tags_list or any(tag in article.tags for tag in tags_list))
+                and ("$gte" not in date_filter or article.created_at >= date_filter["$gte"])
+                and ("$lte" not in date_filter or article.created_at <= date_filter["$lte"])
+            )
+        
+        await sync_search_index()
+        await sync_suggestion_index()
+        spelling = suggestion_index.spelling
+        hits = search_index.search(q, matches, spelling.similar)
+        did_you_mean = spelling.correct(q, search_index.knows)
+        if sort_by == "date_desc":
+            hits.sort(key=lambda hit: search_index.article(hit[0]).created_at, reverse=True)
+        elif sort_by == "date_asc":
+            hits.sort(key=lambda hit: search_index.article(hit[0]).created_at)
+        
+        total_articles = len(hits)
+        section_counts, author_counts, tag_counts, month_counts = Counter(), Counter(), Counter(), Counter()
+        for article_id, _ in hits:
+            indexed = search_index.article(article_id)
+            section_counts[indexed.section_id] += 1
+            author_counts[indexed.author] += 1
+            tag_counts.update(indexed.tags)
+            if indexed.created_at:
+                month_counts[indexed.created_at.strftime("%Y-%m")] += 1
+        facets = search_facets(section_counts, author_counts, tag_counts, month_counts)
+        
+        page_ids = [article_id for article_id, _ in hits[(page - 1) * limit:page * limit]]
+        # Only the start of the content that snippets are cut from leaves the
+        # database, one character more so make_snippet sees it was cut
+        found = {
+            article["id"]: article
+            async for article in db.articles.aggregate([
+                {"$match": {"id": {"$in": page_ids}}},
+                {"$project": {**ARTICLE_SUMMARY_PROJECTION, "content": {"$substrCP": ["$content", 0, SNIPPET_SCAN_LENGTH + 1]}}}
+            ])
+        }
+        articles = [found[article_id] for article_id in page_ids if article_id in found]
+        
+        # Highlight the words the query matched, misspelled words by the ones they were corrected to
+        highlight_terms = set()
+        for term in search_terms(q):
+            if search_index.knows(term):
+                highlight_terms.add(term)
+            else:
+                highlight_terms.update(similar for similar, _ in spelling.similar(term))
+        for article in articles:
+            article["snippet"], article["highlights"] = make_snippet(article.pop("content"), highlight_terms)
+            article["title_highlights"] = [(start, end) for start, end, _ in highlight_spans(article["title"], highlight_terms)]
+        
+        # Sections are few, so they are matched directly
+        search_regex = normalized_regex(q)
+        section_filters["$or"] = [
+            {"name_norm": search_regex},
+            {"description_norm": search_regex}
+        ]
+    else:
+        # Newest first, unless asked for oldest first
+        direction = ASCENDING if sort_by == "date_asc" else DESCENDING
+        top_values = [{"$sort": {"count": -1, "_id": 1}}, {"$limit": SEARCH_FACET_LIMIT}]
+        result = (await db.articles.aggregate([
+            {"$match": article_filters},
+            {"$facet": {
+                "articles": [
+                    {"$sort": {"created_at": direction, "id": direction}},
+                    {"$skip": (page - 1) * limit},
+                    {"$limit": limit},
+                    {"$project": ARTICLE_SUMMARY_PROJECTION}
+                ],
+                "total": [{"$count": "count"}],
+                "sections": [{"$group": {"_id": "$section_id", "count": {"$sum": 1}}}, *top_values],
+                "authors": [{"$group": {"_id": "$author", "count": {"$sum": 1}}}, *top_values],
+                "tags": [{"$unwind": "$tags"}, {"$group": {"_id": "$tags", "count": {"$sum": 1}}}, *top_values],
+                "months": [{"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}},
+                    "count": {"$sum": 1}
+                }}]
+            }}
+        ]).to_list(1))[0]
+        articles = result["articles"]
+        for article in articles:
+            article["snippet"] = article.get("excerpt", "")
+        total_articles = result["total"][0]["count"] if result["total"] else 0
+        await sync_suggestion_index()  # for the section names
+        facets = search_facets(*(
+            {value["_id"]: value["count"] for value in result[name] if value["_id"] is not None}
+            for name in ("sections", "authors", "tags", "months")
+        ))
+    
+    # Sections are few, so all the matching ones are counted
+    sections = await db.sections.find(section_filters).to_list(None)
     
     # Process articles to include like status for authenticated users
-    processed_articles = []
-    user_id = None  # Could be enhanced to get current user if authenticated
-    
-    for article in articles:
-        article_response = await get_article_with_like_status(article, user_id)
-        processed_articles.append(article_response)
+    user_id = current_user.id if current_user else None
+    processed_articles = await get_articles_with_like_status(articles, user_id, SearchHit)
     
     # Convert sections to proper format
     processed_sections = [Section(**section) for section in sections]
     
-    # Calculate total results
-    total_results = len(processed_articles) + len(processed_sections)
-    
     return {
         "articles": processed_articles,
-        "sections": processed_sections,
-        "total_results": total_results,
+        "sections": processed_sections[:20],
+        "total_results": total_articles + len(processed_sections),
+        "total_articles": total_articles,
+        "page": page,
+        "limit": limit,
+        "has_more": page * limit < total_articles,
+        "facets": facets,
         "query": q,
+        "did_you_mean": did_you_mean,
         "filters": {
             "section_id": section_id,
             "author": author,
@@ -706,152 +2772,186 @@ async def get_search_suggestions(q: str = ""):
     if not q.strip() or len(q.strip()) < 2:
         return {"suggestions": []}
     
-    # Normalize Arabic text for better search suggestions
-    normalized_query = q.strip()
-    # Handle hamza variations in suggestions
-    hamza_alef_pattern = normalized_query.replace('أ', '[أإآا]').replace('إ', '[أإآا]').replace('آ', '[أإآا]').replace('ا', '[أإآا]')
-    hamza_waw_pattern = hamza_alef_pattern.replace('ؤ', '[ؤو]').replace('و', '[ؤو]')
-    final_pattern = hamza_waw_pattern.replace('ئ', '[ئي]').replace('ي', '[ئي]')
-    
-    search_regex = {"$regex": final_pattern, "$options": "i"}
-    
-    # Get article titles and authors that match
-    articles = await db.articles.find(
-        {"$or": [
-            {"title": search_regex},
-            {"author": search_regex}
-        ]},
-        {"title": 1, "author": 1}
-    ).limit(10).to_list(10)
-    
-    # Get section names that match
-    sections = await db.sections.find(
-        {"name": search_regex},
-        {"name": 1}
-    ).limit(5).to_list(5)
-    
-    # Get tags that match
-    pipeline = [
-        {"$unwind": "$tags"},
-        {"$match": {"tags": search_regex}},
-        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 5}
-    ]
-    tags_cursor = db.articles.aggregate(pipeline)
-    tags_list = await tags_cursor.to_list(5)
-    
-    suggestions = []
-    
-    # Add unique titles
-    for article in articles:
-        if article["title"].lower() not in [s.lower() for s in suggestions]:
-            suggestions.append(article["title"])
-    
-    # Add unique authors
-    for article in articles:
-        if article["author"].lower() not in [s.lower() for s in suggestions]:
-            suggestions.append(article["author"])
-    
-    # Add section names
-    for section in sections:
-        if section["name"].lower() not in [s.lower() for s in suggestions]:
-            suggestions.append(section["name"])
-    
-    # Add tags with # prefix
-    for tag in tags_list:
-        tag_name = f"#{tag['_id']}"
-        if tag_name.lower() not in [s.lower() for s in suggestions]:
-            suggestions.append(tag_name)
-    
-    return {"suggestions": suggestions[:10]}  # Return top 10 suggestions
+    await sync_suggestion_index()
+    return {"suggestions": suggestion_index.suggest(q)}
 
 # Tags endpoints
 @api_router.get("/tags", response_model=TagsResponse)
-async def get_all_tags():
+async def get_all_tags(request: Request):
     """
     Get all tags with their counts
     """
-    # Aggregate tags from all articles
-    pipeline = [
-        {"$unwind": "$tags"},
-        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$project": {"name": "$_id", "count": 1, "_id": 0}}
-    ]
+    generation = await get_generation("articles")
+    etag = make_etag("tags", generation["value"])
+    headers = validator_headers(etag, generation["updated_at"])
+    if is_not_modified(request, etag, generation["updated_at"]):
+        return Response(status_code=304, headers=headers)
     
-    tags_cursor = db.articles.aggregate(pipeline)
-    tags_list = await tags_cursor.to_list(1000)
-    
-    tags = [Tag(**tag) for tag in tags_list]
+    return await cached_json(f"tags:{generation['value']}", ["tag-counts"], build_tag_counts, headers)
+
+async def build_tag_counts() -> TagsResponse:
+    tags_list = await db.tag_stats.find().sort([("count", DESCENDING), ("_id", ASCENDING)]).to_list(1000)
+    tags = [Tag(name=tag["_id"], count=tag["count"]) for tag in tags_list]
     return TagsResponse(tags=tags)
 
-@api_router.get("/tags/{tag_name}/articles", response_model=List[ArticleResponse])
-async def get_articles_by_tag(tag_name: str, current_user: Optional[User] = Depends(lambda: None)):
+@api_router.get("/tags/{tag_name}/articles", response_model=ArticlePage)
+async def get_articles_by_tag(
+    tag_name: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
     """
-    Get all articles with a specific tag
+    Get articles with a specific tag, newest first, one page at a time
     """
-    articles = await db.articles.find({"tags": tag_name}).to_list(1000)
-    result = []
-    user_id = None
-    for article in articles:
-        article_response = await get_article_with_like_status(article, user_id)
-        result.append(article_response)
-    return result
+    user_id = current_user.id if current_user else None
+    
+    async def build():
+        articles, next_cursor = await paginate(db.articles, {"tags": tag_name}, limit, cursor, projection=ARTICLE_SUMMARY_PROJECTION)
+        items = await get_articles_with_like_status(articles, user_id)
+        return ArticlePage(items=items, next_cursor=next_cursor)
+    
+    if user_id is not None:
+        return await build()
+    return await cached_json(f"tag-articles:{tag_name}:{limit}:{cursor}", ["articles"], build, VARY_AUTHORIZATION)
 
 # Site Settings / Logo Management endpoints
-@api_router.get("/settings/logo")
-async def get_site_logo():
-    settings = await db.site_settings.find_one()
+# The logo settings are read on every page load, so they are served from an
+# immutable in-process snapshot whose JSON body is serialized once per settings
+# version. A write swaps in a fresh snapshot in the process that made it; other
+# worker processes reload theirs after SITE_SETTINGS_MAX_AGE seconds.
+SITE_SETTINGS_MAX_AGE = 30
+
+class SiteSettingsSnapshot(NamedTuple):
+    version: int
+    etag: str
+    last_modified: Optional[datetime]
+    body: bytes
+    loaded_at: float
+
+site_settings_snapshot: Optional[SiteSettingsSnapshot] = None
+
+def site_logo_response(settings: Optional[dict]) -> dict:
     if not settings:
         # Return default/empty logo info
         return {
-            "logo_data": None,
+            "logo_url": None,
             "logo_name": None,
-            "site_name": "Foursan al aQida"
+            "site_name": "Foursan al aQida",
+            "version": 0
         }
     return {
-        "logo_data": settings.get("logo_data"),
+        "logo_url": media_url(settings.get("logo_id")),
         "logo_name": settings.get("logo_name"),
-        "site_name": settings.get("site_name", "Foursan al aQida")
+        "site_name": settings.get("site_name", "Foursan al aQida"),
+        "version": settings.get("version", 0)
     }
 
-@api_router.put("/settings/logo")
-async def update_site_logo(logo_update: LogoUpdate):
-    # In a real app, you'd want admin authentication here
-    # For now, we'll use a simple approach
-    
+async def load_site_settings_snapshot() -> SiteSettingsSnapshot:
+    """Read the settings document and install it as the current snapshot"""
+    global site_settings_snapshot
+    settings = await db.site_settings.find_one() or {}
+    body = site_logo_response(settings)
+    snapshot = SiteSettingsSnapshot(
+        version=body["version"],
+        etag=make_etag("logo", body["version"], settings.get("logo_id"), settings.get("updated_at")),
+        last_modified=settings.get("updated_at"),
+        body=json.dumps(body, ensure_ascii=False).encode(),
+        loaded_at=time.monotonic()
+    )
+    # A slower concurrent reload must not replace a newer version
+    if site_settings_snapshot is None or snapshot.version >= site_settings_snapshot.version:
+        site_settings_snapshot = snapshot
+    return site_settings_snapshot
+
+async def save_site_logo(update_data: dict) -> dict:
+    """Apply a logo change to the settings document, creating it on first use"""
     existing_settings = await db.site_settings.find_one()
     
     if existing_settings:
         # Update existing settings
-        update_data = {}
-        if logo_update.logo_data is not None:
-            update_data["logo_data"] = logo_update.logo_data
-        if logo_update.logo_name is not None:
-            update_data["logo_name"] = logo_update.logo_name
         update_data["updated_at"] = datetime.utcnow()
-        
-        await db.site_settings.update_one({"id": existing_settings["id"]}, {"$set": update_data})
-        updated_settings = await db.site_settings.find_one({"id": existing_settings["id"]})
-        return {
-            "logo_data": updated_settings.get("logo_data"),
-            "logo_name": updated_settings.get("logo_name"),
-            "site_name": updated_settings.get("site_name", "Foursan al aQida")
-        }
+        await db.site_settings.update_one(
+            {"id": existing_settings["id"]},
+            {"$set": update_data, "$inc": {"version": 1}}
+        )
+        if "logo_id" in update_data:
+            await release_media(existing_settings.get("logo_id"))
     else:
         # Create new settings
-        settings_dict = logo_update.dict()
-        settings_obj = SiteSettings(**settings_dict)
+        settings_obj = SiteSettings(**update_data)
         await db.site_settings.insert_one(settings_obj.dict())
-        return {
-            "logo_data": settings_obj.logo_data,
-            "logo_name": settings_obj.logo_name,
-            "site_name": settings_obj.site_name
+    
+    snapshot = await load_site_settings_snapshot()
+    return json.loads(snapshot.body)
+
+@api_router.get("/settings/logo")
+async def get_site_logo(request: Request):
+    snapshot = site_settings_snapshot
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > SITE_SETTINGS_MAX_AGE:
+        snapshot = await load_site_settings_snapshot()
+    
+    headers = validator_headers(snapshot.etag, snapshot.last_modified)
+    if is_not_modified(request, snapshot.etag, snapshot.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@api_router.put("/settings/logo")
+async def update_site_logo(logo_update: LogoUpdate):
+    # In a real app, you'd want admin authentication here
+    # For now, we'll use a simple approach
+    update_data = {}
+    if logo_update.logo_data is not None:
+        update_data["logo_id"] = await store_image_data(logo_update.logo_data, logo_update.logo_name)
+    if logo_update.logo_name is not None:
+        update_data["logo_name"] = logo_update.logo_name
+    return await save_site_logo(update_data)
+
+@upload_router.put("/settings/logo/image")
+async def upload_site_logo(file: UploadFile = File(...)):
+    logo_id = await store_upload(file)
+    return await save_site_logo({"logo_id": logo_id, "logo_name": file.filename})
+
+# Media endpoints
+@api_router.get("/media/{media_id}")
+async def get_media(media_id: str, variant: Optional[str] = None):
+    if variant is not None and variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Unknown image variant")
+    
+    grid_out = None
+    cache_control = "public, max-age=31536000, immutable"
+    if variant:
+        try:
+            grid_out = await media_bucket.open_download_stream(variant_id(media_id, variant))
+        except NoFile:
+            # Not rendered yet (or not smaller than the original): serve the
+            # original, but only cache it briefly under the variant URL
+            cache_control = "public, max-age=300"
+    if grid_out is None:
+        try:
+            grid_out = await media_bucket.open_download_stream(media_id)
+        except NoFile:
+            raise HTTPException(status_code=404, detail="Media not found")
+    
+    async def read_chunks():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    return StreamingResponse(
+        read_chunks(),
+        media_type=grid_out.metadata["content_type"],
+        headers={
+            "Content-Length": str(grid_out.length),
+            "Cache-Control": cache_control
         }
+    )
 
-# Include the router in the main app
+# Include the routers in the main app
 app.include_router(api_router)
+app.include_router(upload_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -868,6 +2968,194 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def backfill_article_summaries():
+    """Compute excerpts for articles written before they existed"""
+    updated = 0
+    async for article in db.articles.find(
+        {"excerpt": {"$exists": False}},
+        {"id": 1, "content": 1}
+    ):
+        await db.articles.update_one({"id": article["id"]}, {"$set": article_summary_fields(article)})
+        updated += 1
+    return {"updated": updated}
+
+async def backfill_normalized_fields():
+    """Compute the normalized search fields of documents written before they existed, and drop unused ones"""
+    updated = {}
+    for collection_name, fields in UNUSED_NORMALIZED_FIELDS.items():
+        unused = [f"{field}_norm" for field in fields]
+        await db[collection_name].update_many(
+            {"$or": [{field: {"$exists": True}} for field in unused]},
+            {"$unset": {field: "" for field in unused}}
+        )
+    for collection_name, fields in NORMALIZED_FIELDS.items():
+        collection = db[collection_name]
+        operations = []
+        count = 0
+        async for document in collection.find(
+            {f"{fields[0]}_norm": {"$exists": False}},
+            {field: 1 for field in fields}
+        ):
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": normalized_fields(collection_name, document)}))
+            count += 1
+            if len(operations) == 500:
+                await collection.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        updated[collection_name] = count
+    return updated
+
+# Base64 image fields moved into the media store:
+# (collection, legacy base64 field, media id field, file name field)
+LEGACY_MEDIA_FIELDS = [
+    ("articles", "image_data", "image_id", "image_name"),
+    ("users", "profile_picture", "profile_picture_id", None),
+    ("site_settings", "logo_data", "logo_id", "logo_name"),
+]
+
+async def migrate_media():
+    """Move base64 images still embedded in documents into the media store"""
+    migrated = {}
+    for collection_name, data_field, id_field, name_field in LEGACY_MEDIA_FIELDS:
+        collection = db[collection_name]
+        count = 0
+        async for document in collection.find({data_field: {"$exists": True}}):
+            update = {"$unset": {data_field: ""}}
+            if document[data_field]:
+                image_name = document.get(name_field) if name_field else None
+                try:
+                    content, media_type = decode_image_data(document[data_field], image_name)
+                except ValueError:
+                    logger.warning("Skipping undecodable %s.%s on %s", collection_name, data_field, document["_id"])
+                    continue
+                update["$set"] = {id_field: await store_media(content, media_type, image_name)}
+            await collection.update_one({"_id": document["_id"]}, update)
+            count += 1
+        migrated[collection_name] = count
+    
+    # Superseded by image_id
+    await db.articles.update_many({"has_image": {"$exists": True}}, {"$unset": {"has_image": ""}})
+    return migrated
+
+# Every media id field, i.e. every reference counted in media_refs:
+# (collection, media id field)
+MEDIA_REFERENCE_FIELDS = [
+    ("articles", "image_id"),
+    ("users", "profile_picture_id"),
+    ("site_settings", "logo_id"),
+]
+
+async def dedupe_media():
+    """Re-key media stored under random ids by content hash and recount media_refs"""
+    rekeyed = 0
+    refs = {}
+    for collection_name, id_field in MEDIA_REFERENCE_FIELDS:
+        collection = db[collection_name]
+        async for document in collection.find({id_field: {"$ne": None}}, {id_field: 1}):
+            media_id = document[id_field]
+            if len(media_id) != 64:
+                # Stored under a uuid before media was content addressed
+                try:
+                    grid_out = await media_bucket.open_download_stream(media_id)
+                except NoFile:
+                    logger.warning("Missing media %s referenced by %s.%s", media_id, collection_name, id_field)
+                    continue
+                content = await grid_out.read()
+                digest = hashlib.sha256(content).hexdigest()
+                if not await media_bucket.find({"_id": digest}).to_list(1):
+                    await media_bucket.upload_from_stream_with_id(digest, grid_out.filename, content, metadata=grid_out.metadata)
+                await collection.update_one({"_id": document["_id"]}, {"$set": {id_field: digest}})
+                await media_bucket.delete(media_id)
+                media_id = digest
+                rekeyed += 1
+            refs[media_id] = refs.get(media_id, 0) + 1
+    
+    await db.media_refs.delete_many({"_id": {"$nin": list(refs)}})
+    for media_id, count in refs.items():
+        await db.media_refs.update_one({"_id": media_id}, {"$set": {"refs": count}}, upsert=True)
+    
+    # Blobs nothing points at any more, and variants of such blobs
+    orphans = [grid_out._id async for grid_out in media_bucket.find({
+        "_id": {"$nin": list(refs)},
+        "metadata.variant_of": {"$nin": list(refs)}
+    })]
+    for media_id in orphans:
+        await media_bucket.delete(media_id)
+    return {"rekeyed": rekeyed, "referenced": len(refs), "deleted_orphans": len(orphans)}
+
+async def build_image_variants():
+    """Render variants for stored images that have none yet"""
+    built = 0
+    async for grid_out in media_bucket.find({"metadata.variant_of": {"$exists": False}}):
+        if await media_bucket.find({"metadata.variant_of": grid_out._id}).to_list(1):
+            continue
+        if await generate_image_variants(grid_out._id):
+            built += 1
+    return {"images": built}
+
+async def deactivate_user(username: str):
+    """Stop a user from logging in or using their existing tokens"""
+    user = await db.users.find_one_and_update({"username": username}, {"$set": {"is_active": False}}, {"id": 1})
+    if user is None:
+        return {"deactivated": False}
+    # Workers without a shared cache notice within USER_CACHE_TTL
+    await invalidate_user(user["id"])
+    return {"deactivated": True}
+
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes()
+    await ensure_unique_likes()
+    # First start after tag_stats was introduced
+    if not await db.tag_stats.find_one() and await db.articles.find_one({"tags.0": {"$exists": True}}):
+        await rebuild_tag_stats()
+    # First start after the normalized search fields were introduced
+    if await db.articles.find_one({"author_norm": {"$exists": False}}) or await db.sections.find_one({"name_norm": {"$exists": False}}):
+        await backfill_normalized_fields()
+    # First start after excerpts were introduced
+    if await db.articles.find_one({"excerpt": {"$exists": False}}, {"_id": 1}):
+        await backfill_article_summaries()
+    # First start after images moved into the media store
+    if any([
+        await db[collection_name].find_one({data_field: {"$exists": True}}, {"_id": 1})
+        for collection_name, data_field, _, _ in LEGACY_MEDIA_FIELDS
+    ]):
+        await migrate_media()
+    acquire_search_index_writer()
+    await sync_search_index()
+    await sync_suggestion_index()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await flush_search_index()
     client.close()
+    image_pool.shutdown(wait=False, cancel_futures=True)
+    password_hasher.pool.shutdown(wait=False, cancel_futures=True)
+
+# Maintenance commands, e.g. `python server.py ensure-indexes`
+MAINTENANCE_COMMANDS = {
+    "ensure-indexes": (ensure_indexes, "Create any missing database index"),
+    "verify-indexes": (verify_indexes, "Report missing, unregistered and unused indexes"),
+    "backfill-summaries": (backfill_article_summaries, "Compute excerpts for existing articles"),
+    "migrate-media": (migrate_media, "Move embedded base64 images into the media store"),
+    "dedupe-media": (dedupe_media, "Re-key media by content hash, recount references and drop orphans"),
+    "build-image-variants": (build_image_variants, "Render thumbnail and WebP variants for stored images"),
+    "rebuild-tag-stats": (rebuild_tag_stats, "Recompute tag counts from the articles"),
+    "backfill-normalized": (backfill_normalized_fields, "Compute normalized search fields for existing articles and sections"),
+    "deactivate-user": (deactivate_user, "Deactivate the user with the given username"),
+    "recount-likes": (recount_likes, "Recompute article like counts from the likes"),
+    "dedupe-likes": (dedupe_likes, "Remove repeated likes of an article by the same user, then recount"),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Foursan al aQida backend maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command_name, (command, command_help) in MAINTENANCE_COMMANDS.items():
+        subparser = subparsers.add_parser(command_name, help=command_help)
+        for parameter in inspect.signature(command).parameters:
+            subparser.add_argument(parameter)
+    args = vars(parser.parse_args())
+    
+    command, _ = MAINTENANCE_COMMANDS[args.pop("command")]
+    print(json.dumps(asyncio.run(command(**args)), indent=2, ensure_ascii=False, default=str))
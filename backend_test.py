@@ -196,7 +196,7 @@ class TestBackendAPI(unittest.TestCase):
         
         article_with_image = response.json()
         self.assertEqual(article_with_image["title"], article_with_image_data["title"])
-        self.assertEqual(article_with_image["image_data"], article_with_image_data["image_data"])
+        self.assertIsNotNone(article_with_image["image_id"])
         self.assertEqual(article_with_image["image_name"], article_with_image_data["image_name"])
         
         # Add to cleanup list
@@ -209,7 +209,7 @@ class TestBackendAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles")
         self.assertEqual(response.status_code, 200, f"Failed to get articles: {response.text}")
         
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertIsInstance(articles, list)
         self.assertTrue(any(a["id"] == article_id for a in articles), "Created article not found in articles list")
         self.assertTrue(any(a["id"] == article_with_image_id for a in articles), "Created article with image not found in articles list")
@@ -232,7 +232,10 @@ class TestBackendAPI(unittest.TestCase):
         
         retrieved_article_with_image = response.json()
         self.assertEqual(retrieved_article_with_image["id"], article_with_image_id)
-        self.assertEqual(retrieved_article_with_image["image_data"], article_with_image_data["image_data"])
+        response = requests.get(f"{BACKEND_URL}{retrieved_article_with_image['image_url']}")
+        self.assertEqual(response.status_code, 200, f"Failed to get article image: {response.text}")
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertEqual(response.content, base64.b64decode(article_with_image_data["image_data"]))
         print("Successfully retrieved article with image")
         
         # 6. Update an article
@@ -256,7 +259,7 @@ class TestBackendAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles/section/{self.test_section['id']}")
         self.assertEqual(response.status_code, 200, f"Failed to get articles by section: {response.text}")
         
-        section_articles = response.json()
+        section_articles = response.json()["items"]
         self.assertIsInstance(section_articles, list)
         self.assertTrue(any(a["id"] == article_id for a in section_articles), "Created article not found in section articles")
         self.assertTrue(any(a["id"] == article_with_image_id for a in section_articles), "Created article with image not found in section articles")
@@ -269,7 +272,7 @@ class TestBackendAPI(unittest.TestCase):
         
         # Verify article was deleted
         response = requests.get(f"{API_URL}/articles")
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertFalse(any(a["id"] == article_id for a in articles), "Deleted article still found in articles list")
         print("Successfully deleted article")
         
@@ -327,7 +330,7 @@ class TestBackendAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles/section/{section_id}")
         self.assertEqual(response.status_code, 200, f"Failed to get articles by section: {response.text}")
         
-        section_articles = response.json()
+        section_articles = response.json()["items"]
         self.assertEqual(len(section_articles), article_count, f"Expected {article_count} articles in section, got {len(section_articles)}")
         print(f"Verified {len(section_articles)} articles exist in the section")
         
@@ -385,7 +388,7 @@ class TestBackendAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles/{self.test_article['id']}/comments")
         self.assertEqual(response.status_code, 200, f"Failed to get comments: {response.text}")
         
-        comments = response.json()
+        comments = response.json()["items"]
         self.assertIsInstance(comments, list)
         self.assertTrue(any(c["id"] == comment_id for c in comments), "Created comment not found in comments list")
         print(f"Successfully retrieved {len(comments)} comments")
@@ -418,7 +421,7 @@ class TestBackendAPI(unittest.TestCase):
         
         # Verify comment was deleted
         response = requests.get(f"{API_URL}/articles/{self.test_article['id']}/comments")
-        comments = response.json()
+        comments = response.json()["items"]
         self.assertFalse(any(c["id"] == comment_id for c in comments), "Deleted comment still found in comments list")
         print("Successfully deleted comment")
         
@@ -445,13 +448,14 @@ class TestBackendAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to get logo settings: {response.text}")
         
         logo_settings = response.json()
-        self.assertIn("logo_data", logo_settings)
+        self.assertIn("logo_url", logo_settings)
         self.assertIn("logo_name", logo_settings)
         self.assertIn("site_name", logo_settings)
         print("Successfully retrieved logo settings")
         
         # Save initial logo data for comparison
-        initial_logo_data = logo_settings.get("logo_data")
+        initial_logo_url = logo_settings.get("logo_url")
+        initial_logo_data = base64.b64encode(requests.get(f"{BACKEND_URL}{initial_logo_url}").content).decode() if initial_logo_url else None
         initial_logo_name = logo_settings.get("logo_name")
         
         # 2. Update logo settings
@@ -465,7 +469,7 @@ class TestBackendAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to update logo settings: {response.text}")
         
         updated_logo = response.json()
-        self.assertEqual(updated_logo["logo_data"], logo_update["logo_data"])
+        self.assertIsNotNone(updated_logo["logo_url"])
         self.assertEqual(updated_logo["logo_name"], logo_update["logo_name"])
         print("Successfully updated logo settings")
         
@@ -475,7 +479,10 @@ class TestBackendAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to get updated logo settings: {response.text}")
         
         verified_logo = response.json()
-        self.assertEqual(verified_logo["logo_data"], logo_update["logo_data"])
+        self.assertEqual(verified_logo["logo_url"], updated_logo["logo_url"])
+        response = requests.get(f"{BACKEND_URL}{verified_logo['logo_url']}")
+        self.assertEqual(response.status_code, 200, f"Failed to get logo image: {response.text}")
+        self.assertEqual(response.content, base64.b64decode(logo_update["logo_data"]))
         self.assertEqual(verified_logo["logo_name"], logo_update["logo_name"])
         print("Successfully verified logo update")
         
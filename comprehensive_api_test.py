@@ -221,7 +221,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(article["content"], article_data["content"])
         self.assertEqual(article["author"], article_data["author"])
         self.assertEqual(article["section_id"], article_data["section_id"])
-        self.assertEqual(article["image_data"], article_data["image_data"])
+        self.assertIsNotNone(article["image_id"])
         self.assertEqual(article["image_name"], article_data["image_name"])
         self.assertIn("id", article)
         
@@ -235,7 +235,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles")
         self.assertEqual(response.status_code, 200, f"Failed to get articles: {response.text}")
         
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertIsInstance(articles, list)
         self.assertTrue(any(a["id"] == article_id for a in articles), "Created article not found in articles list")
         print(f"Successfully retrieved {len(articles)} articles")
@@ -272,7 +272,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles/section/{self.test_section['id']}")
         self.assertEqual(response.status_code, 200, f"Failed to get articles by section: {response.text}")
         
-        section_articles = response.json()
+        section_articles = response.json()["items"]
         self.assertIsInstance(section_articles, list)
         self.assertTrue(any(a["id"] == article_id for a in section_articles), "Created article not found in section articles")
         print(f"Successfully retrieved {len(section_articles)} articles for the section")
@@ -284,7 +284,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         
         # Verify article was deleted
         response = requests.get(f"{API_URL}/articles")
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertFalse(any(a["id"] == article_id for a in articles), "Deleted article still found in articles list")
         print("Successfully deleted article")
         
@@ -415,7 +415,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         response = requests.get(f"{API_URL}/articles/{self.test_article['id']}/comments")
         self.assertEqual(response.status_code, 200, f"Failed to get comments: {response.text}")
         
-        comments = response.json()
+        comments = response.json()["items"]
         self.assertIsInstance(comments, list)
         self.assertTrue(any(c["id"] == comment_id for c in comments), "Created comment not found in comments list")
         print(f"Successfully retrieved {len(comments)} comments")
@@ -448,7 +448,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         
         # Verify comment was deleted
         response = requests.get(f"{API_URL}/articles/{self.test_article['id']}/comments")
-        comments = response.json()
+        comments = response.json()["items"]
         self.assertFalse(any(c["id"] == comment_id for c in comments), "Deleted comment still found in comments list")
         print("Successfully deleted comment")
         
@@ -468,10 +468,17 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to like article: {response.text}")
         print("Successfully liked article")
         
+        # A second like is refused and not counted
+        response = requests.post(
+            f"{API_URL}/articles/{self.test_article['id']}/like",
+            headers=self.auth_headers
+        )
+        self.assertEqual(response.status_code, 400, "Liking twice should fail")
+        
         # 2. Verify article is liked by getting it with authentication
         print("Verifying article is liked")
         response = requests.get(
-            f"{API_URL}/articles-auth/{self.test_article['id']}",
+            f"{API_URL}/articles/{self.test_article['id']}",
             headers=self.auth_headers
         )
         self.assertEqual(response.status_code, 200, f"Failed to get article with auth: {response.text}")
@@ -481,6 +488,21 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(article["likes_count"], 1, "Article should have 1 like")
         print("Successfully verified article is liked")
         
+        # List endpoints fill in the like status for logged-in callers only
+        section_url = f"{API_URL}/articles/section/{self.test_section['id']}"
+        for headers, is_liked in [(self.auth_headers, True), ({}, None)]:
+            response = requests.get(section_url, headers=headers)
+            self.assertEqual(response.status_code, 200, f"Failed to get section articles: {response.text}")
+            article = next(item for item in response.json()["items"] if item["id"] == self.test_article["id"])
+            self.assertEqual(article["is_liked"], is_liked)
+        print("Successfully verified like status in article lists")
+        
+        # Bulk status: one bit per requested id
+        status_request = {"article_ids": ["missing-article", self.test_article["id"]]}
+        response = requests.post(f"{API_URL}/likes/status", json=status_request, headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200, f"Failed to get like status: {response.text}")
+        self.assertEqual(base64.b64decode(response.json()["bitmap"]), bytes([0b10]))
+        
         # 3. Unlike an article
         print(f"Unliking article with ID: {self.test_article['id']}")
         response = requests.delete(
@@ -493,7 +515,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         # 4. Verify article is unliked
         print("Verifying article is unliked")
         response = requests.get(
-            f"{API_URL}/articles-auth/{self.test_article['id']}",
+            f"{API_URL}/articles/{self.test_article['id']}",
             headers=self.auth_headers
         )
         self.assertEqual(response.status_code, 200, f"Failed to get article with auth: {response.text}")
@@ -501,6 +523,9 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         article = response.json()
         self.assertFalse(article["is_liked"], "Article should not be marked as liked")
         self.assertEqual(article["likes_count"], 0, "Article should have 0 likes")
+        
+        response = requests.post(f"{API_URL}/likes/status", json=status_request, headers=self.auth_headers)
+        self.assertEqual(base64.b64decode(response.json()["bitmap"]), bytes([0]))
         print("Successfully verified article is unliked")
 
     def test_7_logo_management(self):
@@ -513,13 +538,14 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to get logo settings: {response.text}")
         
         initial_logo = response.json()
-        self.assertIn("logo_data", initial_logo)
+        self.assertIn("logo_url", initial_logo)
         self.assertIn("logo_name", initial_logo)
         self.assertIn("site_name", initial_logo)
         print("Successfully retrieved logo settings")
         
         # Save initial logo data for restoration
-        initial_logo_data = initial_logo.get("logo_data")
+        initial_logo_url = initial_logo.get("logo_url")
+        initial_logo_data = base64.b64encode(requests.get(f"{BACKEND_URL}{initial_logo_url}").content).decode() if initial_logo_url else None
         initial_logo_name = initial_logo.get("logo_name")
         
         # 2. Update logo settings
@@ -533,7 +559,7 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to update logo settings: {response.text}")
         
         updated_logo = response.json()
-        self.assertEqual(updated_logo["logo_data"], logo_update["logo_data"])
+        self.assertIsNotNone(updated_logo["logo_url"])
         self.assertEqual(updated_logo["logo_name"], logo_update["logo_name"])
         print("Successfully updated logo settings")
         
@@ -543,7 +569,10 @@ class TestArabicPublishingSystemAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200, f"Failed to get updated logo settings: {response.text}")
         
         verified_logo = response.json()
-        self.assertEqual(verified_logo["logo_data"], logo_update["logo_data"])
+        self.assertEqual(verified_logo["logo_url"], updated_logo["logo_url"])
+        response = requests.get(f"{BACKEND_URL}{verified_logo['logo_url']}")
+        self.assertEqual(response.status_code, 200, f"Failed to get logo image: {response.text}")
+        self.assertEqual(response.content, base64.b64decode(logo_update["logo_data"]))
         self.assertEqual(verified_logo["logo_name"], logo_update["logo_name"])
         print("Successfully verified logo update")
         
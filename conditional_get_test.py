@@ -0,0 +1,127 @@
+import requests
+import unittest
+import uuid
+import os
+from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+# Load environment variables from frontend .env file
+frontend_env_path = Path('/app/frontend/.env')
+load_dotenv(frontend_env_path)
+
+# Get the backend URL from environment variables
+BACKEND_URL = os.environ.get('REACT_APP_BACKEND_URL')
+if not BACKEND_URL:
+    print("Error: REACT_APP_BACKEND_URL not found in environment variables")
+    sys.exit(1)
+
+# Ensure the URL ends with /api
+API_URL = f"{BACKEND_URL}/api"
+print(f"Using API URL: {API_URL}")
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        response = requests.post(f"{API_URL}/sections", json={
+            "name": f"ETag Section {uuid.uuid4()}",
+            "description": "This is a test section for conditional GET testing"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test section: {response.text}")
+        self.test_section = response.json()
+
+        response = requests.post(f"{API_URL}/articles", json={
+            "title": "مقالة اختبار ETag",
+            "content": "محتوى مقالة لاختبار الطلبات الشرطية",
+            "author": "كاتب الاختبار",
+            "section_id": self.test_section["id"],
+            "tags": [f"وسم-{uuid.uuid4().hex[:8]}"]
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test article: {response.text}")
+        self.test_article = response.json()
+
+    def tearDown(self):
+        try:
+            requests.delete(f"{API_URL}/sections/{self.test_section['id']}")
+        except Exception as e:
+            print(f"Error cleaning up section {self.test_section['id']}: {e}")
+
+    def assertRevalidates(self, url):
+        """The ETag of url yields a 304, and return it"""
+        response = requests.get(url)
+        self.assertEqual(response.status_code, 200, f"Failed to get {url}: {response.text}")
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag, f"{url} should send an ETag")
+
+        response = requests.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304, f"{url} should answer a matching If-None-Match with 304")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers.get("ETag"), etag)
+        return etag
+
+    def test_article_etag(self):
+        """Article ETags change when the article is updated"""
+        print("\n=== Testing conditional GET on /api/articles/{id} ===")
+
+        url = f"{API_URL}/articles/{self.test_article['id']}"
+        etag = self.assertRevalidates(url)
+
+        # Likes don't change updated_at, so only the ETag can tell they happened
+        response = requests.get(url)
+        self.assertNotIn("Last-Modified", response.headers)
+        response = requests.get(url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+        self.assertEqual(response.status_code, 200)
+
+        response = requests.put(url, json={"title": "عنوان جديد"})
+        self.assertEqual(response.status_code, 200, f"Failed to update article: {response.text}")
+        response = requests.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200, "Updated article should not be 304")
+        self.assertEqual(response.json()["title"], "عنوان جديد")
+        print("Article conditional GET works correctly")
+
+    def test_sections_etag(self):
+        """The sections list ETag changes when a section is added"""
+        print("\n=== Testing conditional GET on /api/sections ===")
+
+        etag = self.assertRevalidates(f"{API_URL}/sections")
+
+        response = requests.post(f"{API_URL}/sections", json={"name": f"Another Section {uuid.uuid4()}"})
+        self.assertEqual(response.status_code, 200)
+        section_id = response.json()["id"]
+        try:
+            response = requests.get(f"{API_URL}/sections", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200, "Sections list should change after a new section")
+        finally:
+            requests.delete(f"{API_URL}/sections/{section_id}")
+        print("Sections conditional GET works correctly")
+
+    def test_tags_etag(self):
+        """The tags list ETag changes when article tags change"""
+        print("\n=== Testing conditional GET on /api/tags ===")
+
+        etag = self.assertRevalidates(f"{API_URL}/tags")
+
+        response = requests.put(f"{API_URL}/articles/{self.test_article['id']}", json={"tags": ["وسم-معدل"]})
+        self.assertEqual(response.status_code, 200)
+        response = requests.get(f"{API_URL}/tags", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200, "Tags list should change after an article update")
+        print("Tags conditional GET works correctly")
+
+    def test_logo_etag(self):
+        """The logo settings can be revalidated"""
+        print("\n=== Testing conditional GET on /api/settings/logo ===")
+
+        etag = self.assertRevalidates(f"{API_URL}/settings/logo")
+        version = requests.get(f"{API_URL}/settings/logo").json()["version"]
+
+        response = requests.put(f"{API_URL}/settings/logo", json={"logo_name": f"logo-{uuid.uuid4().hex[:8]}.png"})
+        self.assertEqual(response.status_code, 200, f"Failed to update logo: {response.text}")
+        self.assertEqual(response.json()["version"], version + 1)
+
+        response = requests.get(f"{API_URL}/settings/logo", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200, "Updated logo settings should not be 304")
+        self.assertEqual(response.json()["version"], version + 1)
+        print("Logo conditional GET works correctly")
+
+if __name__ == "__main__":
+    # Run the tests
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
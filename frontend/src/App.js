@@ -6,6 +6,17 @@ import { BrowserRouter, Routes, Route, Link, useNavigate, useParams } from "reac
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Media URLs come from the API as /api/media/{id}; variants are smaller WebP
+// renditions ("thumb" for cards, "avatar" for avatars and logos, "webp")
+const mediaSrc = (url, variant) => `${BACKEND_URL}${url}${variant ? `?variant=${variant}` : ""}`;
+
+// List endpoints are cursor-paginated ({ items, next_cursor }); views fetch
+// the first page and pass next_cursor back to load more
+const fetchPage = async (url, cursor = null) => {
+  const response = await axios.get(url, { params: { limit: 20, cursor } });
+  return response.data;
+};
+
 // Admin passcode (in real app, this would be in environment variables)
 const ADMIN_PASSCODE = "admin2025";
 
@@ -151,9 +162,9 @@ const PublicLayout = ({ children }) => {
             <Link to="/" className="flex items-center space-x-4 space-x-reverse">
               {/* Dynamic Logo */}
               <div className="w-16 h-16 bg-black rounded-lg flex items-center justify-center overflow-hidden border border-gray-600">
-                {siteLogo?.logo_data ? (
+                {siteLogo?.logo_url ? (
                   <img
-                    src={siteLogo.logo_data}
+                    src={mediaSrc(siteLogo.logo_url, "avatar")}
                     alt="شعار الموقع"
                     className="w-full h-full object-contain"
                   />
@@ -252,9 +263,9 @@ const PublicLayout = ({ children }) => {
                 {user ? (
                   <div className="flex items-center space-x-4 space-x-reverse">
                     <div className="flex items-center space-x-2 space-x-reverse">
-                      {user.profile_picture && (
+                      {user.profile_picture_url && (
                         <img 
-                          src={user.profile_picture} 
+                          src={mediaSrc(user.profile_picture_url, "avatar")} 
                           alt={user.full_name}
                           className="w-8 h-8 rounded-full object-cover"
                         />
@@ -355,9 +366,9 @@ const PublicLayout = ({ children }) => {
             <div>
               <div className="flex items-center space-x-3 space-x-reverse mb-4">
                 <div className="w-12 h-12 bg-black rounded-lg flex items-center justify-center overflow-hidden border border-gray-600">
-                  {siteLogo?.logo_data ? (
+                  {siteLogo?.logo_url ? (
                     <img
-                      src={siteLogo.logo_data}
+                      src={mediaSrc(siteLogo.logo_url, "avatar")}
                       alt="شعار الموقع"
                       className="w-full h-full object-contain"
                     />
@@ -412,20 +423,22 @@ const HomePage = () => {
   const [sections, setSections] = useState([]);
   const [featuredArticles, setFeaturedArticles] = useState([]);
   const [popularTags, setPopularTags] = useState([]);
+  const [sectionCounts, setSectionCounts] = useState({});
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchData();
+    fetchSectionCounts();
   }, []);
 
   const fetchData = async () => {
     try {
       const [articlesRes, sectionsRes, tagsRes] = await Promise.all([
-        axios.get(`${API}/articles`),
+        axios.get(`${API}/articles`, { params: { limit: 12 } }),
         axios.get(`${API}/sections`),
         axios.get(`${API}/tags`)
       ]);
-      const allArticles = articlesRes.data;
+      const allArticles = articlesRes.data.items;
       setArticles(allArticles);
       setSections(sectionsRes.data);
       setPopularTags(tagsRes.data.tags.slice(0, 10)); // Top 10 tags
@@ -439,15 +452,21 @@ const HomePage = () => {
     }
   };
 
+  // Fetched on its own so the page still loads if the counts are unavailable
+  const fetchSectionCounts = async () => {
+    try {
+      const response = await axios.get(`${API}/sections/counts`);
+      setSectionCounts(response.data);
+    } catch (error) {
+      console.error("Error fetching section counts:", error);
+    }
+  };
+
   const getSectionName = (sectionId) => {
     const section = sections.find(s => s.id === sectionId);
     return section ? section.name : "عام";
   };
 
-  const getArticlesBySection = (sectionId) => {
-    return articles.filter(article => article.section_id === sectionId);
-  };
-
   if (loading) {
     return (
       <PublicLayout>
@@ -487,9 +506,9 @@ const HomePage = () => {
                     index === 0 ? 'lg:col-span-2 lg:row-span-2' : ''
                   }`}
                 >
-                  {article.image_data && (
+                  {article.image_url && (
                     <img
-                      src={article.image_data}
+                      src={mediaSrc(article.image_url, "thumb")}
                       alt={article.title}
                       className={`w-full object-cover group-hover:scale-105 transition-transform duration-300 ${
                         index === 0 ? 'h-64 lg:h-80' : 'h-48'
@@ -511,8 +530,8 @@ const HomePage = () => {
                       index === 0 ? 'text-lg lg:text-xl mb-6' : 'line-clamp-3'
                     }`}>
                       {index === 0 
-                        ? article.content.slice(0, 200) + '...'
-                        : article.content.slice(0, 100) + '...'
+                        ? article.excerpt
+                        : article.excerpt.slice(0, 100) + '...'
                       }
                     </p>
                     {/* Article Tags */}
@@ -559,7 +578,6 @@ const HomePage = () => {
           </h2>
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
             {sections.map((section) => {
-              const sectionArticles = getArticlesBySection(section.id);
               return (
                 <Link
                   key={section.id}
@@ -570,9 +588,11 @@ const HomePage = () => {
                     <h3 className="text-xl font-bold group-hover:text-red-400 transition-colors">
                       {section.name}
                     </h3>
-                    <span className="bg-red-600 text-white text-sm px-3 py-1 rounded-full">
-                      {sectionArticles.length}
-                    </span>
+                    {section.id in sectionCounts && (
+                      <span className="bg-red-600 text-white text-sm px-3 py-1 rounded-full">
+                        {sectionCounts[section.id]}
+                      </span>
+                    )}
                   </div>
                   {section.description && (
                     <p className="text-gray-400 mb-4 line-clamp-3">
@@ -605,9 +625,9 @@ const HomePage = () => {
                 to={`/article/${article.id}`}
                 className="bg-gray-900 rounded-xl overflow-hidden hover:bg-gray-800 transition-all duration-300 group shadow-lg article-card"
               >
-                {article.image_data && (
+                {article.image_url && (
                   <img
-                    src={article.image_data}
+                    src={mediaSrc(article.image_url, "thumb")}
                     alt={article.title}
                     className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-300"
                   />
@@ -622,7 +642,7 @@ const HomePage = () => {
                     {article.title}
                   </h3>
                   <p className="text-gray-400 line-clamp-3 mb-4">
-                    {article.content.slice(0, 120)}...
+                    {article.excerpt}
                   </p>
                   {/* Article Tags */}
                   {article.tags && article.tags.length > 0 && (
@@ -837,10 +857,10 @@ const ArticlePage = () => {
           </header>
 
           {/* Article Image */}
-          {article.image_data && (
+          {article.image_url && (
             <div className="mb-8">
               <img
-                src={article.image_data}
+                src={mediaSrc(article.image_url, "webp")}
                 alt={article.title}
                 className="w-full max-h-96 object-cover rounded-xl shadow-lg"
               />
@@ -880,10 +900,25 @@ const ArticlePage = () => {
   );
 };
 
+// "Load more" button under a cursor-paginated list
+const LoadMoreButton = ({ onClick, loading }) => (
+  <div className="text-center mt-8">
+    <button
+      onClick={onClick}
+      disabled={loading}
+      className="bg-gray-800 hover:bg-gray-700 px-6 py-2 rounded-lg font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+    >
+      {loading ? 'جارٍ التحميل...' : 'عرض المزيد'}
+    </button>
+  </div>
+);
+
 // Comments Component
 const CommentsSection = ({ articleId }) => {
   const { user, isAuthenticated } = useAuth();
   const [comments, setComments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [newComment, setNewComment] = useState('');
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
@@ -896,8 +931,9 @@ const CommentsSection = ({ articleId }) => {
 
   const fetchComments = async () => {
     try {
-      const response = await axios.get(`${API}/articles/${articleId}/comments`);
-      setComments(response.data);
+      const page = await fetchPage(`${API}/articles/${articleId}/comments`);
+      setComments(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching comments:', error);
     } finally {
@@ -905,6 +941,19 @@ const CommentsSection = ({ articleId }) => {
     }
   };
 
+  const loadMoreComments = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`${API}/articles/${articleId}/comments`, nextCursor);
+      setComments([...comments, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching comments:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSubmitComment = async (e) => {
     e.preventDefault();
     if (!newComment.trim()) return;
@@ -914,7 +963,10 @@ const CommentsSection = ({ articleId }) => {
       const response = await axios.post(`${API}/articles/${articleId}/comments`, {
         content: newComment.trim()
       });
-      setComments([...comments, response.data]);
+      // Comments are oldest first: a new one shows once the last page is loaded
+      if (!nextCursor) {
+        setComments([...comments, response.data]);
+      }
       setNewComment('');
     } catch (error) {
       console.error('Error submitting comment:', error);
@@ -966,7 +1018,7 @@ const CommentsSection = ({ articleId }) => {
 
   return (
     <div className="max-w-4xl mx-auto mt-16">
-      <h3 className="text-2xl font-bold mb-8 arabic-title">التعليقات ({comments.length})</h3>
+      <h3 className="text-2xl font-bold mb-8 arabic-title">التعليقات ({comments.length}{nextCursor ? '+' : ''})</h3>
       
       {/* Comment Form */}
       {isAuthenticated ? (
@@ -1021,9 +1073,9 @@ const CommentsSection = ({ articleId }) => {
           {comments.map((comment) => (
             <div key={comment.id} className="bg-gray-900 rounded-lg p-6">
               <div className="flex items-start space-x-4 space-x-reverse">
-                {comment.user_profile_picture ? (
+                {comment.user_profile_picture_url ? (
                   <img
-                    src={comment.user_profile_picture}
+                    src={mediaSrc(comment.user_profile_picture_url, "avatar")}
                     alt={comment.user_full_name}
                     className="w-10 h-10 rounded-full object-cover flex-shrink-0"
                   />
@@ -1097,6 +1149,7 @@ const CommentsSection = ({ articleId }) => {
               </div>
             </div>
           ))}
+          {nextCursor && <LoadMoreButton onClick={loadMoreComments} loading={loadingMore} />}
         </div>
       )}
     </div>
@@ -1294,6 +1347,19 @@ const SearchPage = () => {
     return text.replace(regex, '<mark class="bg-yellow-300 text-black">$1</mark>');
   };
 
+  // Marks the [start, end) character ranges the server matched
+  const renderHighlights = (text, spans) => {
+    const parts = [];
+    let position = 0;
+    (spans || []).forEach(([start, end]) => {
+      parts.push(text.slice(position, start));
+      parts.push(<mark key={start} className="bg-yellow-300 text-black">{text.slice(start, end)}</mark>);
+      position = end;
+    });
+    parts.push(text.slice(position));
+    return parts;
+  };
+
   if (loading) {
     return (
       <PublicLayout>
@@ -1374,6 +1440,17 @@ const SearchPage = () => {
           <p className="text-gray-400">
             {results?.total_results || 0} نتيجة
           </p>
+          {results?.did_you_mean && (
+            <p className="text-gray-400 mt-2">
+              هل تقصد:{' '}
+              <button
+                onClick={() => selectSuggestion(results.did_you_mean)}
+                className="text-red-500 hover:text-red-400 arabic-content"
+              >
+                {results.did_you_mean}
+              </button>
+            </p>
+          )}
         </div>
 
         {/* Search Filters */}
@@ -1509,10 +1586,10 @@ const SearchPage = () => {
                   {results.articles.map((article) => (
                     <div key={article.id} className="bg-gray-900 rounded-lg overflow-hidden hover:bg-gray-800 transition-colors">
                       <div className="flex flex-col md:flex-row">
-                        {article.image_data && (
+                        {article.image_url && (
                           <div className="md:w-48 h-48 md:h-auto">
                             <img
-                              src={article.image_data}
+                              src={mediaSrc(article.image_url, "thumb")}
                               alt={article.title}
                               className="w-full h-full object-cover"
                             />
@@ -1522,8 +1599,9 @@ const SearchPage = () => {
                           <div className="flex items-start justify-between mb-3">
                             <div className="flex-1">
                               <Link to={`/article/${article.id}`}>
-                                <h3 className="text-xl font-bold mb-2 hover:text-red-400 transition-colors arabic-title"
-                                    dangerouslySetInnerHTML={{ __html: highlightSearchTerm(article.title, query) }} />
+                                <h3 className="text-xl font-bold mb-2 hover:text-red-400 transition-colors arabic-title">
+                                  {renderHighlights(article.title, article.title_highlights)}
+                                </h3>
                               </Link>
                               <div className="flex items-center text-sm text-gray-500 mb-3">
                                 <span className="font-medium" 
@@ -1535,8 +1613,9 @@ const SearchPage = () => {
                               </div>
                             </div>
                           </div>
-                          <p className="text-gray-400 line-clamp-3 mb-4"
-                             dangerouslySetInnerHTML={{ __html: highlightSearchTerm(article.content.slice(0, 200) + '...', query) }} />
+                          <p className="text-gray-400 line-clamp-3 mb-4">
+                            {renderHighlights(article.snippet, article.highlights)}
+                          </p>
                           <div className="flex items-center justify-between">
                             <Link
                               to={`/article/${article.id}`}
@@ -1572,7 +1651,8 @@ const RegisterPage = () => {
     full_name: '',
     password: '',
     confirmPassword: '',
-    profile_picture: ''
+    profile_picture: '',
+    profile_picture_file: null
   });
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
@@ -1584,7 +1664,8 @@ const RegisterPage = () => {
       reader.onload = (e) => {
         setFormData({
           ...formData,
-          profile_picture: e.target.result
+          profile_picture: e.target.result,
+          profile_picture_file: file
         });
       };
       reader.readAsDataURL(file);
@@ -1612,12 +1693,20 @@ const RegisterPage = () => {
         username: formData.username.trim(),
         email: formData.email.trim().toLowerCase(),
         full_name: formData.full_name.trim(),
-        password: formData.password,
-        profile_picture: formData.profile_picture
+        password: formData.password
       };
 
       const response = await axios.post(`${API}/register`, registerData);
-      login(response.data.access_token, response.data.user);
+      let user = response.data.user;
+      if (formData.profile_picture_file) {
+        const pictureForm = new FormData();
+        pictureForm.append('file', formData.profile_picture_file);
+        const pictureResponse = await axios.put(`${API}/profile/picture`, pictureForm, {
+          headers: { Authorization: `Bearer ${response.data.access_token}` }
+        });
+        user = pictureResponse.data;
+      }
+      login(response.data.access_token, user);
       navigate('/');
     } catch (error) {
       console.error('Registration error:', error);
@@ -1873,9 +1962,9 @@ const ProfilePage = () => {
           <h1 className="text-3xl font-bold mb-8 text-center text-red-500 arabic-title">ملفي الشخصي</h1>
           
           <div className="text-center mb-8">
-            {user.profile_picture ? (
+            {user.profile_picture_url ? (
               <img
-                src={user.profile_picture}
+                src={mediaSrc(user.profile_picture_url, "avatar")}
                 alt={user.full_name}
                 className="w-32 h-32 rounded-full object-cover mx-auto mb-4"
               />
@@ -1914,6 +2003,9 @@ const ProfilePage = () => {
 const SectionPage = () => {
   const { id } = useParams();
   const [articles, setArticles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [articleCount, setArticleCount] = useState(null);
   const [sections, setSections] = useState([]);
   const [currentSection, setCurrentSection] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -1924,11 +2016,15 @@ const SectionPage = () => {
 
   const fetchData = async () => {
     try {
-      const [articlesRes, sectionsRes] = await Promise.all([
-        axios.get(`${API}/articles/section/${id}`),
-        axios.get(`${API}/sections`)
+      const [page, sectionsRes, countsRes] = await Promise.all([
+        fetchPage(`${API}/articles/section/${id}`),
+        axios.get(`${API}/sections`),
+        // Counts are optional: their failure must not block the list
+        axios.get(`${API}/sections/counts`).catch(() => ({ data: {} }))
       ]);
-      setArticles(articlesRes.data);
+      setArticles(page.items);
+      setNextCursor(page.next_cursor);
+      setArticleCount(id in countsRes.data ? countsRes.data[id] : null);
       setSections(sectionsRes.data);
       setCurrentSection(sectionsRes.data.find(s => s.id === id));
     } catch (error) {
@@ -1938,6 +2034,19 @@ const SectionPage = () => {
     }
   };
 
+  const loadMoreArticles = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`${API}/articles/section/${id}`, nextCursor);
+      setArticles([...articles, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching data:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <PublicLayout>
@@ -1965,7 +2074,9 @@ const SectionPage = () => {
           {currentSection?.description && (
             <p className="text-xl text-gray-400 max-w-2xl mx-auto">{currentSection.description}</p>
           )}
-          <div className="text-red-500 font-semibold mt-4">{articles.length} مقال</div>
+          {articleCount !== null && (
+            <div className="text-red-500 font-semibold mt-4">{articleCount} مقال</div>
+          )}
         </div>
 
         {articles.length === 0 ? (
@@ -1982,9 +2093,9 @@ const SectionPage = () => {
                 to={`/article/${article.id}`}
                 className="bg-gray-900 rounded-xl overflow-hidden hover:bg-gray-800 transition-all duration-300 group shadow-lg article-card"
               >
-                {article.image_data && (
+                {article.image_url && (
                   <img
-                    src={article.image_data}
+                    src={mediaSrc(article.image_url, "thumb")}
                     alt={article.title}
                     className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-300"
                   />
@@ -1994,7 +2105,7 @@ const SectionPage = () => {
                     {article.title}
                   </h3>
                   <p className="text-gray-400 line-clamp-3 mb-4">
-                    {article.content.slice(0, 120)}...
+                    {article.excerpt}
                   </p>
                   <div className="flex items-center text-sm text-gray-500">
                     <span className="font-medium">{article.author}</span>
@@ -2006,6 +2117,7 @@ const SectionPage = () => {
             ))}
           </div>
         )}
+        {nextCursor && <LoadMoreButton onClick={loadMoreArticles} loading={loadingMore} />}
       </div>
     </PublicLayout>
   );
@@ -2072,6 +2184,9 @@ const AdminPanel = () => {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [sections, setSections] = useState([]);
   const [articles, setArticles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [sectionCounts, setSectionCounts] = useState({});
   const [selectedSection, setSelectedSection] = useState("all");
   const [showAddSection, setShowAddSection] = useState(false);
   const [showAddArticle, setShowAddArticle] = useState(false);
@@ -2088,7 +2203,7 @@ const AdminPanel = () => {
     author: "",
     section_id: "",
     image_data: "",
-    image_name: "",
+    image_file: null,
     tags: []
   });
   const [tagInput, setTagInput] = useState("");
@@ -2098,12 +2213,17 @@ const AdminPanel = () => {
   useEffect(() => {
     if (isAuthenticated) {
       fetchSections();
-      fetchArticles();
       fetchCurrentLogo();
       fetchAvailableTags();
     }
   }, [isAuthenticated]);
 
+  useEffect(() => {
+    if (isAuthenticated) {
+      fetchArticles();
+    }
+  }, [isAuthenticated, selectedSection]);
+
   const fetchAvailableTags = async () => {
     try {
       const response = await axios.get(`${API}/tags`);
@@ -2131,12 +2251,36 @@ const AdminPanel = () => {
     }
   };
 
+  // The section filter pages through that section's articles on the server
+  const articlesUrl = () => selectedSection === "all"
+    ? `${API}/articles`
+    : `${API}/articles/section/${selectedSection}`;
+
   const fetchArticles = async () => {
     try {
-      const response = await axios.get(`${API}/articles`);
-      setArticles(response.data);
+      const [page, countsRes] = await Promise.all([
+        fetchPage(articlesUrl()),
+        // Counts are optional: their failure must not block the list
+        axios.get(`${API}/sections/counts`).catch(() => ({ data: {} }))
+      ]);
+      setArticles(page.items);
+      setNextCursor(page.next_cursor);
+      setSectionCounts(countsRes.data);
+    } catch (error) {
+      console.error("Error fetching articles:", error);
+    }
+  };
+
+  const loadMoreArticles = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(articlesUrl(), nextCursor);
+      setArticles([...articles, ...page.items]);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Error fetching articles:", error);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
@@ -2148,7 +2292,7 @@ const AdminPanel = () => {
         setNewArticle({
           ...newArticle,
           image_data: e.target.result,
-          image_name: file.name
+          image_file: file
         });
       };
       reader.readAsDataURL(file);
@@ -2159,25 +2303,19 @@ const AdminPanel = () => {
     const file = event.target.files[0];
     if (file) {
       setLogoUploading(true);
-      const reader = new FileReader();
-      reader.onload = async (e) => {
-        try {
-          const logoData = {
-            logo_data: e.target.result,
-            logo_name: file.name
-          };
-          
-          const response = await axios.put(`${API}/settings/logo`, logoData);
-          setCurrentLogo(response.data);
-          alert("تم تحديث الشعار بنجاح!");
-        } catch (error) {
-          console.error("Error uploading logo:", error);
-          alert("خطأ في رفع الشعار. يرجى المحاولة مرة أخرى.");
-        } finally {
-          setLogoUploading(false);
-        }
-      };
-      reader.readAsDataURL(file);
+      try {
+        const logoForm = new FormData();
+        logoForm.append("file", file);
+        
+        const response = await axios.put(`${API}/settings/logo/image`, logoForm);
+        setCurrentLogo(response.data);
+        alert("تم تحديث الشعار بنجاح!");
+      } catch (error) {
+        console.error("Error uploading logo:", error);
+        alert("خطأ في رفع الشعار. يرجى المحاولة مرة أخرى.");
+      } finally {
+        setLogoUploading(false);
+      }
     }
   };
 
@@ -2224,14 +2362,21 @@ const AdminPanel = () => {
   const createArticle = async (e) => {
     e.preventDefault();
     try {
-      await axios.post(`${API}/articles`, newArticle);
+      // The image is uploaded separately as multipart, image_data is only the preview
+      const { image_data, image_file, ...articleData } = newArticle;
+      const response = await axios.post(`${API}/articles`, articleData);
+      if (image_file) {
+        const imageForm = new FormData();
+        imageForm.append("file", image_file);
+        await axios.put(`${API}/articles/${response.data.id}/image`, imageForm);
+      }
       setNewArticle({
         title: "",
         content: "",
         author: "",
         section_id: "",
         image_data: "",
-        image_name: "",
+        image_file: null,
         tags: []
       });
       setTagInput("");
@@ -2259,6 +2404,16 @@ const AdminPanel = () => {
     }
   };
 
+  // List entries are summaries; load the full article for the preview modal
+  const viewArticle = async (articleId) => {
+    try {
+      const response = await axios.get(`${API}/articles/${articleId}`);
+      setSelectedArticle(response.data);
+    } catch (error) {
+      console.error("Error fetching article:", error);
+    }
+  };
+
   const deleteArticle = async (articleId) => {
     if (window.confirm("هل أنت متأكد من حذف هذا المقال؟")) {
       try {
@@ -2277,9 +2432,7 @@ const AdminPanel = () => {
     return <AdminLogin onLogin={() => setIsAuthenticated(true)} />;
   }
 
-  const filteredArticles = selectedSection === "all" 
-    ? articles 
-    : articles.filter(article => article.section_id === selectedSection);
+  const totalArticles = Object.values(sectionCounts).reduce((total, count) => total + count, 0);
 
   const getSectionName = (sectionId) => {
     const section = sections.find(s => s.id === sectionId);
@@ -2312,9 +2465,9 @@ const AdminPanel = () => {
       {/* Admin Stats */}
       <div className="bg-gray-900 border-b border-gray-700">
         <div className="container mx-auto px-4 py-6">
-          <div className="grid grid-cols-1 md:grid-cols-5 gap-6">
+          <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
             <div className="bg-gray-800 rounded-lg p-4 text-center">
-              <div className="text-2xl font-bold text-red-500 arabic-numbers">{articles.length}</div>
+              <div className="text-2xl font-bold text-red-500 arabic-numbers">{totalArticles}</div>
               <div className="text-gray-400 text-sm">إجمالي المقالات</div>
             </div>
             <div className="bg-gray-800 rounded-lg p-4 text-center">
@@ -2325,12 +2478,6 @@ const AdminPanel = () => {
               <div className="text-2xl font-bold text-red-500 arabic-numbers">{availableTags.length}</div>
               <div className="text-gray-400 text-sm">الوسوم</div>
             </div>
-            <div className="bg-gray-800 rounded-lg p-4 text-center">
-              <div className="text-2xl font-bold text-red-500 arabic-numbers">
-                {articles.filter(a => a.image_data).length}
-              </div>
-              <div className="text-gray-400 text-sm">مقالات بصور</div>
-            </div>
             <div className="bg-gray-800 rounded-lg p-4 text-center">
               <div className="text-2xl font-bold text-red-500">
                 {new Date().toLocaleDateString('ar-SA')}
@@ -2394,11 +2541,11 @@ const AdminPanel = () => {
 
         {/* Articles Grid */}
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-          {filteredArticles.map((article) => (
+          {articles.map((article) => (
             <div key={article.id} className="bg-gray-900 rounded-lg overflow-hidden shadow-lg">
-              {article.image_data && (
+              {article.image_url && (
                 <img
-                  src={article.image_data}
+                  src={mediaSrc(article.image_url, "thumb")}
                   alt={article.title}
                   className="w-full h-48 object-cover"
                 />
@@ -2411,14 +2558,14 @@ const AdminPanel = () => {
                   {article.title}
                 </h3>
                 <p className="text-gray-400 text-sm mb-3 line-clamp-3">
-                  {article.content.slice(0, 100)}...
+                  {article.excerpt}
                 </p>
                 <div className="text-sm text-gray-500 mb-4">
                   بواسطة: {article.author} • {new Date(article.created_at).toLocaleDateString('ar-SA')}
                 </div>
                 <div className="flex justify-between items-center">
                   <button
-                    onClick={() => setSelectedArticle(article)}
+                    onClick={() => viewArticle(article.id)}
                     className="bg-blue-600 hover:bg-blue-700 px-3 py-1 rounded text-sm transition-colors"
                   >
                     عرض
@@ -2434,9 +2581,10 @@ const AdminPanel = () => {
             </div>
           ))}
         </div>
+        {nextCursor && <LoadMoreButton onClick={loadMoreArticles} loading={loadingMore} />}
 
         {/* Empty State */}
-        {filteredArticles.length === 0 && (
+        {articles.length === 0 && (
           <div className="text-center py-16">
             <div className="text-8xl mb-4">📝</div>
             <h3 className="text-2xl font-bold mb-4">لا توجد مقالات</h3>
@@ -2470,7 +2618,7 @@ const AdminPanel = () => {
                 <p className="text-gray-400 text-sm mb-2">{section.description}</p>
               )}
               <div className="text-xs text-gray-500">
-                {articles.filter(a => a.section_id === section.id).length} مقال
+                {sectionCounts[section.id] || 0} مقال
               </div>
             </div>
           ))}
@@ -2728,9 +2876,9 @@ const AdminPanel = () => {
             
             <div className="mb-6 text-center">
               <div className="w-32 h-32 bg-black rounded-lg flex items-center justify-center mx-auto mb-4 border border-gray-600">
-                {currentLogo?.logo_data ? (
+                {currentLogo?.logo_url ? (
                   <img
-                    src={currentLogo.logo_data}
+                    src={mediaSrc(currentLogo.logo_url, "avatar")}
                     alt="الشعار الحالي"
                     className="w-full h-full object-contain rounded-lg"
                   />
@@ -2790,9 +2938,9 @@ const AdminPanel = () => {
               {new Date(selectedArticle.created_at).toLocaleDateString('ar-SA')}
             </div>
 
-            {selectedArticle.image_data && (
+            {selectedArticle.image_url && (
               <img
-                src={selectedArticle.image_data}
+                src={mediaSrc(selectedArticle.image_url, "webp")}
                 alt={selectedArticle.title}
                 className="w-full max-h-64 object-cover rounded-lg mb-6"
               />
@@ -2823,6 +2971,8 @@ const AdminPanel = () => {
 const TagPage = () => {
   const { tagName } = useParams();
   const [articles, setArticles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [tagStats, setTagStats] = useState(null);
 
@@ -2833,8 +2983,9 @@ const TagPage = () => {
 
   const fetchTagArticles = async () => {
     try {
-      const response = await axios.get(`${API}/tags/${encodeURIComponent(tagName)}/articles`);
-      setArticles(response.data);
+      const page = await fetchPage(`${API}/tags/${encodeURIComponent(tagName)}/articles`);
+      setArticles(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Error fetching tag articles:", error);
     } finally {
@@ -2842,6 +2993,19 @@ const TagPage = () => {
     }
   };
 
+  const loadMoreArticles = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`${API}/tags/${encodeURIComponent(tagName)}/articles`, nextCursor);
+      setArticles([...articles, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching tag articles:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchTagStats = async () => {
     try {
       const response = await axios.get(`${API}/tags`);
@@ -2908,9 +3072,9 @@ const TagPage = () => {
                 to={`/article/${article.id}`}
                 className="bg-gray-900 rounded-xl overflow-hidden hover:bg-gray-800 transition-all duration-300 group shadow-lg article-card"
               >
-                {article.image_data && (
+                {article.image_url && (
                   <img
-                    src={article.image_data}
+                    src={mediaSrc(article.image_url, "thumb")}
                     alt={article.title}
                     className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-300"
                   />
@@ -2925,7 +3089,7 @@ const TagPage = () => {
                     {article.title}
                   </h3>
                   <p className="text-gray-400 line-clamp-3 mb-4">
-                    {article.content.slice(0, 120)}...
+                    {article.excerpt}
                   </p>
                   
                   {/* Other tags */}
@@ -2968,6 +3132,7 @@ const TagPage = () => {
             </Link>
           </div>
         )}
+        {nextCursor && <LoadMoreButton onClick={loadMoreArticles} loading={loadingMore} />}
       </div>
     </PublicLayout>
   );
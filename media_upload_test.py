@@ -0,0 +1,207 @@
+import base64
+import requests
+import unittest
+import uuid
+import os
+from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+# Load environment variables from frontend .env file
+frontend_env_path = Path('/app/frontend/.env')
+load_dotenv(frontend_env_path)
+
+# Get the backend URL from environment variables
+BACKEND_URL = os.environ.get('REACT_APP_BACKEND_URL')
+if not BACKEND_URL:
+    print("Error: REACT_APP_BACKEND_URL not found in environment variables")
+    sys.exit(1)
+
+# Ensure the URL ends with /api
+API_URL = f"{BACKEND_URL}/api"
+print(f"Using API URL: {API_URL}")
+
+# A small but valid PNG (1x1 transparent pixel)
+TEST_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+class TestMultipartUploads(unittest.TestCase):
+    def setUp(self):
+        response = requests.post(f"{API_URL}/sections", json={
+            "name": f"Upload Section {uuid.uuid4()}",
+            "description": "This is a test section for upload testing"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test section: {response.text}")
+        self.test_section = response.json()
+
+        response = requests.post(f"{API_URL}/articles", json={
+            "title": "مقالة اختبار الرفع",
+            "content": "محتوى مقالة لاختبار رفع الصور",
+            "author": "كاتب الاختبار",
+            "section_id": self.test_section["id"]
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test article: {response.text}")
+        self.test_article = response.json()
+
+    def tearDown(self):
+        try:
+            requests.delete(f"{API_URL}/sections/{self.test_section['id']}")
+        except Exception as e:
+            print(f"Error cleaning up section {self.test_section['id']}: {e}")
+
+    def test_article_image_upload(self):
+        """An uploaded article image is served back byte for byte"""
+        print("\n=== Testing PUT /api/articles/{id}/image ===")
+
+        response = requests.put(
+            f"{API_URL}/articles/{self.test_article['id']}/image",
+            files={"file": ("cover.png", TEST_PNG, "image/png")}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to upload image: {response.text}")
+        article = response.json()
+        self.assertEqual(article["image_name"], "cover.png")
+        self.assertIsNotNone(article["image_url"])
+
+        response = requests.get(f"{BACKEND_URL}{article['image_url']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, TEST_PNG)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        print("Article image uploaded and served correctly")
+
+    def test_shared_image_is_stored_once(self):
+        """Identical images share one blob that outlives all but the last article using it"""
+        print("\n=== Testing content addressed image deduplication ===")
+
+        response = requests.post(f"{API_URL}/articles", json={
+            "title": "مقالة ثانية بنفس الصورة",
+            "content": "محتوى",
+            "author": "كاتب الاختبار",
+            "section_id": self.test_section["id"]
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test article: {response.text}")
+        second_article = response.json()
+
+        # Unique bytes so no other test holds a reference to the same image
+        image = TEST_PNG + uuid.uuid4().bytes
+        image_urls = []
+        for article in (self.test_article, second_article):
+            response = requests.put(
+                f"{API_URL}/articles/{article['id']}/image",
+                files={"file": ("cover.png", image, "image/png")}
+            )
+            self.assertEqual(response.status_code, 200, f"Failed to upload image: {response.text}")
+            image_urls.append(response.json()["image_url"])
+        self.assertEqual(image_urls[0], image_urls[1], "Identical images should share a media id")
+
+        requests.delete(f"{API_URL}/articles/{second_article['id']}")
+        response = requests.get(f"{BACKEND_URL}{image_urls[0]}")
+        self.assertEqual(response.status_code, 200, "Image still used by another article was deleted")
+
+        requests.delete(f"{API_URL}/articles/{self.test_article['id']}")
+        response = requests.get(f"{BACKEND_URL}{image_urls[0]}")
+        self.assertEqual(response.status_code, 404, "Unreferenced image should be deleted")
+        print("Shared image stored once and freed with its last article")
+
+    def test_image_variants(self):
+        """Variants are served for known names, falling back to the original until rendered"""
+        print("\n=== Testing GET /api/media/{id}?variant= ===")
+
+        response = requests.put(
+            f"{API_URL}/articles/{self.test_article['id']}/image",
+            files={"file": ("cover.png", TEST_PNG, "image/png")}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to upload image: {response.text}")
+        image_url = f"{BACKEND_URL}{response.json()['image_url']}"
+
+        for variant in ("thumb", "avatar", "webp"):
+            response = requests.get(image_url, params={"variant": variant})
+            self.assertEqual(response.status_code, 200, f"Failed to get {variant} variant")
+            self.assertIn(response.headers["content-type"], ("image/webp", "image/png"))
+
+        response = requests.get(image_url, params={"variant": "huge"})
+        self.assertEqual(response.status_code, 400, "Unknown variant should be rejected")
+        print("Image variants served correctly")
+
+    def test_rejects_non_images(self):
+        """Only image uploads are accepted"""
+        print("\n=== Testing upload content type check ===")
+
+        response = requests.put(
+            f"{API_URL}/articles/{self.test_article['id']}/image",
+            files={"file": ("notes.txt", b"not an image", "text/plain")}
+        )
+        self.assertEqual(response.status_code, 415)
+        print("Non image upload rejected correctly")
+
+    def test_rejects_oversized_uploads(self):
+        """Uploads over the 5 MB image limit are refused"""
+        print("\n=== Testing upload size limit ===")
+
+        response = requests.put(
+            f"{API_URL}/articles/{self.test_article['id']}/image",
+            files={"file": ("huge.png", TEST_PNG + b"\0" * (6 * 1024 * 1024), "image/png")}
+        )
+        self.assertEqual(response.status_code, 413)
+        print("Oversized upload rejected correctly")
+
+    def test_rejects_oversized_base64_images(self):
+        """Base64 images in JSON bodies have the same size limit"""
+        print("\n=== Testing base64 image size limit ===")
+
+        response = requests.post(f"{API_URL}/articles", json={
+            "title": "مقالة بصورة كبيرة",
+            "content": "محتوى",
+            "author": "كاتب الاختبار",
+            "section_id": self.test_section["id"],
+            "image_data": base64.b64encode(TEST_PNG + b"\0" * (6 * 1024 * 1024)).decode()
+        })
+        self.assertEqual(response.status_code, 413)
+        print("Oversized base64 image rejected correctly")
+
+    def test_profile_picture_upload(self):
+        """A user can replace their avatar with a multipart upload"""
+        print("\n=== Testing PUT /api/profile/picture ===")
+
+        response = requests.post(f"{API_URL}/register", json={
+            "username": f"testuser_{uuid.uuid4().hex[:8]}",
+            "email": f"testuser_{uuid.uuid4().hex[:8]}@example.com",
+            "full_name": "Test User",
+            "password": "TestPassword123!"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to register test user: {response.text}")
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = requests.put(
+            f"{API_URL}/profile/picture",
+            files={"file": ("avatar.png", TEST_PNG, "image/png")},
+            headers=headers
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to upload profile picture: {response.text}")
+        picture_url = response.json()["profile_picture_url"]
+        self.assertIsNotNone(picture_url)
+
+        response = requests.get(f"{API_URL}/profile", headers=headers)
+        self.assertEqual(response.json()["profile_picture_url"], picture_url)
+        self.assertEqual(requests.get(f"{BACKEND_URL}{picture_url}").content, TEST_PNG)
+        print("Profile picture uploaded correctly")
+
+    def test_logo_upload(self):
+        """The site logo can be uploaded as multipart"""
+        print("\n=== Testing PUT /api/settings/logo/image ===")
+
+        response = requests.put(
+            f"{API_URL}/settings/logo/image",
+            files={"file": ("logo.png", TEST_PNG, "image/png")}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to upload logo: {response.text}")
+        logo = response.json()
+        self.assertEqual(logo["logo_name"], "logo.png")
+        self.assertEqual(requests.get(f"{API_URL}/settings/logo").json()["logo_url"], logo["logo_url"])
+        self.assertEqual(requests.get(f"{BACKEND_URL}{logo['logo_url']}").content, TEST_PNG)
+        print("Logo uploaded correctly")
+
+if __name__ == "__main__":
+    # Run the tests
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,149 @@
+import requests
+import unittest
+import uuid
+import os
+from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+# Load environment variables from frontend .env file
+frontend_env_path = Path('/app/frontend/.env')
+load_dotenv(frontend_env_path)
+
+# Get the backend URL from environment variables
+BACKEND_URL = os.environ.get('REACT_APP_BACKEND_URL')
+if not BACKEND_URL:
+    print("Error: REACT_APP_BACKEND_URL not found in environment variables")
+    sys.exit(1)
+
+# Ensure the URL ends with /api
+API_URL = f"{BACKEND_URL}/api"
+print(f"Using API URL: {API_URL}")
+
+class TestCursorPagination(unittest.TestCase):
+    def setUp(self):
+        # Create a test section to hold the paginated articles
+        response = requests.post(f"{API_URL}/sections", json={
+            "name": f"Pagination Section {uuid.uuid4()}",
+            "description": "This is a test section for pagination testing"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test section: {response.text}")
+        self.test_section = response.json()
+
+        # Create test user for comments
+        response = requests.post(f"{API_URL}/register", json={
+            "username": f"testuser_{uuid.uuid4().hex[:8]}",
+            "email": f"testuser_{uuid.uuid4().hex[:8]}@example.com",
+            "full_name": "Test User",
+            "password": "TestPassword123!"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to register test user: {response.text}")
+        self.auth_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Create test articles sharing a unique tag
+        self.test_tag = f"وسم-{uuid.uuid4().hex[:8]}"
+        self.article_count = 5
+        self.created_articles = []
+        for i in range(self.article_count):
+            response = requests.post(f"{API_URL}/articles", json={
+                "title": f"مقالة رقم {i}",
+                "content": "محتوى مقالة لاختبار التصفح",
+                "author": "كاتب الاختبار",
+                "section_id": self.test_section["id"],
+                "tags": [self.test_tag]
+            })
+            self.assertEqual(response.status_code, 200, f"Failed to create test article: {response.text}")
+            self.created_articles.append(response.json()["id"])
+
+    def tearDown(self):
+        # Deleting the section also deletes its articles
+        try:
+            requests.delete(f"{API_URL}/sections/{self.test_section['id']}")
+        except Exception as e:
+            print(f"Error cleaning up section {self.test_section['id']}: {e}")
+
+    def walk_pages(self, url, limit):
+        """Follow next_cursor until the last page, returning every page"""
+        pages = []
+        params = {"limit": limit}
+        while True:
+            response = requests.get(url, params=params)
+            self.assertEqual(response.status_code, 200, f"Failed to get page: {response.text}")
+            page = response.json()
+            self.assertIn("items", page)
+            self.assertIn("next_cursor", page)
+            self.assertLessEqual(len(page["items"]), limit)
+            pages.append(page)
+            if not page["next_cursor"]:
+                return pages
+            params = {"limit": limit, "cursor": page["next_cursor"]}
+
+    def test_section_articles_pagination(self):
+        """Walking every page returns each article exactly once, newest first"""
+        print("\n=== Testing cursor pagination on /api/articles/section/{id} ===")
+
+        pages = self.walk_pages(f"{API_URL}/articles/section/{self.test_section['id']}", limit=2)
+        self.assertEqual(len(pages), 3, f"Expected 3 pages of 2, got {len(pages)}")
+
+        article_ids = [article["id"] for page in pages for article in page["items"]]
+        self.assertEqual(article_ids, list(reversed(self.created_articles)), "Articles should be newest first without gaps or duplicates")
+        print(f"Successfully walked {len(pages)} pages")
+
+    def test_tag_articles_pagination(self):
+        """Tag listing is paginated the same way"""
+        print("\n=== Testing cursor pagination on /api/tags/{tag}/articles ===")
+
+        pages = self.walk_pages(f"{API_URL}/tags/{self.test_tag}/articles", limit=3)
+        article_ids = [article["id"] for page in pages for article in page["items"]]
+        self.assertEqual(sorted(article_ids), sorted(self.created_articles))
+        print(f"Successfully walked {len(pages)} pages")
+
+    def test_comments_pagination(self):
+        """Comments are paginated oldest first"""
+        print("\n=== Testing cursor pagination on /api/articles/{id}/comments ===")
+
+        article_id = self.created_articles[0]
+        contents = [f"تعليق {i}" for i in range(4)]
+        for content in contents:
+            response = requests.post(
+                f"{API_URL}/articles/{article_id}/comments",
+                json={"content": content},
+                headers=self.auth_headers
+            )
+            self.assertEqual(response.status_code, 200, f"Failed to create comment: {response.text}")
+
+        pages = self.walk_pages(f"{API_URL}/articles/{article_id}/comments", limit=3)
+        self.assertEqual([c["content"] for page in pages for c in page["items"]], contents)
+        print(f"Successfully walked {len(pages)} pages of comments")
+
+    def test_section_counts(self):
+        """Section article counts follow article writes without listing every article"""
+        print("\n=== Testing /api/sections/counts ===")
+
+        response = requests.get(f"{API_URL}/sections/counts")
+        self.assertEqual(response.status_code, 200, f"Failed to get section counts: {response.text}")
+        self.assertEqual(response.json()[self.test_section["id"]], self.article_count)
+
+        response = requests.delete(f"{API_URL}/articles/{self.created_articles[0]}")
+        self.assertEqual(response.status_code, 200, f"Failed to delete article: {response.text}")
+        response = requests.get(f"{API_URL}/sections/counts")
+        self.assertEqual(response.json()[self.test_section["id"]], self.article_count - 1, "Count should drop after a delete")
+        print("Section counts are correct")
+
+    def test_invalid_cursor_and_limit(self):
+        """Malformed cursors and out of range limits are rejected"""
+        print("\n=== Testing invalid pagination parameters ===")
+
+        response = requests.get(f"{API_URL}/articles", params={"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400, "Malformed cursor should be rejected")
+
+        response = requests.get(f"{API_URL}/articles", params={"limit": 0})
+        self.assertEqual(response.status_code, 422, "Limit below 1 should be rejected")
+
+        response = requests.get(f"{API_URL}/articles", params={"limit": 1000})
+        self.assertEqual(response.status_code, 422, "Limit above the maximum page size should be rejected")
+        print("Invalid pagination parameters are rejected correctly")
+
+if __name__ == "__main__":
+    # Run the tests
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,122 @@
+import requests
+import unittest
+import uuid
+import os
+from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+# Load environment variables from frontend .env file
+frontend_env_path = Path('/app/frontend/.env')
+load_dotenv(frontend_env_path)
+
+# Get the backend URL from environment variables
+BACKEND_URL = os.environ.get('REACT_APP_BACKEND_URL')
+if not BACKEND_URL:
+    print("Error: REACT_APP_BACKEND_URL not found in environment variables")
+    sys.exit(1)
+
+# Ensure the URL ends with /api
+API_URL = f"{BACKEND_URL}/api"
+print(f"Using API URL: {API_URL}")
+
+class TestResponseCacheInvalidation(unittest.TestCase):
+    """Cached list endpoints must reflect every write immediately"""
+
+    def setUp(self):
+        response = requests.post(f"{API_URL}/sections", json={
+            "name": f"Cache Section {uuid.uuid4()}",
+            "description": "This is a test section for cache testing"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to create test section: {response.text}")
+        self.test_section = response.json()
+
+        response = requests.post(f"{API_URL}/register", json={
+            "username": f"testuser_{uuid.uuid4().hex[:8]}",
+            "email": f"testuser_{uuid.uuid4().hex[:8]}@example.com",
+            "full_name": "Test User",
+            "password": "TestPassword123!"
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to register test user: {response.text}")
+        self.auth_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def tearDown(self):
+        try:
+            requests.delete(f"{API_URL}/sections/{self.test_section['id']}")
+        except Exception as e:
+            print(f"Error cleaning up section {self.test_section['id']}: {e}")
+
+    def create_article(self, **fields):
+        article = {
+            "title": f"مقالة التخزين المؤقت {uuid.uuid4().hex[:8]}",
+            "content": "محتوى مقالة لاختبار التخزين المؤقت",
+            "author": "كاتب الاختبار",
+            "section_id": self.test_section["id"],
+            **fields
+        }
+        response = requests.post(f"{API_URL}/articles", json=article)
+        self.assertEqual(response.status_code, 200, f"Failed to create test article: {response.text}")
+        return response.json()
+
+    def section_articles(self):
+        response = requests.get(f"{API_URL}/articles/section/{self.test_section['id']}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["items"]
+
+    def test_article_writes_invalidate_lists(self):
+        """Creating, liking and deleting articles shows up in cached lists"""
+        print("\n=== Testing cache invalidation on article writes ===")
+
+        self.assertEqual(self.section_articles(), [])
+        article = self.create_article()
+        self.assertEqual([a["id"] for a in self.section_articles()], [article["id"]])
+        self.assertIn(article["id"], [a["id"] for a in requests.get(f"{API_URL}/articles").json()["items"]])
+
+        response = requests.post(f"{API_URL}/articles/{article['id']}/like", headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.section_articles()[0]["likes_count"], 1)
+
+        response = requests.delete(f"{API_URL}/articles/{article['id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.section_articles(), [])
+        self.assertNotIn(article["id"], [a["id"] for a in requests.get(f"{API_URL}/articles").json()["items"]])
+        print("Article lists stay fresh")
+
+    def test_tag_and_suggestion_invalidation(self):
+        """Tag counts and suggestions follow article updates"""
+        print("\n=== Testing cache invalidation of tags and suggestions ===")
+
+        tag = f"وسم-{uuid.uuid4().hex[:8]}"
+        article = self.create_article(tags=[tag])
+        tags = {t["name"]: t["count"] for t in requests.get(f"{API_URL}/tags").json()["tags"]}
+        self.assertEqual(tags.get(tag), 1)
+
+        new_title = f"عنوان فريد {uuid.uuid4().hex[:8]}"
+        response = requests.put(f"{API_URL}/articles/{article['id']}", json={"title": new_title, "tags": []})
+        self.assertEqual(response.status_code, 200)
+
+        tags = {t["name"]: t["count"] for t in requests.get(f"{API_URL}/tags").json()["tags"]}
+        self.assertNotIn(tag, tags)
+        suggestions = requests.get(f"{API_URL}/search/suggestions", params={"q": new_title}).json()["suggestions"]
+        self.assertIn(new_title, suggestions)
+        print("Tags and suggestions stay fresh")
+
+    def test_section_writes_invalidate_sections(self):
+        """New sections appear in the cached sections list"""
+        print("\n=== Testing cache invalidation on section writes ===")
+
+        section_ids = [s["id"] for s in requests.get(f"{API_URL}/sections").json()]
+        self.assertIn(self.test_section["id"], section_ids)
+
+        response = requests.post(f"{API_URL}/sections", json={"name": f"Another Section {uuid.uuid4()}"})
+        self.assertEqual(response.status_code, 200)
+        section_id = response.json()["id"]
+        self.assertIn(section_id, [s["id"] for s in requests.get(f"{API_URL}/sections").json()])
+
+        requests.delete(f"{API_URL}/sections/{section_id}")
+        self.assertNotIn(section_id, [s["id"] for s in requests.get(f"{API_URL}/sections").json()])
+        print("Sections list stays fresh")
+
+if __name__ == "__main__":
+    # Run the tests
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -193,7 +193,7 @@ class TestSearchAPI(unittest.TestCase):
         self.assertIn("total_results", results)
         
         # Should find articles containing "الصلاة"
-        self.assertTrue(any("الصلاة" in article["title"] or "الصلاة" in article["content"] 
+        self.assertTrue(any("الصلاة" in article["title"] or "الصلاة" in article["excerpt"] 
                            for article in results["articles"]), 
                        "Arabic search term not found in results")
         
@@ -207,7 +207,7 @@ class TestSearchAPI(unittest.TestCase):
         results = response.json()
         
         # Should find articles containing "Pillars"
-        self.assertTrue(any("Pillars" in article["title"] or "Pillars" in article["content"] 
+        self.assertTrue(any("Pillars" in article["title"] or "Pillars" in article["excerpt"] 
                            for article in results["articles"]), 
                        "English search term not found in results")
         
@@ -222,6 +222,38 @@ class TestSearchAPI(unittest.TestCase):
         print(f"Found {results['total_results']} results for term 'Islam'")
 
     # Search Filter Tests
+    def test_relevance_ranking(self):
+        """Test that relevance puts title matches ahead of passing mentions in the content"""
+        print("\n=== Testing Relevance Ranking ===")
+
+        term = f"zakat{uuid.uuid4().hex[:8]}"
+        ranked_articles = []
+        for article_data in [
+            {"title": "Notes on charity", "content": f"A long article that mentions {term} only once. " + "Filler text. " * 50},
+            {"title": f"Understanding {term}", "content": f"{term} explained, with the rules of {term}."}
+        ]:
+            response = requests.post(f"{API_URL}/articles", json={
+                **article_data,
+                "author": "Test Author",
+                "section_id": self.english_section["id"]
+            })
+            self.assertEqual(response.status_code, 200, f"Failed to create article: {response.text}")
+            ranked_articles.append(response.json())
+            self.created_articles.append(response.json()["id"])
+
+        response = requests.get(f"{API_URL}/search", params={"q": term, "sort_by": "relevance"})
+        self.assertEqual(response.status_code, 200, f"Failed to search: {response.text}")
+        ids = [article["id"] for article in response.json()["articles"]]
+        self.assertEqual(ids, [ranked_articles[1]["id"], ranked_articles[0]["id"]])
+
+        # Words are matched by prefix, and updates are searchable immediately
+        response = requests.put(f"{API_URL}/articles/{ranked_articles[0]['id']}", json={"content": "Nothing to see here"})
+        self.assertEqual(response.status_code, 200)
+        response = requests.get(f"{API_URL}/search", params={"q": term[:-2]})
+        ids = [article["id"] for article in response.json()["articles"]]
+        self.assertEqual(ids, [ranked_articles[1]["id"]])
+        print("Relevance ranking works correctly")
+
     def test_search_filters(self):
         """Test search filters (section_id, author, date range, sorting)"""
         print("\n=== Testing Search Filters ===")
@@ -312,6 +344,46 @@ class TestSearchAPI(unittest.TestCase):
         results = response.json()
         print(f"Found {len(results['articles'])} articles with combined filters")
 
+    def test_search_facets_and_pages(self):
+        """Test exact totals, facet counts and paging, for text and filter-only searches"""
+        print("\n=== Testing Search Facets and Pages ===")
+
+        term = f"fiqh{uuid.uuid4().hex[:8]}"
+        for index in range(5):
+            response = requests.post(f"{API_URL}/articles", json={
+                "title": f"{term} lesson {index}",
+                "content": "Lesson content",
+                "author": "Facet Author A" if index < 3 else "Facet Author B",
+                "section_id": self.english_section["id"],
+                "tags": [term, "even" if index % 2 == 0 else "odd"]
+            })
+            self.assertEqual(response.status_code, 200, f"Failed to create article: {response.text}")
+            self.created_articles.append(response.json()["id"])
+
+        for params in [{"q": term}, {"tags": term}]:
+            print(f"Searching with {params}...")
+            response = requests.get(f"{API_URL}/search", params={**params, "limit": 2})
+            self.assertEqual(response.status_code, 200, f"Failed to search: {response.text}")
+            results = response.json()
+            self.assertEqual(results["total_articles"], 5)
+            self.assertEqual(len(results["articles"]), 2)
+            self.assertTrue(results["has_more"])
+
+            facets = results["facets"]
+            self.assertEqual(facets["sections"], [{"value": self.english_section["id"], "count": 5, "name": self.english_section["name"]}])
+            self.assertEqual(facets["authors"], [{"value": "Facet Author A", "count": 3}, {"value": "Facet Author B", "count": 2}])
+            self.assertIn({"value": "even", "count": 3}, facets["tags"])
+            self.assertEqual(sum(month["count"] for month in facets["months"]), 5)
+
+            seen = [article["id"] for article in results["articles"]]
+            for page in (2, 3):
+                response = requests.get(f"{API_URL}/search", params={**params, "limit": 2, "page": page})
+                seen += [article["id"] for article in response.json()["articles"]]
+            self.assertFalse(response.json()["has_more"])
+            self.assertEqual(sorted(seen), sorted(self.created_articles[-5:]))
+
+        print("Facets and paging work correctly")
+
     # Search Suggestions Tests
     def test_search_suggestions(self):
         """Test search suggestions functionality"""
@@ -346,6 +418,34 @@ class TestSearchAPI(unittest.TestCase):
                            "English partial term not found in suggestions")
         
         print(f"Found {len(results['suggestions'])} suggestions for English partial term '{partial_term}'")
+
+    def test_suggestions_ranking(self):
+        """Test that suggestions rank by popularity and follow article writes"""
+        print("\n=== Testing Suggestion Ranking ===")
+
+        prefix = f"q{uuid.uuid4().hex[:6]}"
+        titles = [f"{prefix} first", f"{prefix} second"]
+        created = []
+        for title in titles:
+            response = requests.post(f"{API_URL}/articles", json={
+                "title": title,
+                "content": "Suggestion ranking test",
+                "author": "Test Author",
+                "section_id": self.english_section["id"]
+            })
+            self.assertEqual(response.status_code, 200, f"Failed to create article: {response.text}")
+            created.append(response.json())
+            self.created_articles.append(response.json()["id"])
+
+        response = requests.post(f"{API_URL}/articles/{created[1]['id']}/like", headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200, f"Failed to like article: {response.text}")
+        suggestions = requests.get(f"{API_URL}/search/suggestions", params={"q": prefix}).json()["suggestions"]
+        self.assertEqual(suggestions, [titles[1], titles[0]], "The liked article should be suggested first")
+
+        requests.delete(f"{API_URL}/articles/{created[1]['id']}")
+        suggestions = requests.get(f"{API_URL}/search/suggestions", params={"q": prefix}).json()["suggestions"]
+        self.assertEqual(suggestions, [titles[0]], "Deleted articles should not be suggested")
+        print("Suggestions ranked and updated correctly")
         
         # 3. Test with very short term (should return empty)
         print("Testing suggestions with very short term...")
@@ -368,6 +468,10 @@ class TestSearchAPI(unittest.TestCase):
         
         results = response.json()
         self.assertEqual(results["total_results"], 0, "Empty search should return no results")
+        nonexistent = requests.get(f"{API_URL}/search?q=xyznonexistentterm123").json()
+        self.assertEqual(set(results), set(nonexistent), "Empty search should have the same response shape")
+        self.assertFalse(results["has_more"])
+        self.assertEqual(results["facets"]["sections"], [])
         print("Successfully handled empty search")
         
         # 2. Search with non-existent term
@@ -120,7 +120,7 @@ class TestArabicSectionAPI(unittest.TestCase):
             response = requests.get(f"{API_URL}/articles/section/{section_id}")
             self.assertEqual(response.status_code, 200, f"Failed to get articles by section: {response.text}")
             
-            section_articles = response.json()
+            section_articles = response.json()["items"]
             self.assertIsInstance(section_articles, list, "Expected list of articles")
             self.assertEqual(len(section_articles), 1, f"Expected 1 article in section, got {len(section_articles)}")
             self.assertEqual(section_articles[0]["id"], article_id, "Article ID mismatch")
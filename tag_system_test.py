@@ -136,7 +136,7 @@ class TestTagSystem(unittest.TestCase):
         response = requests.get(f"{API_URL}/tags/{tag_name}/articles")
         self.assertEqual(response.status_code, 200, f"Failed to get articles by tag: {response.text}")
         
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertIsInstance(articles, list, "Response should be a list of articles")
         self.assertGreaterEqual(len(articles), 2, f"Expected at least 2 articles with tag '{tag_name}', got {len(articles)}")
         
@@ -151,7 +151,7 @@ class TestTagSystem(unittest.TestCase):
         response = requests.get(f"{API_URL}/tags/{tag_name}/articles")
         self.assertEqual(response.status_code, 200, f"Failed to get articles by tag: {response.text}")
         
-        articles = response.json()
+        articles = response.json()["items"]
         self.assertIsInstance(articles, list, "Response should be a list of articles")
         self.assertGreaterEqual(len(articles), 1, f"Expected at least 1 article with tag '{tag_name}', got {len(articles)}")
         
@@ -281,6 +281,39 @@ class TestTagSystem(unittest.TestCase):
         
         print("Successfully verified tags were added to the system with correct counts")
         
+    def test_tag_counts_follow_article_changes(self):
+        """Test that tag counts are updated when articles are edited and deleted"""
+        print("\n=== Testing tag count maintenance ===")
+        
+        def tag_counts():
+            response = requests.get(f"{API_URL}/tags")
+            self.assertEqual(response.status_code, 200, f"Failed to get tags: {response.text}")
+            return {tag["name"]: tag["count"] for tag in response.json()["tags"]}
+        
+        unique_tag = f"وسم-{uuid.uuid4().hex[:8]}"
+        before = tag_counts()
+        
+        # Swap one tag of the first article for a brand new one
+        article = self.test_articles[0]
+        response = requests.put(f"{API_URL}/articles/{article['id']}", json={"tags": ["العقيدة", unique_tag]})
+        self.assertEqual(response.status_code, 200, f"Failed to update article tags: {response.text}")
+        
+        after_update = tag_counts()
+        self.assertEqual(after_update.get(unique_tag), 1, "New tag should be counted once")
+        self.assertEqual(after_update.get("التوحيد", 0), before["التوحيد"] - 1, "Removed tag should be counted down")
+        self.assertEqual(after_update["العقيدة"], before["العقيدة"], "Kept tag count should not change")
+        
+        # Deleting the article removes its tags from the counts
+        response = requests.delete(f"{API_URL}/articles/{article['id']}")
+        self.assertEqual(response.status_code, 200, f"Failed to delete article: {response.text}")
+        self.created_articles.remove(article["id"])
+        
+        after_delete = tag_counts()
+        self.assertNotIn(unique_tag, after_delete, "Tag without articles should disappear")
+        self.assertEqual(after_delete.get("العقيدة", 0), before["العقيدة"] - 1)
+        
+        print("Successfully verified tag counts follow article changes")
+        
     def test_advanced_search_with_tags(self):
         """Test advanced search with text query and tag filters"""
         print("\n=== Testing advanced search with text and tag filters ===")
@@ -301,7 +334,7 @@ class TestTagSystem(unittest.TestCase):
         for article in articles:
             self.assertIn(tag_filter, article["tags"], f"Article {article['id']} does not have tag '{tag_filter}'")
             self.assertTrue(
-                text_query in article["title"] or text_query in article["content"],
+                text_query in article["title"] or text_query in article["excerpt"],
                 f"Article {article['id']} does not contain text '{text_query}'"
             )
         